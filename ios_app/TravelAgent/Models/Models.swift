@@ -2,6 +2,8 @@ import Foundation
 
 struct ChatRequest: Encodable {
     let message: String
+    // Structured results only; the server leaves out the text renderings of them.
+    var compact = true
 }
 
 struct ChatResponse: Decodable {
@@ -13,6 +15,39 @@ struct ChatResponse: Decodable {
     let execution_time_ms: Double?
 }
 
+enum ChatStreamEvent {
+    case nodeStarted(String)
+    case orchestrator(query: String?)
+    case flights([FlightOption])
+    case hotels([HotelOption])
+    case done(ChatResponse)
+}
+
+struct ChatStreamNode: Decodable {
+    let node: String
+    let status: String?
+    let execution_time_ms: Double?
+}
+
+struct OrchestratorDecision: Decodable {
+    let needs_flight: Bool?
+    let needs_hotel: Bool?
+    let query: String?
+    let currency: String?
+}
+
+struct OrchestratorNodeEvent: Decodable {
+    let result: OrchestratorDecision?
+}
+
+struct FlightNodeEvent: Decodable {
+    let result: [FlightOption]?
+}
+
+struct HotelNodeEvent: Decodable {
+    let result: [HotelOption]?
+}
+
 struct FlightOption: Decodable, Identifiable {
     let id = UUID()
     let carrier: String
@@ -3,6 +3,7 @@ import Foundation
 final class ApiClient {
     enum ApiError: Error {
         case invalidResponse
+        case streamFailed(String)
     }
 
     private let baseURL: URL
@@ -23,4 +24,67 @@ final class ApiClient {
         }
         return try JSONDecoder().decode(ChatResponse.self, from: data)
     }
+
+    func chatStream(message: String) -> AsyncThrowingStream<ChatStreamEvent, Error> {
+        AsyncThrowingStream { continuation in
+            let task = Task {
+                do {
+                    var request = URLRequest(url: baseURL.appendingPathComponent("chat/stream"))
+                    request.httpMethod = "POST"
+                    request.setValue("application/json", forHTTPHeaderField: "Content-Type")
+                    request.setValue("text/event-stream", forHTTPHeaderField: "Accept")
+                    request.httpBody = try JSONEncoder().encode(ChatRequest(message: message))
+
+                    let (bytes, response) = try await URLSession.shared.bytes(for: request)
+                    guard let http = response as? HTTPURLResponse, (200...299).contains(http.statusCode) else {
+                        throw ApiError.invalidResponse
+                    }
+
+                    var eventName = "message"
+                    for try await line in bytes.lines {
+                        if line.hasPrefix("event: ") {
+                            eventName = String(line.dropFirst(7))
+                        } else if line.hasPrefix("data: ") {
+                            let data = Data(line.dropFirst(6).utf8)
+                            if let event = try Self.decodeEvent(eventName, data: data) {
+                                continuation.yield(event)
+                            }
+                        }
+                    }
+                    continuation.finish()
+                } catch {
+                    continuation.finish(throwing: error)
+                }
+            }
+            continuation.onTermination = { _ in task.cancel() }
+        }
+    }
+
+    private static func decodeEvent(_ name: String, data: Data) throws -> ChatStreamEvent? {
+        let decoder = JSONDecoder()
+        switch name {
+        case "node_start":
+            return .nodeStarted(try decoder.decode(ChatStreamNode.self, from: data).node)
+        case "node":
+            let node = try decoder.decode(ChatStreamNode.self, from: data)
+            switch node.node {
+            case "orchestrator":
+                let event = try decoder.decode(OrchestratorNodeEvent.self, from: data)
+                return .orchestrator(query: event.result?.query)
+            case "flight_search":
+                return .flights(try decoder.decode(FlightNodeEvent.self, from: data).result ?? [])
+            case "hotel_search":
+                return .hotels(try decoder.decode(HotelNodeEvent.self, from: data).result ?? [])
+            default:
+                return nil
+            }
+        case "done":
+            return .done(try decoder.decode(ChatResponse.self, from: data))
+        case "error":
+            let detail = (try? JSONDecoder().decode([String: String].self, from: data))?["detail"]
+            throw ApiError.streamFailed(detail ?? "Stream failed")
+        default:
+            return nil
+        }
+    }
 }
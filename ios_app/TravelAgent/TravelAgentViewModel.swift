@@ -36,20 +36,27 @@ final class TravelAgentViewModel: ObservableObject {
 
         Task {
             do {
-                let response = try await client.chat(message: message)
-                let elapsed = Date().timeIntervalSince(start)
-                queryLine = response.query.map { "Query: \($0)" } ?? "Query: not available"
-                flights = response.flights ?? []
-                hotels = response.hotels ?? []
-
-                if flights.isEmpty && hotels.isEmpty {
-                    answer = response.answer ?? "No structured results."
-                } else {
-                    answer = ""
+                for try await event in client.chatStream(message: message) {
+                    switch event {
+                    case .nodeStarted(let node):
+                        inlineStatus = node == "orchestrator" ? "Routing..." : "Searching..."
+                    case .orchestrator(let query):
+                        queryLine = query.map { "Query: \($0)" } ?? "Query: not available"
+                    case .flights(let options):
+                        flights = options
+                    case .hotels(let options):
+                        hotels = options
+                    case .done(let response):
+                        let elapsed = Date().timeIntervalSince(start)
+                        if flights.isEmpty && hotels.isEmpty {
+                            answer = response.answer ?? "No structured results."
+                        } else {
+                            answer = ""
+                        }
+                        statusLine = "Status: \(response.status ?? "unknown") | Time: \(String(format: "%.1f", elapsed)) s"
+                        showInlineStatus = false
+                    }
                 }
-
-                statusLine = "Status: \(response.status ?? "unknown") | Time: \(String(format: "%.1f", elapsed)) s"
-                showInlineStatus = false
             } catch {
                 let elapsed = Date().timeIntervalSince(start)
                 statusLine = "Error: \(error.localizedDescription) | Time: \(String(format: "%.1f", elapsed)) s"
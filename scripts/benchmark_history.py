@@ -0,0 +1,71 @@
+import argparse
+import contextlib
+import io
+import json
+import sys
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List
+
+from travel_agent.app import build_graph
+from travel_agent.history import SessionStore, capture_history, reset_history, restore_history
+
+# FakeModel lives with the tests, so put the checkout root on the path.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tests.travel_agent.fake_model import FakeModel  # noqa: E402
+
+REQUEST = "SFO to LAX, depart 2025-01-10, return 2025-01-14, flights and hotels"
+
+
+def run_mode(mode: str, requests: int, max_tokens: int) -> List[int]:
+    model = FakeModel()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        graph = build_graph(model)
+    sessions = SessionStore(max_tokens=max_tokens)
+    per_request: List[int] = []
+    for _ in range(requests):
+        calls_before = len(model.input_tokens)
+        if mode == "stateless":
+            reset_history(graph)
+        elif mode == "session":
+            restore_history(graph, sessions.load("bench"))
+        # Agents echo their output through the default callback handler.
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph(REQUEST)
+        if mode == "session":
+            sessions.save("bench", capture_history(graph))
+        per_request.append(sum(model.input_tokens[calls_before:]))
+    return per_request
+
+
+def summarize(tokens: List[int]) -> Dict[str, Any]:
+    return {
+        "first": tokens[0],
+        "mid": tokens[len(tokens) // 2],
+        "last": tokens[-1],
+        "max": max(tokens),
+        "growth": tokens[-1] - tokens[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request prompt tokens over sequential requests.")
+    parser.add_argument("--requests", type=int, default=1000, help="Sequential requests per mode.")
+    parser.add_argument(
+        "--modes",
+        default="shared,stateless,session",
+        help="Comma-separated modes: shared (no reset), stateless, session.",
+    )
+    parser.add_argument("--session-tokens", type=int, default=2000, help="Session history token budget.")
+    args = parser.parse_args()
+
+    report = {}
+    for mode in args.modes.split(","):
+        report[mode] = summarize(run_mode(mode, args.requests, args.session_tokens))
+    print(json.dumps({"requests": args.requests, "prompt_tokens": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+
+# Cumulative import time budgets in milliseconds, with the heavy packages each entry point must not load.
+# The budgets leave room for slower machines; the forbidden lists are what catch a regression.
+HEAVY = ("strands", "ollama", "fastapi", "starlette", "numpy", "pyarrow", "mcp")
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "travel_agent": (50.0, HEAVY),
+    "travel_agent.main": (150.0, HEAVY),
+    "travel_agent.results": (100.0, HEAVY),
+    "travel_agent.inventory": (100.0, HEAVY),
+    "travel_agent.similarity": (100.0, HEAVY),
+    "travel_agent.app": (2000.0, ("fastapi", "numpy", "pyarrow")),
+    "travel_agent.server": (3000.0, ("numpy", "pyarrow")),
+}
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_times(module: str) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    total = 0.0
+    own: List[Tuple[str, float]] = []
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        own.append((name.strip(), int(self_us) / 1000))
+        if name.strip() == module:
+            total = int(cumulative_us) / 1000
+    return total, own, json.loads(done.stdout)
+
+
+def measure(module: str, repeat: int, top: int) -> Dict[str, Any]:
+    # The fastest of a few fresh interpreters, as the first run also pays for cold disk caches.
+    runs = [import_times(module) for _ in range(repeat)]
+    total, own, loaded = min(runs, key=lambda run: run[0])
+    budget, forbidden = BUDGETS.get(module, (None, ()))
+    heavy = sorted({name.split(".")[0] for name in loaded} & set(forbidden))
+    return {
+        "ms": round(total, 1),
+        "budget_ms": budget,
+        "heavy_loaded": heavy,
+        "ok": (budget is None or total <= budget) and not heavy,
+        "slowest": [[name, round(ms, 1)] for name, ms in sorted(own, key=lambda item: -item[1])[:top]],
+    }
+
+
+def cli_help(repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        subprocess.run([sys.executable, "-m", "travel_agent", "--help"], capture_output=True, check=True, cwd=ROOT)
+        timings.append(perf_counter() - started)
+    return round(1000 * min(timings), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time per entry point, as reported by python -X importtime.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS), help="Modules to import (default: all budgeted).")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module; the fastest counts.")
+    parser.add_argument("--top", type=int, default=8, help="Slowest modules listed by their own import time.")
+    parser.add_argument(
+        "--check", action="store_true", help="Exit 1 when a module is over budget or loads a heavy package."
+    )
+    args = parser.parse_args()
+
+    report = {module: measure(module, args.repeat, args.top) for module in args.modules}
+    report["travel-agent --help"] = {"ms": cli_help(args.repeat)}
+    print(json.dumps(report, indent=2))
+    if args.check and not all(entry.get("ok", True) for entry in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
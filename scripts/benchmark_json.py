@@ -0,0 +1,105 @@
+import argparse
+import json
+import re
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from travel_agent.jsonstream import JsonExtractor, extract_json
+
+SIZES = {"1KB": 1 << 10, "10KB": 10 << 10, "100KB": 100 << 10, "1MB": 1 << 20}
+PROSE = "Prices change often [TBD], so check the airline site {link} before booking. "
+
+
+# The regex-and-retry parser that server._parse_json used before jsonstream.
+def legacy_parse_json(text: str) -> Optional[Any]:
+    if not text:
+        return None
+    fence_match = re.search(r"```json\s*([\s\S]*?)```", text, re.IGNORECASE)
+    raw = fence_match.group(1) if fence_match else text
+    decoder = json.JSONDecoder()
+    for idx, char in enumerate(raw):
+        if char in "{[":
+            try:
+                value, _ = decoder.raw_decode(raw[idx:])
+                return value
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def _flights(size: int) -> str:
+    items: List[Dict[str, Any]] = []
+    text = "[]"
+    while len(text) < size:
+        index = len(items)
+        items.append(
+            {
+                "carrier": "United",
+                "flight": f"UA{100 + index}",
+                "route": "SFO -> LAX",
+                "depart": "2025-01-10",
+                "return": "2025-01-14",
+                "price": 120.0 + index,
+                "currency": "EUR",
+                "notes": "Seat \"economy\" [basic], bags {1}",
+            }
+        )
+        text = json.dumps(items)
+    return text
+
+
+def outputs(size: int) -> Dict[str, str]:
+    payload = _flights(size)
+    prose = (PROSE * (size // len(PROSE) + 1))[:size]
+    return {
+        "clean": payload,
+        "fenced": f"Here are the options:\n```json\n{payload}\n```\nLet me know if you need more.",
+        "trailing_prose": payload + "\n\n" + prose,
+        "bracket_prose": prose + "\n" + payload,
+        "truncated": payload[: int(len(payload) * 0.9)],
+    }
+
+
+def streamed(text: str, chunk: int = 16) -> Optional[Any]:
+    extractor = JsonExtractor()
+    for start in range(0, len(text), chunk):
+        if extractor.feed(text[start:start + chunk]) is not None:
+            break
+    return extractor.finish()
+
+
+def time_ms(fn: Callable[[str], Any], text: str, budget: float) -> float:
+    runs = 0
+    started = perf_counter()
+    while True:
+        fn(text)
+        runs += 1
+        elapsed = perf_counter() - started
+        if elapsed >= budget:
+            return 1000 * elapsed / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON extraction from synthetic model output.")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="Comma-separated sizes: " + ", ".join(SIZES))
+    parser.add_argument("--budget", type=float, default=0.2, help="Seconds spent timing each case.")
+    args = parser.parse_args()
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for label in args.sizes.split(","):
+        report[label] = {}
+        for case, text in outputs(SIZES[label]).items():
+            legacy_ms = time_ms(legacy_parse_json, text, args.budget)
+            extract_ms = time_ms(extract_json, text, args.budget)
+            report[label][case] = {
+                "legacy_ms": round(legacy_ms, 4),
+                "extract_ms": round(extract_ms, 4),
+                "streamed_ms": round(time_ms(streamed, text, args.budget), 4),
+                "speedup": round(legacy_ms / extract_ms, 2),
+                "matches_legacy": legacy_parse_json(text) == extract_json(text),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
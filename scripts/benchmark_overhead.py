@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import contextlib
+import gzip
+import json
+import os
+import statistics
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter, perf_counter_ns
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+
+from travel_agent import server
+from travel_agent.admission import AdmissionController
+from travel_agent.app import _needs_flight, _needs_hotel, build_graph
+from travel_agent.encoding import dumps
+from travel_agent.history import reset_history
+from travel_agent.inventory import FareTable, Inventory
+from travel_agent.pool import GraphPool
+from travel_agent.results import parse_result
+
+# The fake model is a test double kept under tests/, which a script run from the checkout can import.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tests.travel_agent.fake_model import FakeModel  # noqa: E402
+
+MESSAGES = [
+    "SFO to LAX, depart 2025-01-10, return 2025-01-14, flights and hotels",
+    "Flights only from BCN to NAP on 2026-02-10, price in USD",
+    "I need a hotel in Los Angeles for 2025-01-10. No flights.",
+    "Plan a weekend in Rome with somewhere to stay",
+]
+_MEMO = "_travel_agent_parsed"
+INVENTORY = Path(__file__).resolve().parents[1] / "data" / "inventory"
+SEARCH_NODES = ("flight_search", "hotel_search")
+
+
+def _forget(result: Any) -> None:
+    # Drop memoized parses so the parse stage is measured cold.
+    for holder in (result, *getattr(result, "results", {}).values()):
+        with contextlib.suppress(AttributeError):
+            delattr(holder, _MEMO)
+
+
+def ns_per_op(fn: Callable[[], Any], budget: float) -> Dict[str, Any]:
+    runs = 0
+    started = perf_counter_ns()
+    deadline = started + int(budget * 1e9)
+    while True:
+        fn()
+        runs += 1
+        now = perf_counter_ns()
+        if now >= deadline:
+            return {"ns_per_op": (now - started) // runs, "ops": runs}
+
+
+async def async_ns_per_op(fn: Callable[[], Awaitable[Any]], budget: float) -> Dict[str, Any]:
+    runs = 0
+    started = perf_counter_ns()
+    deadline = started + int(budget * 1e9)
+    while True:
+        await fn()
+        runs += 1
+        now = perf_counter_ns()
+        if now >= deadline:
+            return {"ns_per_op": (now - started) // runs, "ops": runs}
+
+
+def configure_server(model: FakeModel, pool_size: int, fast_router: bool) -> None:
+    # The same state server._lifespan sets up, minus cache, sessions and coalescing.
+    server._pool = GraphPool(lambda: build_graph(model, fast_router=fast_router), size=pool_size)
+    server._admission = AdmissionController(pool_size)
+    server._cache = None
+    server._sessions = None
+    server._coalescer = None
+    server._warmup = None
+
+
+async def stages(model: FakeModel, fast_router: bool, budget: float) -> Dict[str, Any]:
+    graph = build_graph(model, fast_router=fast_router)
+    message = MESSAGES[0]
+    result = await graph.invoke_async(message)
+
+    def parse_cold() -> None:
+        _forget(result)
+        parse_result(result)
+
+    def build_response() -> None:
+        _forget(result)
+        server._build_response(result)
+
+    # What the edges see in a run: a state holding only the orchestrator's result, not yet parsed.
+    state = SimpleNamespace(results={"orchestrator": result.results["orchestrator"]})
+
+    def edge_conditions() -> None:
+        _forget(state)
+        _needs_flight(state)
+        _needs_hotel(state)
+
+    async def invoke() -> None:
+        reset_history(graph)
+        await graph.invoke_async(message)
+
+    return {
+        "build_graph": ns_per_op(lambda: build_graph(model, fast_router=fast_router), budget),
+        "parse_result": ns_per_op(parse_cold, budget),
+        "edge_conditions": ns_per_op(edge_conditions, budget),
+        "build_response": ns_per_op(build_response, budget),
+        "graph_invoke": await async_ns_per_op(invoke, budget),
+        "ask": await async_ns_per_op(lambda: server.ask(message), budget),
+    }
+
+
+async def payload(model: FakeModel, fast_router: bool, budget: float) -> Dict[str, Any]:
+    result = await build_graph(model, fast_router=fast_router).invoke_async(MESSAGES[0])
+    report: Dict[str, Any] = {}
+    for view, fields, compact in (("full", None, False), ("compact", server.COMPACT_FIELDS, True)):
+
+        def build() -> Dict[str, Any]:
+            _forget(result)
+            return server._select(server._build_response(result, None, fields, compact), fields)
+
+        response = build()
+        body = dumps(response)
+        report[view] = {
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, 6)),
+            "build": ns_per_op(build, budget),
+            "encode": ns_per_op(lambda: dumps(response), budget),
+        }
+    # What FastAPI does with a returned dict: walk it with jsonable_encoder, then json.dumps.
+    full = server._build_response(result)
+    report["full"]["stdlib_bytes"] = len(json.dumps(full).encode("utf-8"))
+    report["full"]["stdlib_encode"] = ns_per_op(lambda: json.dumps(jsonable_encoder(full)).encode("utf-8"), budget)
+    return report
+
+
+def synthetic_fares(rows: int) -> List[Dict[str, Any]]:
+    airports = ["SFO", "LAX", "JFK", "LHR", "BCN", "NAP", "FCO", "CDG", "AMS", "MAD"]
+    fares = []
+    for index in range(rows):
+        origin = airports[index % len(airports)]
+        destination = airports[(index // len(airports)) % len(airports)]
+        fares.append(
+            {
+                "carrier": "Fake Air",
+                "flight": f"FA{index}",
+                "origin": origin,
+                "destination": destination,
+                "depart": f"2025-01-{1 + index % 28:02d}",
+                "return": "",
+                "price": 50 + (index * 7919) % 900,
+                "currency": "EUR",
+            }
+        )
+    return fares
+
+
+async def search_nodes(args: argparse.Namespace, fast_router: bool) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    sample = Inventory.load(str(INVENTORY / "flights.csv"), str(INVENTORY / "hotels.csv"))
+    for mode, inventory in (("generated", None), ("inventory", sample)):
+        model = FakeModel(latency=args.latency, results=args.results, token_latency=args.token_latency)
+        graph = build_graph(model, fast_router=fast_router, inventory=inventory)
+        tokens = {node_id: 0 for node_id in SEARCH_NODES}
+        times: Dict[str, List[float]] = {node_id: [] for node_id in SEARCH_NODES}
+        for message in MESSAGES:
+            reset_history(graph)
+            result = await graph.invoke_async(message)
+            for node_id in SEARCH_NODES:
+                node_result = result.results.get(node_id)
+                if node_result is not None:
+                    tokens[node_id] += node_result.accumulated_usage.get("outputTokens", 0)
+                    times[node_id].append(node_result.execution_time)
+        report[mode] = {
+            node_id: {
+                "runs": len(times[node_id]),
+                "output_tokens": tokens[node_id],
+                "mean_ms": round(statistics.fmean(times[node_id]), 2) if times[node_id] else None,
+            }
+            for node_id in SEARCH_NODES
+        }
+    return report
+
+
+def inventory_lookups(rows: int, budget: float) -> Dict[str, Any]:
+    fares = synthetic_fares(rows)
+    started = perf_counter()
+    table = FareTable(fares)
+    build_s = perf_counter() - started
+    return {
+        "rows": rows,
+        "build_s": round(build_s, 3),
+        "route_date": ns_per_op(lambda: table.search("SFO", "LAX", "2025-01-11"), budget),
+        "route": ns_per_op(lambda: table.search("SFO", "LAX"), budget),
+    }
+
+
+async def chat_throughput(clients: int, requests: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        counter = iter(range(requests))
+
+        async def worker() -> None:
+            for index in counter:
+                started = perf_counter()
+                response = await client.post("/chat", json={"message": MESSAGES[index % len(MESSAGES)]})
+                latencies.append(1000 * (perf_counter() - started))
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = perf_counter() - started
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "clients": clients,
+        "requests": requests,
+        "requests_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(cuts[49], 2),
+        "p99_ms": round(cuts[98], 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def memory_per_request(requests: int) -> Dict[str, Any]:
+    for message in MESSAGES:
+        await server.ask(message)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.take_snapshot()
+        peaks = []
+        for index in range(requests):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await server.ask(MESSAGES[index % len(MESSAGES)])
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    finally:
+        tracemalloc.stop()
+    return {
+        "requests": requests,
+        "peak_bytes_per_request": int(statistics.median(peaks)),
+        "retained_bytes_per_request": retained // requests,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    model = FakeModel(latency=args.latency, results=args.results)
+    fast_router = not args.no_fast_router
+    configure_server(model, args.clients, fast_router)
+    return {
+        "config": {
+            "latency_s": args.latency,
+            "results": args.results,
+            "fast_router": fast_router,
+            "clients": args.clients,
+        },
+        "stages": await stages(model, fast_router, args.budget),
+        "payload": await payload(model, fast_router, args.budget),
+        "search_nodes": await search_nodes(args, fast_router),
+        "inventory_lookups": inventory_lookups(args.inventory_rows, args.budget),
+        "chat": await chat_throughput(args.clients, args.requests),
+        "memory": await memory_per_request(args.memory_requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure our own overhead around the model with a fake backend.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake model latency per call in seconds.")
+    parser.add_argument("--results", type=int, default=3, help="Flights and hotels returned per search.")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent /chat clients (also the pool size).")
+    parser.add_argument("--requests", type=int, default=200, help="Total /chat requests for the throughput run.")
+    parser.add_argument("--memory-requests", type=int, default=50, help="Requests traced for memory per request.")
+    parser.add_argument(
+        "--token-latency", type=float, default=0.01, help="Fake seconds per generated token for the search-node runs."
+    )
+    parser.add_argument("--inventory-rows", type=int, default=100_000, help="Synthetic fares for the lookup timing.")
+    parser.add_argument("--budget", type=float, default=0.5, help="Seconds spent timing each stage.")
+    parser.add_argument("--no-fast-router", action="store_true", help="Always send the orchestrator to the model.")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this path.")
+    args = parser.parse_args()
+
+    # Agents print streamed tokens; keep that cost but not the noise.
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import json
+import random
+import statistics
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from travel_agent.similarity import SimilarityCache
+
+AIRPORTS = "SFO LAX SEA JFK BOS ORD ATL DFW DEN MIA LHR CDG FRA AMS MAD BCN FCO NAP MUC ZRH VIE CPH ARN HEL".split()
+SERVICES = ("flights", "hotels", "flights and hotels")
+# A trip is (origin, destination, day, service); stored and asked wordings differ on purpose.
+STORED = (
+    "flights from {origin} to {destination} on {iso}",
+    "{service} from {origin} to {destination} on {iso}",
+)
+ASKED: Tuple[Callable[..., str], ...] = (
+    lambda origin, destination, day, service: f"{origin}→{destination} {day:%b} {day.day} {service}",
+    lambda origin, destination, day, service: f"I need {service} {origin} to {destination}, {day:%B} {day.day}",
+    lambda origin, destination, day, service: f"{service.capitalize()} {origin} to {destination} on {day.isoformat()}!",
+)
+
+
+def trips(count: int, seed: int) -> List[Tuple[str, str, date, str]]:
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    seen = set()
+    while len(seen) < count:
+        origin, destination = rng.sample(AIRPORTS, 2)
+        seen.add((origin, destination, start + timedelta(days=rng.randrange(365)), rng.choice(SERVICES)))
+    return sorted(seen)
+
+
+def stored_message(origin: str, destination: str, day: date, service: str) -> str:
+    template = STORED[0] if service == "flights" else STORED[1]
+    return template.format(origin=origin, destination=destination, iso=day.isoformat(), service=service)
+
+
+def timed_lookups(cache: SimilarityCache, queries: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    latencies = []
+    hits = wrong = missed = 0
+    for message, expected in queries:
+        started = perf_counter()
+        found = cache.get(message)
+        latencies.append(perf_counter() - started)
+        if found is None:
+            missed += expected is not None
+        else:
+            hits += 1
+            wrong += found[0] != expected
+    latencies.sort()
+    return {
+        "queries": len(queries),
+        "hit_rate": round(hits / len(queries), 4),
+        "wrong_hits": wrong,
+        "missed": missed,
+        "lookup_us": {
+            "mean": round(1e6 * statistics.fmean(latencies), 1),
+            "p50": round(1e6 * latencies[len(latencies) // 2], 1),
+            "p99": round(1e6 * latencies[int(len(latencies) * 0.99)], 1),
+        },
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed + 1)
+    stored = trips(args.entries, args.seed)
+    cache = SimilarityCache(capacity=args.entries, threshold=args.threshold, ttl=3600, dim=args.dim)
+    started = perf_counter()
+    for index, trip in enumerate(stored):
+        cache.set(stored_message(*trip), index)
+    fill = perf_counter() - started
+
+    sample = rng.sample(range(len(stored)), args.queries)
+    paraphrases = [(rng.choice(ASKED)(*stored[index]), index) for index in sample]
+    # Same wording as a stored trip but the next day, which only that day's own trip may answer.
+    index_of = {trip: index for index, trip in enumerate(stored)}
+    shifted = []
+    for index in sample:
+        origin, destination, day, service = stored[index]
+        trip = origin, destination, day + timedelta(days=1), service
+        shifted.append((stored_message(*trip), index_of.get(trip)))
+    return {
+        "entries": args.entries,
+        "dim": args.dim,
+        "threshold": args.threshold,
+        "fill_us_per_entry": round(1e6 * fill / args.entries, 1),
+        "matrix_mb": round(cache.matrix.nbytes / 1e6, 1),
+        "paraphrases": timed_lookups(cache, paraphrases),
+        "shifted_dates": timed_lookups(cache, shifted),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Similarity cache hit rate and lookup time over many past requests.")
+    parser.add_argument("--entries", type=int, default=100_000, help="Past requests held in the cache.")
+    parser.add_argument("--queries", type=int, default=1000, help="Lookups per query set.")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Cosine similarity needed for a hit.")
+    parser.add_argument("--dim", type=int, default=256, help="Hashed n-gram vector width.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
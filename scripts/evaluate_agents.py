@@ -1,14 +1,26 @@
 import argparse
 import csv
 import json
-import os
+import statistics
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from time import perf_counter
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from travel_agent.app import build_graph
-from travel_agent.server import _parse_json, _result_text
+import jsonschema
+
+from travel_agent.app import build_graph, router_path
+from travel_agent.history import reset_history
+from travel_agent.pool import GraphPool
+from travel_agent.results import node_output, parse_result
+from travel_agent.schemas import FLIGHT_SCHEMA, HOTEL_SCHEMA, ORCHESTRATOR_SCHEMA
+from travel_agent.tracing import root
+
+NODES = ("orchestrator", "flight_search", "hotel_search")
+SCHEMAS = {"orchestrator": ORCHESTRATOR_SCHEMA, "flight_search": FLIGHT_SCHEMA, "hotel_search": HOTEL_SCHEMA}
+MAX_TEXT = 2000
 
 
 def load_cases(path: Path) -> List[Dict[str, Any]]:
@@ -16,20 +28,178 @@ def load_cases(path: Path) -> List[Dict[str, Any]]:
         return json.load(handle)
 
 
+def _schema_valid(node_id: str, node_result: Any) -> bool:
+    payload = node_output(node_result).payload
+    if payload is None:
+        return False
+    try:
+        jsonschema.validate(payload, SCHEMAS[node_id])
+    except jsonschema.ValidationError:
+        return False
+    return True
+
+
+def compact_outputs(result: Any) -> Dict[str, Any]:
+    # Parsed records instead of the AgentResult repr; raw text only when a node's JSON did not parse.
+    parsed = parse_result(result)
+    outputs: Dict[str, Any] = {}
+    if parsed.orchestrator is not None:
+        outputs["orchestrator"] = parsed.orchestrator.payload or parsed.texts["orchestrator"][:MAX_TEXT]
+    for node_id, records in (("flight_search", parsed.flight_dicts()), ("hotel_search", parsed.hotel_dicts())):
+        if node_id in parsed.texts:
+            outputs[node_id] = records if records is not None else parsed.texts[node_id][:MAX_TEXT]
+    return outputs
+
+
 def run_graph(graph, query: str) -> Dict[str, Any]:
+    reset_history(graph)
     result = graph(query)
     results = getattr(result, "results", {})
-    flights = _parse_json(_result_text(results.get("flight_search")))
-    hotels = _parse_json(_result_text(results.get("hotel_search")))
+    parsed = parse_result(result)
+    flights = parsed.flight_dicts()
+    hotels = parsed.hotel_dicts()
+    orchestrator = results.get("orchestrator")
+    output_tokens = {
+        node_id: (getattr(node_result, "accumulated_usage", None) or {}).get("outputTokens", 0)
+        for node_id, node_result in results.items()
+    }
     return {
         "status": getattr(result, "status", None),
         "execution_time_ms": getattr(result, "execution_time", None),
+        "router": router_path(orchestrator) if orchestrator else None,
+        "orchestrator_ms": getattr(orchestrator, "execution_time", None),
+        "node_ms": {node_id: getattr(node_result, "execution_time", None) for node_id, node_result in results.items()},
+        "schema_valid": {
+            node_id: _schema_valid(node_id, node_result)
+            for node_id, node_result in results.items()
+            if node_id in SCHEMAS
+        },
         "flights": flights,
         "hotels": hotels,
+        "outputs": compact_outputs(result),
+        "output_tokens": output_tokens,
         "raw_results": {k: str(v) for k, v in results.items()},
     }
 
 
+def run_case(pool: GraphPool, case: Dict[str, Any], decoding: str) -> Dict[str, Any]:
+    start = perf_counter()
+    error = None
+    try:
+        with root("eval_case", case=case.get("id", ""), decoding=decoding), pool.checkout() as graph:
+            output = run_graph(graph, case["query"])
+    except Exception as exc:
+        output = {"status": "error", "node_ms": {}, "schema_valid": {}, "outputs": None, "output_tokens": {}}
+        error = f"{type(exc).__name__}: {exc}"
+    elapsed_ms = round((perf_counter() - start) * 1000)
+    status = output.get("status")
+    return {
+        "id": case.get("id", ""),
+        "category": case.get("category", ""),
+        "query": case.get("query", ""),
+        "expected": case.get("expected", ""),
+        "status": getattr(status, "value", status),
+        "elapsed_ms": elapsed_ms,
+        "router": output.get("router"),
+        "decoding": decoding,
+        "error": error,
+        "outputs": output["outputs"],
+        **{f"{node_id}_ms": output["node_ms"].get(node_id) for node_id in NODES},
+        **{f"{node_id}_valid": output["schema_valid"].get(node_id) for node_id in NODES},
+        **{f"{node_id}_tokens": output["output_tokens"].get(node_id) for node_id in NODES},
+    }
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50_ms": None, "p90_ms": None, "p99_ms": None}
+    cuts = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+    return {"p50_ms": round(float(cuts[49]), 1), "p90_ms": round(float(cuts[89]), 1), "p99_ms": round(float(cuts[98]), 1)}
+
+
+def summarize(rows: List[Dict[str, Any]], wall_s: float, workers: int) -> Dict[str, Any]:
+    ok = [row for row in rows if row["error"] is None]
+    nodes = {}
+    for node_id in NODES:
+        timings = [row[f"{node_id}_ms"] for row in ok if row[f"{node_id}_ms"] is not None]
+        checks = [row[f"{node_id}_valid"] for row in ok if row[f"{node_id}_valid"] is not None]
+        nodes[node_id] = {
+            "runs": len(timings),
+            **percentiles(timings),
+            "schema_valid_rate": round(sum(checks) / len(checks), 4) if checks else None,
+        }
+    return {
+        "cases": len(rows),
+        "workers": workers,
+        "errors": len(rows) - len(ok),
+        "error_rate": round((len(rows) - len(ok)) / len(rows), 4) if rows else 0.0,
+        "wall_s": round(wall_s, 3),
+        "throughput_cps": round(len(rows) / wall_s, 3) if wall_s else None,
+        **percentiles([row["elapsed_ms"] for row in ok]),
+        "nodes": nodes,
+    }
+
+
+def _metrics(summary: Dict[str, Any]) -> Dict[str, Tuple[Optional[float], bool]]:
+    # Each metric carries whether a higher value is better.
+    metrics = {key: (summary.get(key), False) for key in ("p50_ms", "p90_ms", "p99_ms", "error_rate")}
+    metrics["throughput_cps"] = (summary.get("throughput_cps"), True)
+    for node_id, node in summary.get("nodes", {}).items():
+        metrics[f"{node_id}.p90_ms"] = (node.get("p90_ms"), False)
+        metrics[f"{node_id}.schema_valid_rate"] = (node.get("schema_valid_rate"), True)
+    return metrics
+
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for decoding, current in summary.items():
+        if decoding not in baseline:
+            continue
+        before = _metrics(baseline[decoding])
+        for name, (after, higher_is_better) in _metrics(current).items():
+            prior = before.get(name, (None, False))[0]
+            if prior is None or after is None:
+                continue
+            worse = after < prior * (1 - tolerance) if higher_is_better else after > prior * (1 + tolerance)
+            if worse:
+                regressions.append(f"{decoding} {name}: {prior} -> {after}")
+    return regressions
+
+
+def summarize_router(rows: List[Dict[str, Any]]) -> str:
+    routed = [row for row in rows if row["router"]]
+    if not routed:
+        return "Router: no orchestrator results."
+    rule = [row["orchestrator_ms"] or 0 for row in routed if row["router"] == "rule"]
+    llm = [row["orchestrator_ms"] or 0 for row in routed if row["router"] == "llm"]
+    summary = f"Router: fast path {len(rule)}/{len(routed)} ({len(rule) / len(routed):.0%})"
+    if rule and llm:
+        rule_ms = sum(rule) / len(rule)
+        llm_ms = sum(llm) / len(llm)
+        saved_ms = (llm_ms - rule_ms) * len(rule)
+        summary += (
+            f", orchestrator avg {rule_ms:.0f}ms fast vs {llm_ms:.0f}ms LLM,"
+            f" ~{saved_ms:.0f}ms saved"
+        )
+    return summary
+
+
+def summarize_tokens(rows: List[Dict[str, Any]]) -> str:
+    lines = ["Output tokens per node (avg over runs that reached the node):"]
+    for decoding in dict.fromkeys(row["decoding"] for row in rows):
+        parts = []
+        for node_id in NODES:
+            counts = [
+                row[f"{node_id}_tokens"]
+                for row in rows
+                if row["decoding"] == decoding and row[f"{node_id}_tokens"] is not None
+            ]
+            if counts:
+                parts.append(f"{node_id} {sum(counts) / len(counts):.0f}")
+        lines.append(f"  {decoding}: " + (", ".join(parts) or "no node results"))
+    return "\n".join(lines)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Evaluate travel agents.")
     parser.add_argument(
@@ -42,6 +212,29 @@ def main() -> None:
         default="evaluation_results",
         help="Directory for evaluation outputs.",
     )
+    parser.add_argument(
+        "--decoding",
+        choices=["constrained", "prompt", "both"],
+        default="constrained",
+        help="Schema-constrained decoding, prompt-only JSON, or both for a before/after comparison.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Cases run concurrently, each worker on its own graph.",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Summary JSON from an earlier run; exit non-zero if this run regresses against it.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Relative change allowed against the baseline before it counts as a regression.",
+    )
     args = parser.parse_args()
 
     cases_path = Path(args.cases)
@@ -49,9 +242,21 @@ def main() -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
 
     cases = load_cases(cases_path)
-    graph = build_graph()
+    modes = ["prompt", "constrained"] if args.decoding == "both" else [args.decoding]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     results_path = output_dir / f"graph_results_{timestamp}.csv"
+    summary_path = output_dir / f"graph_summary_{timestamp}.json"
+    outputs_path = output_dir / f"graph_outputs_{timestamp}.jsonl"
+
+    rows = []
+    summary = {}
+    for decoding in modes:
+        pool = GraphPool(lambda: build_graph(constrained=decoding == "constrained"), size=args.workers)
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            mode_rows = list(executor.map(lambda case: run_case(pool, case, decoding), cases))
+        summary[decoding] = summarize(mode_rows, perf_counter() - start, args.workers)
+        rows.extend(mode_rows)
 
     with results_path.open("w", encoding="utf-8", newline="") as handle:
         writer = csv.DictWriter(
@@ -63,25 +268,43 @@ def main() -> None:
                 "expected",
                 "status",
                 "elapsed_ms",
+                "router",
+                "decoding",
+                "error",
+                *(f"{node_id}_ms" for node_id in NODES),
+                *(f"{node_id}_valid" for node_id in NODES),
+                *(f"{node_id}_tokens" for node_id in NODES),
             ],
+            extrasaction="ignore",
         )
         writer.writeheader()
-        for case in cases:
-            start = perf_counter()
-            output = run_graph(graph, case["query"])
-            elapsed_ms = round((perf_counter() - start) * 1000)
-            writer.writerow(
-                {
-                    "id": case.get("id", ""),
-                    "category": case.get("category", ""),
-                    "query": case.get("query", ""),
-                    "expected": case.get("expected", ""),
-                    "status": output.get("status"),
-                    "elapsed_ms": elapsed_ms,
-                }
-            )
+        writer.writerows(rows)
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    # Compact per-case outputs that scripts/llm_judge.py can judge without rerunning the graph.
+    with outputs_path.open("w", encoding="utf-8") as handle:
+        for row in rows:
+            keys = ("id", "query", "expected", "decoding", "status", "error", "outputs")
+            handle.write(json.dumps({key: row[key] for key in keys}) + "\n")
 
+    print(summarize_router(rows))
+    print(summarize_tokens(rows))
+    for decoding, totals in summary.items():
+        print(
+            f"{decoding}: {totals['cases']} cases, {totals['throughput_cps']} cases/s, "
+            f"p50 {totals['p50_ms']}ms p90 {totals['p90_ms']}ms p99 {totals['p99_ms']}ms, "
+            f"error rate {totals['error_rate']:.1%}"
+        )
     print(f"Saved results to {results_path}")
+    print(f"Saved summary to {summary_path}")
+    print(f"Saved outputs to {outputs_path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(summary, baseline, args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}")
+        if regressions:
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,23 @@
 import argparse
 import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from strands import Agent
 from strands.models.ollama import OllamaModel
 
+from evaluate_agents import compact_outputs
 from travel_agent.app import build_graph
+from travel_agent.history import reset_history
+from travel_agent.jsonstream import extract_json
+from travel_agent.pool import GraphPool
+from travel_agent.replay import replay_from_env
+from travel_agent.tracing import TraceHooks, get_tracer, root, span
 
 
 EVAL_PROMPT = """You are an expert AI evaluator. Your job is to assess the quality of AI responses based on:
@@ -16,7 +25,19 @@ EVAL_PROMPT = """You are an expert AI evaluator. Your job is to assess the quali
 2. Relevance - how well the response addresses the query
 3. Completeness - whether all aspects of the query are addressed
 4. Tool usage - appropriate use of available tools
-Score each criterion from 1-5, where 1 is poor and 5 is excellent. Provide an overall score and brief explanation."""
+Score each criterion from 1-5, where 1 is poor and 5 is excellent. Provide an overall score and brief explanation.
+Reply with JSON only: {"accuracy": n, "relevance": n, "completeness": n, "tool_usage": n, "overall": n, "explanation": "..."}"""
+
+CRITERIA = ("accuracy", "relevance", "completeness", "tool_usage", "overall")
+JUDGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **{name: {"type": "integer", "minimum": 1, "maximum": 5} for name in CRITERIA},
+        "explanation": {"type": "string"},
+    },
+    "required": [*CRITERIA, "explanation"],
+}
+_SCORE = re.compile(r"(accuracy|relevance|completeness|tool[ _]usage|overall)\W{0,20}?([1-5])\b", re.IGNORECASE)
 
 
 def load_cases(path: Path) -> List[Dict[str, Any]]:
@@ -24,6 +45,67 @@ def load_cases(path: Path) -> List[Dict[str, Any]]:
         return json.load(handle)
 
 
+def load_jsonl(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def load_outputs(path: Optional[str], decoding: Optional[str]) -> Dict[str, Any]:
+    if not path:
+        return {}
+    outputs = {}
+    for row in load_jsonl(Path(path)):
+        if row.get("error") or row.get("outputs") is None:
+            continue
+        if decoding and row.get("decoding") != decoding:
+            continue
+        outputs.setdefault(row["id"], row["outputs"])
+    return outputs
+
+
+def _score(value: Any) -> Optional[int]:
+    try:
+        score = int(value)
+    except (TypeError, ValueError):
+        return None
+    return score if 1 <= score <= 5 else None
+
+
+def parse_scores(text: str) -> Dict[str, Any]:
+    payload = extract_json(text)
+    if isinstance(payload, dict):
+        scores = {name: _score(payload.get(name)) for name in CRITERIA}
+        explanation = payload.get("explanation")
+    else:
+        # Free-text verdicts such as "Accuracy: 4/5".
+        found = {match.group(1).lower().replace(" ", "_"): _score(match.group(2)) for match in _SCORE.finditer(text)}
+        scores = {name: found.get(name) for name in CRITERIA}
+        explanation = None
+    criteria = [scores[name] for name in CRITERIA[:-1] if scores[name] is not None]
+    if scores["overall"] is None and criteria:
+        scores["overall"] = round(sum(criteria) / len(criteria))
+    return {**scores, "explanation": explanation if isinstance(explanation, str) else text.strip()}
+
+
+def judge_prompt(case: Dict[str, Any], outputs: Any) -> str:
+    return (
+        "Query:\n"
+        f"{case['query']}\n\n"
+        "Response to evaluate (parsed agent outputs):\n"
+        f"{json.dumps(outputs, ensure_ascii=False)}\n\n"
+        "Expected response (if available):\n"
+        f"{case.get('expected', 'Not provided')}\n"
+    )
+
+
+def _build_evaluator(host: str, model_id: str) -> Agent:
+    model = OllamaModel(host=host, model_id=model_id, temperature=0.0, additional_args={"format": JUDGE_SCHEMA})
+    hooks = [TraceHooks()] if get_tracer() is not None else None
+    return Agent(model=replay_from_env(model), system_prompt=EVAL_PROMPT, callback_handler=None, hooks=hooks)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="LLM judge evaluation runner.")
     parser.add_argument(
@@ -46,45 +128,97 @@ def main() -> None:
         default=os.getenv("EVAL_OLLAMA_HOST", "http://localhost:11434"),
         help="Ollama host for evaluator model.",
     )
+    parser.add_argument(
+        "--results",
+        default=None,
+        help="graph_outputs_*.jsonl from evaluate_agents.py; only cases missing from it run the graph.",
+    )
+    parser.add_argument(
+        "--decoding",
+        default=None,
+        help="Judge only outputs recorded with this decoding mode from --results.",
+    )
+    parser.add_argument(
+        "--judges",
+        type=int,
+        default=4,
+        help="Evaluator calls in flight at once.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Graphs run at once for cases without recorded outputs.",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        help="Checkpoint JSONL from an interrupted run; judged cases are skipped and new ones appended.",
+    )
     args = parser.parse_args()
 
     cases_path = Path(args.cases)
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    checkpoint_path = Path(args.resume) if args.resume else output_dir / f"llm_judge_{timestamp}.jsonl"
 
-    evaluator = Agent(
-        model=OllamaModel(host=args.host, model_id=args.model),
-        system_prompt=EVAL_PROMPT,
-    )
-    graph = build_graph()
-
-    results = []
-    for case in load_cases(cases_path):
-        query = case["query"]
-        agent_response = graph(query)
-        eval_prompt = (
-            "Query:\n"
-            f"{query}\n\n"
-            "Response to evaluate:\n"
-            f"{agent_response}\n\n"
-            "Expected response (if available):\n"
-            f"{case.get('expected', 'Not provided')}\n"
-        )
-        evaluation = evaluator(eval_prompt)
-        results.append(
-            {
-                "test_id": case.get("id", ""),
-                "query": query,
-                "agent_response": str(agent_response),
-                "evaluation": str(evaluation),
-            }
-        )
+    cases = load_cases(cases_path)
+    recorded = load_outputs(args.results, args.decoding)
+    done = {row["test_id"]: row for row in load_jsonl(checkpoint_path)}
+    pending = [case for case in cases if case.get("id", "") not in done]
+    missing = sum(1 for case in pending if case.get("id", "") not in recorded)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    evaluators = GraphPool(lambda: _build_evaluator(args.host, args.model), size=args.judges)
+    graphs = GraphPool(build_graph, size=args.workers) if missing else None
+    lock = threading.Lock()
+
+    def judge(case: Dict[str, Any]) -> Dict[str, Any]:
+        test_id = case.get("id", "")
+        outputs = recorded.get(test_id)
+        try:
+            with root("judge_case", case=test_id):
+                if outputs is None:
+                    with graphs.checkout() as graph:
+                        reset_history(graph)
+                        outputs = compact_outputs(graph(case["query"]))
+                # Each stage has its own pool, so graph runs and evaluator calls overlap across cases.
+                with evaluators.checkout() as evaluator, span("evaluate"):
+                    evaluator.messages = []
+                    evaluation = str(evaluator(judge_prompt(case, outputs)))
+        except Exception as exc:
+            # Left out of the checkpoint so a resumed run retries it.
+            return {"test_id": test_id, "query": case["query"], "error": f"{type(exc).__name__}: {exc}"}
+        row = {
+            "test_id": test_id,
+            "query": case["query"],
+            "agent_response": outputs,
+            "evaluation": evaluation,
+            "scores": parse_scores(evaluation),
+        }
+        with lock, checkpoint_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(row) + "\n")
+        return row
+
+    with ThreadPoolExecutor(max_workers=args.judges + (args.workers if missing else 0)) as executor:
+        for row in executor.map(judge, pending):
+            done[row["test_id"]] = row
+
+    results = [done[case.get("id", "")] for case in cases if case.get("id", "") in done]
     output_path = output_dir / f"llm_judge_{timestamp}.json"
     with output_path.open("w", encoding="utf-8") as handle:
         json.dump(results, handle, indent=2)
 
+    judged = [row for row in results if "scores" in row]
+    for name in CRITERIA:
+        scores = [row["scores"][name] for row in judged if row["scores"][name] is not None]
+        average = f"{sum(scores) / len(scores):.2f}" if scores else "n/a"
+        print(f"{name}: {average} ({len(scores)}/{len(results)} scored)")
+    failed = len(results) - len(judged)
+    print(
+        f"Judged {len(pending) - failed} cases ({len(pending) - missing} from recorded outputs), "
+        f"{len(cases) - len(pending)} resumed, {failed} failed"
+    )
     print(f"Saved LLM judge results to {output_path}")
 
 
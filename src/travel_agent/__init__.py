@@ -1,3 +1,26 @@
-__all__ = ["build_graph"]
+from typing import TYPE_CHECKING, Any, List
 
-from travel_agent.app import build_graph
+__all__ = ["build_graph", "main"]
+
+# Resolved on first access: build_graph pulls in Strands and the Ollama client, which
+# `travel-agent --help` and most light imports never need.
+_LAZY = {"build_graph": "travel_agent.app", "main": "travel_agent.main"}
+
+if TYPE_CHECKING:
+    from travel_agent.app import build_graph
+    from travel_agent.main import main
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,92 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class Overloaded(RuntimeError):
+    def __init__(self, message: str, retry_after: int = 1, queue_full: bool = False) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.queue_full = queue_full
+
+
+# Caps concurrent graph runs on the event loop; excess requests wait in a bounded queue.
+class AdmissionController:
+    def __init__(self, limit: int, max_waiting: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        if limit < 1:
+            raise ValueError("Admission limit must be at least 1.")
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._run_seconds = 0.0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def retry_after(self) -> int:
+        # Time for the queue ahead to drain at the recent per-run latency.
+        backlog = (self.waiting + 1) / self.limit
+        return max(1, math.ceil(backlog * self._run_seconds))
+
+    async def acquire(self) -> float:
+        if self._semaphore.locked() and self.max_waiting is not None and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise Overloaded(
+                f"Admission queue is full ({self.max_waiting}).",
+                retry_after=self.retry_after(),
+                queue_full=True,
+            )
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            if self.timeout is None:
+                await self._semaphore.acquire()
+            else:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError as exc:
+            self.timeouts += 1
+            self.rejected += 1
+            raise Overloaded("Timed out waiting for a free slot.", retry_after=self.retry_after()) from exc
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - start
+        self.in_flight += 1
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return time.perf_counter()
+
+    def release(self, started: Optional[float] = None) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            self._run_seconds = elapsed if not self._run_seconds else 0.8 * self._run_seconds + 0.2 * elapsed
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        started = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": 1000 * self.wait_seconds_total / self.admitted if self.admitted else 0.0,
+            "wait_ms_max": 1000 * self.wait_seconds_max,
+        }
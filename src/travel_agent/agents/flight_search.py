@@ -1,21 +1,30 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, ClassVar, Dict, List, Optional
 
 from strands import Agent
 from strands.models.ollama import OllamaModel
 
+from travel_agent.schemas import FLIGHT_SCHEMA
+
 
 @dataclass
 class FlightSearchAgent:
-    def build(self, model: Optional[OllamaModel] = None) -> Agent:
-        return Agent(
-            name="flight_search",
-            model=model,
-            system_prompt=(
-                "You search flights. Return ONLY a JSON array of exactly 3 flight objects. "
-                "Schema: {carrier: string, flight: string, route: string, depart: string, "
-                "return: string, price: number, currency: string}. Currency must be EUR by "
-                "default and must match the customer's requested currency if specified. "
-                "No prose, no markdown, JSON only."
-            ),
+    name: ClassVar[str] = "flight_search"
+    schema: ClassVar[Dict[str, Any]] = FLIGHT_SCHEMA
+    max_tokens: int = 512
+    temperature: float = 0.2
+
+    def build(self, model: Optional[OllamaModel] = None, tools: Optional[List[Any]] = None) -> Agent:
+        system_prompt = (
+            "You search flights. Return ONLY a JSON array of exactly 3 flight objects. "
+            "Schema: {carrier: string, flight: string, route: string, depart: string, "
+            "return: string, price: number, currency: string}. Give prices in any currency "
+            "with its code, EUR if unsure; they are converted and sorted afterwards. "
+            "No prose, no markdown, JSON only."
         )
+        if tools:
+            system_prompt += (
+                " Look flights up with the search_flights tool first and return the flights it finds unchanged; "
+                "only make flights up when it finds none."
+            )
+        return Agent(name=self.name, model=model, system_prompt=system_prompt, tools=tools)
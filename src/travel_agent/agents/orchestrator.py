@@ -1,15 +1,22 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, ClassVar, Dict, Optional
 
 from strands import Agent
 from strands.models.ollama import OllamaModel
 
+from travel_agent.schemas import ORCHESTRATOR_SCHEMA
+
 
 @dataclass
 class OrchestratorAgent:
+    name: ClassVar[str] = "orchestrator"
+    schema: ClassVar[Dict[str, Any]] = ORCHESTRATOR_SCHEMA
+    max_tokens: int = 128
+    temperature: float = 0.0
+
     def build(self, model: Optional[OllamaModel] = None) -> Agent:
         return Agent(
-            name="orchestrator",
+            name=self.name,
             model=model,
             system_prompt=(
                 "You are a travel request orchestrator. Read the user request and "
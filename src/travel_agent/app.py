@@ -1,66 +1,278 @@
+import asyncio
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from strands import Agent
+from strands.agent import AgentResult
 from strands.multiagent import GraphBuilder
 from strands.multiagent.graph import GraphState
+from strands.models import Model
 from strands.models.ollama import OllamaModel
+from strands.telemetry.metrics import EventLoopMetrics
 
 from travel_agent.agents import FlightSearchAgent, HotelSearchAgent, OrchestratorAgent
-
-
-def _extract_text(node_result: Any) -> str:
-    if not node_result:
-        return ""
-    result = getattr(node_result, "result", None)
-    message = getattr(result, "message", None) if result else None
-    content = getattr(message, "content", None) if message else None
-    if content:
-        chunks = []
-        for block in content:
-            text = getattr(block, "text", None)
-            if text:
-                chunks.append(text)
-        if chunks:
-            return "\n".join(chunks)
-    return str(result) if result is not None else ""
-
-
-def _read_orchestrator_payload(state: GraphState) -> Dict[str, Any]:
-    orchestrator_result = state.results.get("orchestrator")
-    text = _extract_text(orchestrator_result)
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        return {"raw": text}
+from travel_agent.backends import PooledOllamaModel, shared_backend_pool
+from travel_agent.cache import ResultCache, trip_key
+from travel_agent.inventory import Inventory, inventory_from_env, search_tools
+from travel_agent.replay import replay_from_env
+from travel_agent.results import parse_result
+from travel_agent.router import route_request
+from travel_agent.singleflight import SingleFlight
+from travel_agent.tracing import TraceHooks, get_tracer
 
 
 def _needs_flight(state: GraphState) -> bool:
-    payload = _read_orchestrator_payload(state)
-    if "needs_flight" in payload:
-        return bool(payload["needs_flight"])
-    return "flight" in payload.get("raw", "").lower()
+    decision = parse_result(state).orchestrator
+    return decision is not None and decision.needs_flight
 
 
 def _needs_hotel(state: GraphState) -> bool:
-    payload = _read_orchestrator_payload(state)
-    if "needs_hotel" in payload:
-        return bool(payload["needs_hotel"])
-    return "hotel" in payload.get("raw", "").lower()
+    decision = parse_result(state).orchestrator
+    return decision is not None and decision.needs_hotel
+
+
+def _prompt_text(prompt: Any) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(block["text"] for block in prompt or [] if "text" in block)
+
+
+def _text_result(text: str, state: Dict[str, Any]) -> AgentResult:
+    return AgentResult(
+        stop_reason="end_turn",
+        message={"role": "assistant", "content": [{"text": text}]},
+        metrics=EventLoopMetrics(),
+        state=state,
+    )
+
+
+class _AgentWrapper:
+    def __init__(self, agent: Agent) -> None:
+        self.agent = agent
+        self.name = agent.name
+
+    @property
+    def messages(self):
+        return self.agent.messages
+
+    @messages.setter
+    def messages(self, value) -> None:
+        self.agent.messages = value
+
+    @property
+    def state(self):
+        return self.agent.state
+
+    @state.setter
+    def state(self, value) -> None:
+        self.agent.state = value
+
+    @property
+    def event_loop_metrics(self):
+        return self.agent.event_loop_metrics
+
+    @event_loop_metrics.setter
+    def event_loop_metrics(self, value) -> None:
+        self.agent.event_loop_metrics = value
+
+    def _answer(self, prompt: Any, text: str, state: Dict[str, Any]) -> AgentResult:
+        result = _text_result(text, state)
+        # Keep the turn in history so session mode sees the same transcript as the LLM path.
+        self.agent.messages.append({"role": "user", "content": [{"text": _prompt_text(prompt)}]})
+        self.agent.messages.append(result.message)
+        return result
+
+    async def stream_async(self, prompt: Any = None, **kwargs: Any):
+        async for event in self.agent.stream_async(prompt, **kwargs):
+            yield event
+
+    async def invoke_async(self, prompt: Any = None, **kwargs: Any) -> AgentResult:
+        result = None
+        async for event in self.stream_async(prompt, **kwargs):
+            if "result" in event:
+                result = event["result"]
+        return result
+
+    def __call__(self, prompt: Any = None, **kwargs: Any) -> AgentResult:
+        return asyncio.run(self.invoke_async(prompt, **kwargs))
+
+
+# Answers structured requests with the rule router and defers the rest to the LLM agent.
+class FastPathOrchestrator(_AgentWrapper):
+    async def stream_async(self, prompt: Any = None, **kwargs: Any):
+        decision = route_request(_prompt_text(prompt))
+        if decision is None:
+            async for event in self.agent.stream_async(prompt, **kwargs):
+                yield event
+            return
+        yield {"result": self._answer(prompt, json.dumps(decision), {"router": "rule"})}
+
+
+def _decode_first(text: str, opener: str, start: int = 0) -> Optional[Any]:
+    decoder = json.JSONDecoder()
+    index = text.find(opener, start)
+    while index != -1:
+        try:
+            return decoder.raw_decode(text, index)[0]
+        except json.JSONDecodeError:
+            index = text.find(opener, index + 1)
+    return None
+
+
+def _search_cache_key(node_id: str, text: str) -> str:
+    marker = text.find("From orchestrator:")
+    # Speculative runs see only the raw request; the rule router normalizes it the same way.
+    payload = _decode_first(text, "{", marker) if marker != -1 else route_request(text)
+    if isinstance(payload, dict) and payload.get("query"):
+        return trip_key(node_id, str(payload["query"]), payload.get("currency"))
+    return trip_key(node_id, text)
+
+
+# Identical searches running at the same time in any graph wait on one generation.
+search_coalescer = SingleFlight()
+
+
+# Serves repeated trips from the shared result cache instead of a fresh generation.
+class CachedSearchAgent(_AgentWrapper):
+    def __init__(self, agent: Agent, cache: ResultCache) -> None:
+        super().__init__(agent)
+        self.cache = cache
+
+    async def stream_async(self, prompt: Any = None, **kwargs: Any):
+        key = _search_cache_key(self.name, _prompt_text(prompt))
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield {"result": self._answer(prompt, json.dumps(cached), {"cache": "hit"})}
+            return
+
+        future, leader = search_coalescer.join(key)
+        if not leader:
+            try:
+                shared = await asyncio.shield(future)
+            except Exception:
+                shared = None
+            if shared:
+                yield {"result": self._answer(prompt, json.dumps(shared), {"cache": "coalesced"})}
+                return
+
+        final = None
+        items = None
+        try:
+            async for event in self.agent.stream_async(prompt, **kwargs):
+                if "result" in event:
+                    final = event["result"]
+                yield event
+            items = _decode_first(str(final), "[") if final is not None else None
+            if not (isinstance(items, list) and items):
+                items = None
+            if items is not None:
+                self.cache.set(key, items)
+        finally:
+            if leader:
+                search_coalescer.settle(key, future, items)
+
+
+# Answers searches that name the whole trip straight from the inventory tables; the
+# rest go to the agent, which can still call the inventory tools itself.
+class InventorySearchAgent(_AgentWrapper):
+    def __init__(self, agent: Any, inventory: Inventory) -> None:
+        super().__init__(agent)
+        self.inventory = inventory
+
+    async def stream_async(self, prompt: Any = None, **kwargs: Any):
+        items = self.inventory.lookup(self.name, _prompt_text(prompt))
+        if items:
+            yield {"result": self._answer(prompt, json.dumps(items), {"inventory": "hit"})}
+            return
+        async for event in self.agent.stream_async(prompt, **kwargs):
+            yield event
+
+
+def _result_state(node_result: Any) -> Dict[str, Any]:
+    state = getattr(getattr(node_result, "result", None), "state", None)
+    return state if isinstance(state, dict) else {}
+
+
+def router_path(node_result: Any) -> str:
+    return "rule" if _result_state(node_result).get("router") == "rule" else "llm"
+
+
+def cache_status(node_result: Any) -> str:
+    status = _result_state(node_result).get("cache")
+    return status if status in {"hit", "coalesced"} else "miss"
+
+
+def inventory_status(node_result: Any) -> str:
+    return "hit" if _result_state(node_result).get("inventory") == "hit" else "miss"
+
+
+def _fast_router_enabled() -> bool:
+    return os.getenv("TRAVEL_AGENT_FAST_ROUTER", "true").lower() in {"1", "true", "yes"}
+
+
+def _constrained_enabled() -> bool:
+    return os.getenv("TRAVEL_AGENT_CONSTRAINED", "true").lower() in {"1", "true", "yes"}
 
 
-def _build_model() -> OllamaModel:
+def _build_model(agent: Any, constrained: Optional[bool] = None) -> Model:
     host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-    model_id = os.getenv("OLLAMA_MODEL", "llama3.1")
-    return OllamaModel(host=host, model_id=model_id)
+    node = agent.name.upper()
+    # Routing is a short classification, so the orchestrator can run a smaller model.
+    model_id = os.getenv(f"OLLAMA_MODEL_{node}") or os.getenv("OLLAMA_MODEL", "llama3.1")
+    config: Dict[str, Any] = {
+        "max_tokens": int(os.getenv(f"OLLAMA_MAX_TOKENS_{node}", str(agent.max_tokens))),
+        "temperature": float(os.getenv(f"OLLAMA_TEMPERATURE_{node}", str(agent.temperature))),
+    }
+    keep_alive = os.getenv("OLLAMA_KEEP_ALIVE")
+    if keep_alive:
+        # Ollama reads bare numbers as seconds ("-1" keeps the model loaded) and strings as durations.
+        config["keep_alive"] = int(keep_alive) if keep_alive.lstrip("-").isdigit() else keep_alive
+    if constrained is None:
+        constrained = _constrained_enabled()
+    if constrained:
+        # Ollama turns the JSON schema into a grammar, so replies are valid JSON by construction.
+        config["additional_args"] = {"format": agent.schema}
+    backends = shared_backend_pool()
+    if backends is not None:
+        return replay_from_env(PooledOllamaModel(backends, model_id=model_id, **config))
+    return replay_from_env(OllamaModel(host=host, model_id=model_id, **config))
 
 
-def build_graph():
-    model = _build_model()
+def build_graph(
+    model: Optional[Model] = None,
+    fast_router: Optional[bool] = None,
+    cache: Optional[ResultCache] = None,
+    constrained: Optional[bool] = None,
+    inventory: Optional[Inventory] = None,
+):
+    if fast_router is None:
+        fast_router = _fast_router_enabled()
+    if inventory is None:
+        inventory = inventory_from_env()
+    tools = search_tools(inventory) if inventory is not None else {}
+    orchestrator_spec = OrchestratorAgent()
+    orchestrator = orchestrator_spec.build(model or _build_model(orchestrator_spec, constrained))
+    # Ollama's format grammar leaves no room for a tool call, so nodes with tools rely on the prompt.
+    flight_search, hotel_search = (
+        spec.build(model or _build_model(spec, False if spec.name in tools else constrained), tools.get(spec.name))
+        for spec in (FlightSearchAgent(), HotelSearchAgent())
+    )
     builder = GraphBuilder()
-    builder.add_node(OrchestratorAgent().build(model), "orchestrator")
-    builder.add_node(FlightSearchAgent().build(model), "flight_search")
-    builder.add_node(HotelSearchAgent().build(model), "hotel_search")
+    if get_tracer() is not None:
+        hooks = TraceHooks()
+        builder.set_hook_providers([hooks])
+        for agent in (orchestrator, flight_search, hotel_search):
+            agent.hooks.add_hook(hooks)
+    if cache is not None:
+        flight_search = CachedSearchAgent(flight_search, cache)
+        hotel_search = CachedSearchAgent(hotel_search, cache)
+    if inventory is not None:
+        flight_search = InventorySearchAgent(flight_search, inventory)
+        hotel_search = InventorySearchAgent(hotel_search, inventory)
+    builder.add_node(FastPathOrchestrator(orchestrator) if fast_router else orchestrator, "orchestrator")
+    builder.add_node(flight_search, "flight_search")
+    builder.add_node(hotel_search, "hotel_search")
 
     builder.add_edge("orchestrator", "flight_search", condition=_needs_flight)
     builder.add_edge("orchestrator", "hotel_search", condition=_needs_hotel)
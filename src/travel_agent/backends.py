@@ -0,0 +1,225 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import ollama
+from strands.models import Model
+from strands.models.ollama import OllamaModel
+
+
+class NoHealthyBackend(RuntimeError):
+    pass
+
+
+class Backend:
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+def _base_url(host: str) -> str:
+    host = host.rstrip("/")
+    return host if "://" in host else f"http://{host}"
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, (httpx.TransportError, ConnectionError)):
+        return True
+    return isinstance(error, ollama.ResponseError) and error.status_code >= 500
+
+
+# Least-outstanding-requests balancing over Ollama hosts. A failed host sits out
+# for a cooldown, then gets live traffic again unless a probe finds it still down.
+class BackendPool:
+    def __init__(self, hosts: Iterable[str], cooldown: float = 10.0, probe_timeout: float = 2.0) -> None:
+        self.backends = [Backend(host) for host in hosts]
+        if not self.backends:
+            raise ValueError("Backend pool needs at least one host.")
+        self.hosts = tuple(backend.host for backend in self.backends)
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+
+    def acquire(self, exclude: Iterable[str] = ()) -> Backend:
+        now = time.monotonic()
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [
+                backend
+                for backend in self.backends
+                if backend.host not in excluded and (backend.healthy or backend.retry_at <= now)
+            ]
+            if not candidates:
+                raise NoHealthyBackend("No healthy Ollama backend available.")
+            # Rotate the starting point so ties spread across hosts.
+            turn = next(self._turn) % len(candidates)
+            rotated = candidates[turn:] + candidates[:turn]
+            backend = min(rotated, key=lambda item: (not item.healthy, item.outstanding))
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: Backend, ok: bool = True) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            self._mark(backend, ok)
+
+    def _mark(self, backend: Backend, ok: bool) -> None:
+        if ok:
+            backend.healthy = True
+            return
+        backend.healthy = False
+        backend.failures += 1
+        backend.retry_at = time.monotonic() + self.cooldown
+
+    async def check(self) -> Dict[str, bool]:
+        async with httpx.AsyncClient(timeout=self.probe_timeout) as client:
+            results = await asyncio.gather(*(self._probe(client, backend) for backend in self.backends))
+        return dict(zip(self.hosts, results))
+
+    async def _probe(self, client: httpx.AsyncClient, backend: Backend) -> bool:
+        try:
+            response = await client.get(f"{_base_url(backend.host)}/api/tags")
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        with self._lock:
+            self._mark(backend, ok)
+        return ok
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [backend.as_dict() for backend in self.backends]
+
+
+async def run_health_checks(pool: BackendPool, interval: float) -> None:
+    while True:
+        await pool.check()
+        await asyncio.sleep(interval)
+
+
+# One OllamaModel per host, all sharing the same config; each call goes to the
+# least busy healthy host and fails over while nothing has been streamed yet.
+class PooledOllamaModel(Model):
+    def __init__(self, pool: BackendPool, **model_config: Any) -> None:
+        self.pool = pool
+        self.models = {host: OllamaModel(host, **model_config) for host in pool.hosts}
+
+    def update_config(self, **model_config: Any) -> None:
+        for model in self.models.values():
+            model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.models[self.pool.hosts[0]].get_config()
+
+    def _next(self, tried: List[str], error: Optional[BaseException]) -> Backend:
+        try:
+            backend = self.pool.acquire(exclude=tried)
+        except NoHealthyBackend:
+            if error is not None:
+                raise error
+            raise
+        tried.append(backend.host)
+        return backend
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Optional[Any] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        tried: List[str] = []
+        error: Optional[BaseException] = None
+        while True:
+            backend = self._next(tried, error)
+            # OllamaModel emits start events before the request goes out; hold them
+            # back so a connection failure can still move to another host.
+            pending: Optional[List[Dict[str, Any]]] = []
+            failed = False
+            try:
+                model = self.models[backend.host]
+                async for event in model.stream(messages, tool_specs, system_prompt, **kwargs):
+                    if pending is not None:
+                        if "messageStart" in event or "contentBlockStart" in event:
+                            pending.append(event)
+                            continue
+                        for held in pending:
+                            yield held
+                        pending = None
+                    yield event
+                for held in pending or []:
+                    yield held
+                return
+            except Exception as exc:
+                failed = _retryable(exc)
+                if not (failed and pending is not None):
+                    raise
+                error = exc
+            finally:
+                self.pool.release(backend, ok=not failed)
+
+    async def structured_output(
+        self, output_model: Any, prompt: Any, system_prompt: Optional[str] = None, **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        tried: List[str] = []
+        error: Optional[BaseException] = None
+        while True:
+            backend = self._next(tried, error)
+            failed = False
+            try:
+                events = []
+                model = self.models[backend.host]
+                async for event in model.structured_output(output_model, prompt, system_prompt, **kwargs):
+                    events.append(event)
+            except Exception as exc:
+                failed = _retryable(exc)
+                if not failed:
+                    raise
+                error = exc
+                continue
+            finally:
+                self.pool.release(backend, ok=not failed)
+            for event in events:
+                yield event
+            return
+
+
+def hosts_from_env() -> Tuple[str, ...]:
+    value = os.getenv("OLLAMA_HOSTS", "")
+    hosts = tuple(host.strip() for host in value.split(",") if host.strip())
+    return hosts or (os.getenv("OLLAMA_HOST", "http://localhost:11434"),)
+
+
+_shared_pool: Optional[BackendPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_backend_pool() -> Optional[BackendPool]:
+    global _shared_pool
+    hosts = hosts_from_env()
+    if len(hosts) < 2:
+        return None
+    # Every graph in the process shares one pool so outstanding counts are global.
+    with _shared_lock:
+        if _shared_pool is None or _shared_pool.hosts != hosts:
+            _shared_pool = BackendPool(hosts, cooldown=float(os.getenv("OLLAMA_BACKEND_COOLDOWN", "10")))
+        return _shared_pool
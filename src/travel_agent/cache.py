@@ -0,0 +1,167 @@
+import abc
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from travel_agent.router import parse_trip
+
+_PUNCTUATION = re.compile(r"[^\w\s-]")
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def trip_key(node_id: str, query: str, currency: Optional[str] = None) -> str:
+    trip = parse_trip(query)
+    return json.dumps(
+        [
+            node_id,
+            trip.origin,
+            trip.destination,
+            trip.dates,
+            (currency or trip.currency or "EUR").upper(),
+            normalize_query(query),
+        ],
+        separators=(",", ":"),
+    )
+
+
+class ResultCache(abc.ABC):
+    def __init__(self, max_entries: int = 1024, ttl: float = 900.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key, time.time())
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        evicted = self._set(key, value, time.time())
+        with self._counter_lock:
+            self.evictions += evicted
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self)}
+
+    @abc.abstractmethod
+    def __len__(self) -> int: ...
+
+    @abc.abstractmethod
+    def _get(self, key: str, now: float) -> Optional[Any]: ...
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: Any, now: float) -> int: ...
+
+
+class MemoryCache(ResultCache):
+    def __init__(self, max_entries: int = 1024, ttl: float = 900.0) -> None:
+        super().__init__(max_entries, ttl)
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str, now: float) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, now: float) -> int:
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+
+# Shared across uvicorn worker processes through one sqlite file in WAL mode.
+class SqliteCache(ResultCache):
+    def __init__(self, path: str, max_entries: int = 1024, ttl: float = 900.0) -> None:
+        super().__init__(max_entries, ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS node_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS node_cache_used ON node_cache (used)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM node_cache").fetchone()[0]
+
+    def _get(self, key: str, now: float) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM node_cache WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE node_cache SET used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: Any, now: float) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM node_cache WHERE expires <= ?", (now,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO node_cache (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now + self.ttl, now),
+                )
+                evicted = self._conn.execute(
+                    "DELETE FROM node_cache WHERE key IN ("
+                    "SELECT key FROM node_cache ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return evicted
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def cache_from_env() -> Optional[ResultCache]:
+    backend = os.getenv("TRAVEL_AGENT_CACHE", "memory").lower()
+    max_entries = int(os.getenv("TRAVEL_AGENT_CACHE_SIZE", "1024"))
+    ttl = float(os.getenv("TRAVEL_AGENT_CACHE_TTL", "900"))
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, ttl=ttl)
+    if backend == "sqlite":
+        path = os.getenv("TRAVEL_AGENT_CACHE_PATH", "travel_agent_cache.sqlite3")
+        return SqliteCache(path, max_entries=max_entries, ttl=ttl)
+    if backend in {"", "off", "none", "false", "0"}:
+        return None
+    raise ValueError(f"Unknown TRAVEL_AGENT_CACHE backend: {backend}")
@@ -0,0 +1,73 @@
+import json
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Both optional: pip install travel-agent[fast]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Returned directly from handlers, which also skips FastAPI's jsonable_encoder pass over the dict.
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None and "br" in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, self._brotli_sender(send))
+        else:
+            await self.gzip(scope, receive, send)
+
+    def _brotli_sender(self, send: Send) -> Send:
+        start: Optional[Message] = None
+
+        async def sender(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is not None and message["type"] == "http.response.body":
+                headers = MutableHeaders(raw=start["headers"])
+                body = message.get("body", b"")
+                # Only whole bodies; streamed responses such as SSE pass through untouched.
+                if (
+                    not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "content-encoding" not in headers
+                ):
+                    body = brotli.compress(body, quality=self.brotli_quality)
+                    headers["Content-Encoding"] = "br"
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": body}
+            if start is not None:
+                await send(start)
+                start = None
+            await send(message)
+
+        return sender
@@ -0,0 +1,111 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+Messages = List[Dict[str, Any]]
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text and JSON.
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    total = 0
+    for block in message.get("content", []):
+        text = block.get("text")
+        if text:
+            total += estimate_tokens(text)
+    return total
+
+
+def trim_history(messages: Messages, max_tokens: int) -> Messages:
+    sizes = [message_tokens(message) for message in messages]
+    total = sum(sizes)
+    start = 0
+    while start < len(messages) and total > max_tokens:
+        total -= sizes[start]
+        start += 1
+    # A window must open on a user turn, never on a dangling assistant reply.
+    while start < len(messages) and messages[start].get("role") != "user":
+        start += 1
+    return messages[start:]
+
+
+def _reset_metrics(executor: Any) -> None:
+    # Agents accumulate usage across invocations; start each request from zero
+    # so node results report that request's tokens only.
+    metrics = getattr(executor, "event_loop_metrics", None)
+    if metrics is not None:
+        executor.event_loop_metrics = type(metrics)()
+
+
+def reset_history(graph: Any) -> None:
+    for node in graph.nodes.values():
+        node.reset_executor_state()
+        _reset_metrics(node.executor)
+
+
+def restore_history(graph: Any, histories: Dict[str, Messages]) -> None:
+    for node_id, node in graph.nodes.items():
+        node.reset_executor_state()
+        _reset_metrics(node.executor)
+        if hasattr(node.executor, "messages"):
+            node.executor.messages = copy.deepcopy(histories.get(node_id, []))
+
+
+def capture_history(graph: Any) -> Dict[str, Messages]:
+    return {
+        node_id: copy.deepcopy(node.executor.messages)
+        for node_id, node in graph.nodes.items()
+        if getattr(node.executor, "messages", None)
+    }
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 1000, idle_ttl: float = 1800.0, max_tokens: int = 2000) -> None:
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_tokens = max_tokens
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, tuple[float, Dict[str, Messages]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def load(self, session_id: str) -> Dict[str, Messages]:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return {}
+            self._sessions.move_to_end(session_id)
+            return copy.deepcopy(entry[1])
+
+    def save(self, session_id: str, histories: Dict[str, Messages]) -> None:
+        trimmed = {
+            node_id: trim_history(messages, self.max_tokens)
+            for node_id, messages in histories.items()
+        }
+        with self._lock:
+            now = time.monotonic()
+            self._sessions[session_id] = (now, trimmed)
+            self._sessions.move_to_end(session_id)
+            self._evict_idle(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def _evict_idle(self, now: float) -> None:
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions": len(self._sessions), "evictions": self.evictions}
@@ -0,0 +1,285 @@
+import abc
+import array
+import csv
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from travel_agent.router import _read_all, parse_trip, route_request
+
+FORMATS = (".csv", ".jsonl", ".parquet")
+_IATA = re.compile(r"^[A-Z]{3}$")
+
+
+class InventoryError(ValueError):
+    pass
+
+
+def _price(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def load_rows(path: str) -> Iterator[Dict[str, Any]]:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as handle:
+            yield from csv.DictReader(handle)
+    elif suffix == ".jsonl":
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    elif suffix == ".parquet":
+        try:
+            import pyarrow.parquet
+        except ImportError as exc:
+            raise InventoryError(f"Reading {path} needs pyarrow: pip install pyarrow") from exc
+        yield from pyarrow.parquet.read_table(path).to_pylist()
+    else:
+        raise InventoryError(f"Unsupported inventory file {path}; expected one of {', '.join(FORMATS)}")
+
+
+# Column-oriented rows: one interned string list per text column and one array of prices.
+# Every index maps a key to the ids of its rows in price order, so top-k is a slice.
+class _Table(abc.ABC):
+    columns: Tuple[str, ...] = ()
+    price_column = ""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self.text: Dict[str, List[str]] = {name: [] for name in self.columns}
+        self.prices = array.array("d")
+        for row in rows:
+            price = _price(row.get(self.price_column))
+            if price is None:
+                continue
+            for name in self.columns:
+                self.text[name].append(sys.intern(str(row.get(name) or "").strip()))
+            self.prices.append(price)
+        self.indexes: Dict[str, Dict[Tuple[str, ...], array.array]] = {}
+        for row_id in sorted(range(len(self.prices)), key=self.prices.__getitem__):
+            for index, key in self._keys(row_id):
+                postings = self.indexes.setdefault(index, {})
+                if key not in postings:
+                    postings[key] = array.array("I")
+                postings[key].append(row_id)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @abc.abstractmethod
+    def _keys(self, row_id: int) -> Iterator[Tuple[str, Tuple[str, ...]]]: ...
+
+    @abc.abstractmethod
+    def record(self, row_id: int) -> Dict[str, Any]: ...
+
+    def top(self, index: str, key: Tuple[str, ...], limit: int) -> List[Dict[str, Any]]:
+        row_ids = self.indexes.get(index, {}).get(key)
+        if not row_ids:
+            return []
+        return [self.record(row_id) for row_id in row_ids[:limit]]
+
+
+class FareTable(_Table):
+    columns = ("carrier", "flight", "origin", "destination", "depart", "return", "currency")
+    price_column = "price"
+
+    def _keys(self, row_id: int) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        origin = self.text["origin"][row_id].upper()
+        destination = self.text["destination"][row_id].upper()
+        depart = self.text["depart"][row_id]
+        yield "route", (origin, destination)
+        yield "route_date", (origin, destination, depart)
+        yield "route_dates", (origin, destination, depart, self.text["return"][row_id])
+
+    def record(self, row_id: int) -> Dict[str, Any]:
+        text = self.text
+        return {
+            "carrier": text["carrier"][row_id],
+            "flight": text["flight"][row_id],
+            "route": f"{text['origin'][row_id]} -> {text['destination'][row_id]}",
+            "depart": text["depart"][row_id],
+            "return": text["return"][row_id],
+            "price": self.prices[row_id],
+            "currency": text["currency"][row_id] or "EUR",
+        }
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        depart: Optional[str] = None,
+        limit: int = 3,
+        return_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        route = (origin.strip().upper(), destination.strip().upper())
+        if depart and return_date:
+            return self.top("route_dates", (*route, depart.strip(), return_date.strip()), limit)
+        if depart:
+            return self.top("route_date", (*route, depart.strip()), limit)
+        return self.top("route", route, limit)
+
+
+class HotelTable(_Table):
+    # The optional airport column lets a destination code stand in for the city name.
+    columns = ("name", "city", "airport", "checkout", "currency")
+    price_column = "price_per_night"
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]) -> None:
+        super().__init__(rows)
+        # Longest names first, so "San Jose del Cabo" wins over "San Jose".
+        self.cities = sorted({city.lower() for city in self.text["city"] if city}, key=len, reverse=True)
+
+    def _keys(self, row_id: int) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        checkout = self.text["checkout"][row_id]
+        for place in (self.text["city"][row_id].lower(), self.text["airport"][row_id].upper()):
+            if place:
+                yield "place", (place,)
+                yield "place_checkout", (place, checkout)
+
+    def record(self, row_id: int) -> Dict[str, Any]:
+        text = self.text
+        return {
+            "name": text["name"][row_id],
+            "city": text["city"][row_id],
+            "checkout": text["checkout"][row_id],
+            "price_per_night": self.prices[row_id],
+            "currency": text["currency"][row_id] or "EUR",
+        }
+
+    def search(self, city: str, checkout: Optional[str] = None, limit: int = 3) -> List[Dict[str, Any]]:
+        city = city.strip()
+        place = city.upper() if _IATA.match(city) else city.lower()
+        if checkout:
+            return self.top("place_checkout", (place, checkout.strip()), limit)
+        return self.top("place", (place,), limit)
+
+    def find_city(self, text: str) -> Optional[str]:
+        lowered = text.lower()
+        return next((city for city in self.cities if city in lowered), None)
+
+
+def _request(text: str) -> str:
+    # Search nodes get "Original Task: <request>" followed by the orchestrator's reply;
+    # speculative runs get the request alone.
+    task = text.partition("\n\nInputs from previous nodes:")[0]
+    return task[len("Original Task: ") :] if task.startswith("Original Task: ") else task
+
+
+class Inventory:
+    def __init__(self, flights: Optional[FareTable] = None, hotels: Optional[HotelTable] = None) -> None:
+        self.flights = flights
+        self.hotels = hotels
+
+    @classmethod
+    def load(cls, flights_path: Optional[str] = None, hotels_path: Optional[str] = None) -> "Inventory":
+        return cls(
+            FareTable(load_rows(flights_path)) if flights_path else None,
+            HotelTable(load_rows(hotels_path)) if hotels_path else None,
+        )
+
+    def search_flights(
+        self,
+        origin: str,
+        destination: str,
+        depart: Optional[str] = None,
+        limit: int = 3,
+        return_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if self.flights is None:
+            return []
+        return self.flights.search(origin, destination, depart, limit, return_date)
+
+    def search_hotels(self, city: str, checkout: Optional[str] = None, limit: int = 3) -> List[Dict[str, Any]]:
+        if self.hotels is None:
+            return []
+        return self.hotels.search(city, checkout, limit)
+
+    def lookup(self, node: str, text: str, limit: int = 3) -> List[Dict[str, Any]]:
+        # Answers a search node straight from the tables when the request names the whole key
+        # and nothing else; any other constraint is left to the agent.
+        request = _request(text)
+        if route_request(request) is None:
+            return []
+        trip = parse_trip(request)
+        dates = trip.dates
+        if node == "flight_search" and self.flights is not None:
+            if trip.origin and trip.destination and dates:
+                return_date = dates[1] if len(dates) > 1 else None
+                return self.flights.search(trip.origin, trip.destination, dates[0], limit, return_date)
+        if node == "hotel_search" and self.hotels is not None and len(dates) > 1:
+            # The hotel is left on the return date; one-way requests have no checkout to match.
+            city = self.hotels.find_city(request)
+            if not trip.origin and not (city and _read_all(request, trip, (city,))):
+                return []
+            for place in (trip.destination, city):
+                found = self.hotels.search(place, dates[1], limit) if place else []
+                if found:
+                    return found
+        return []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fares": len(self.flights) if self.flights is not None else 0,
+            "hotels": len(self.hotels) if self.hotels is not None else 0,
+        }
+
+
+def search_tools(inventory: Inventory) -> Dict[str, List[Any]]:
+    # Deferred so the tables can be loaded and queried without importing Strands.
+    from strands import tool
+
+    @tool(
+        name="search_flights",
+        description=(
+            "Look up the cheapest flights in the fare inventory. origin and destination are IATA codes, "
+            "depart is YYYY-MM-DD (leave it out for any date), return_date is YYYY-MM-DD for round trips. "
+            "Returns up to limit flights sorted by price."
+        ),
+    )
+    def search_flights(
+        origin: str, destination: str, depart: Optional[str] = None, limit: int = 3, return_date: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return inventory.search_flights(origin, destination, depart, limit, return_date)
+
+    @tool(
+        name="search_hotels",
+        description=(
+            "Look up the cheapest hotels in the hotel inventory. city is a city name or airport code, "
+            "checkout is YYYY-MM-DD (leave it out for any date). Returns up to limit hotels sorted by price."
+        ),
+    )
+    def search_hotels(city: str, checkout: Optional[str] = None, limit: int = 3) -> List[Dict[str, Any]]:
+        return inventory.search_hotels(city, checkout, limit)
+
+    tools: Dict[str, List[Any]] = {}
+    if inventory.flights is not None:
+        tools["flight_search"] = [search_flights]
+    if inventory.hotels is not None:
+        tools["hotel_search"] = [search_hotels]
+    return tools
+
+
+_shared: Dict[Tuple[Optional[str], Optional[str]], Inventory] = {}
+_shared_lock = threading.Lock()
+
+
+# Every pooled graph reads the same tables, so they are loaded once per process.
+def inventory_from_env() -> Optional[Inventory]:
+    key = (os.getenv("TRAVEL_AGENT_INVENTORY_FLIGHTS") or None, os.getenv("TRAVEL_AGENT_INVENTORY_HOTELS") or None)
+    if key == (None, None):
+        return None
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = Inventory.load(*key)
+        return _shared[key]
@@ -0,0 +1,183 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_FENCE = re.compile(r"```json\s*([\s\S]*?)```", re.IGNORECASE)
+_OPENER = re.compile(r"[\[{]")
+# Skips plain text and complete strings in one match, stopping at the next bracket
+# (or depth-one comma) or at a string the chunk cuts off.
+_SKIP = re.compile(r'(?:[^\[\]{}"]++|"(?:[^"\\]++|\\[\s\S])*+")*+')
+_TOP_SKIP = re.compile(r'(?:[^\[\]{},"]++|"(?:[^"\\]++|\\[\s\S])*+")*+')
+_STRING_REST = re.compile(r'(?:[^"\\]++|\\[\s\S])*+(")?')
+# What may follow an opener in valid JSON, after any whitespace.
+_SPACE = re.compile(r"\s*+")
+_STARTS = {
+    "{": re.compile(r'["}]'),
+    "[": re.compile(r'[\[\]{"\-0-9tfn]'),
+}
+_DECODER = json.JSONDecoder()
+_SALVAGE_ATTEMPTS = 8
+
+
+def _loads(text: str) -> Tuple[Optional[Any], int]:
+    try:
+        return json.loads(text), -1
+    except json.JSONDecodeError as exc:
+        return None, exc.pos
+
+
+# Single pass over model output: tracks nesting and string state across chunks and
+# decodes each candidate once, when its outermost bracket closes.
+class JsonExtractor:
+    def __init__(self) -> None:
+        self.value: Optional[Any] = None
+        self.done = False
+        self._pending: List[str] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        self._chunks: List[str] = []
+        self._size = 0
+        self._opener = ""
+        self._stack: List[int] = []
+        self._spans: List[Tuple[int, int]] = []
+        self._in_string = False
+        self._escape = False
+        self._cuts: List[int] = []
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        if self.done or not chunk:
+            return self.value
+        # An open candidate can only complete on a closing bracket.
+        if self._stack and "]" not in chunk and "}" not in chunk:
+            self._pending.append(chunk)
+            return None
+        if self._pending:
+            self._pending.append(chunk)
+            chunk = "".join(self._pending)
+            self._pending = []
+        return self._consume(chunk)
+
+    def _consume(self, chunk: str, final: bool = False) -> Optional[Any]:
+        index = 0
+        length = len(chunk)
+        while index < length and not self.done:
+            if not self._stack:
+                match = _OPENER.search(chunk, index)
+                if match is None:
+                    return None
+                index = match.start()
+                after = _SPACE.match(chunk, index + 1).end()
+                if after == length and not final:
+                    # Whether this opener starts JSON depends on the next chunk, so hold it until then.
+                    self._pending.append(chunk[index:])
+                    return None
+                if _STARTS[chunk[index]].match(chunk, after) is None:
+                    index += 1
+                    continue
+                self._opener = chunk[index]
+                self._stack.append(0)
+                start = index
+                index += 1
+            else:
+                start = 0
+            index = self._scan(chunk, index, start)
+            if self._stack:
+                # The candidate is still open, so the rest of the chunk belongs to it.
+                self._chunks.append(chunk[start:])
+                self._size += length - start
+                break
+        return self.value
+
+    def _scan(self, chunk: str, index: int, start: int) -> int:
+        length = len(chunk)
+        offset = self._size - start
+        stack = self._stack
+        while index < length:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    index += 1
+                match = _STRING_REST.match(chunk, index)
+                index = match.end()
+                if match.group(1) is None:
+                    self._escape = index < length
+                    return length
+                self._in_string = False
+
+            index = (_TOP_SKIP if len(stack) == 1 else _SKIP).match(chunk, index).end()
+            if index >= length:
+                return length
+            char = chunk[index]
+            position = offset + index
+            index += 1
+            if char == '"':
+                self._in_string = True
+            elif char == ",":
+                self._cuts.append(position)
+            elif char in "[{":
+                stack.append(position)
+            else:
+                opened = stack.pop()
+                if stack:
+                    self._spans.append((opened, position))
+                    if len(stack) == 1:
+                        self._cuts.append(position + 1)
+                else:
+                    text = "".join(self._chunks) + chunk[start:index]
+                    self.value, self.done = self._resolve(text)
+                    self._reset()
+                    return index
+        return index
+
+    def _resolve(self, text: str) -> Tuple[Optional[Any], bool]:
+        value, failed_at = _loads(text)
+        if failed_at < 0:
+            return value, True
+        # Nested values that closed before the failure point are valid on their own,
+        # and values starting at or after it get their own attempt, in order.
+        for begin, end in sorted(self._spans):
+            if begin < failed_at <= end:
+                continue
+            value, error = _loads(text[begin:end + 1])
+            if error < 0:
+                return value, True
+            failed_at = max(failed_at, begin + error)
+        return None, False
+
+    def finish(self) -> Optional[Any]:
+        if self._pending:
+            pending = "".join(self._pending)
+            self._pending = []
+            self._consume(pending, final=True)
+        if self.done or not self._stack:
+            return self.value
+        text = "".join(self._chunks)
+        # Output cut off mid-array keeps the elements that were complete; the most
+        # recent cut points may sit in prose that followed the truncation.
+        if self._opener == "[":
+            for cut in reversed(self._cuts[-_SALVAGE_ATTEMPTS:]):
+                value, error = _loads(text[:cut] + "]")
+                if error < 0:
+                    self.value, self.done = value, True
+                    return value
+        self.value, self.done = self._resolve(text)
+        self._reset()
+        return self.value
+
+
+def extract_json(text: str) -> Optional[Any]:
+    if not text:
+        return None
+    fence = _FENCE.search(text)
+    raw = fence.group(1) if fence else text
+    match = _OPENER.search(raw)
+    if match is None:
+        return None
+    try:
+        return _DECODER.raw_decode(raw, match.start())[0]
+    except json.JSONDecodeError:
+        pass
+    extractor = JsonExtractor()
+    extractor.feed(raw[match.start():])
+    return extractor.finish()
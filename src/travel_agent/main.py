@@ -1,23 +1,18 @@
 import argparse
+import asyncio
+import contextlib
 import json
-from typing import Any, Dict
+import os
+import sys
+import time
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Set, Tuple
 
-from travel_agent.app import build_graph
+from travel_agent.history import reset_history
+from travel_agent.pool import GraphPool
+from travel_agent.results import parse_result
+from travel_agent.tracing import root
 
-
-def _result_text(node_result: Any) -> str:
-    result = getattr(node_result, "result", None)
-    message = getattr(result, "message", None) if result else None
-    content = getattr(message, "content", None) if message else None
-    if content:
-        chunks = []
-        for block in content:
-            text = getattr(block, "text", None)
-            if text:
-                chunks.append(text)
-        if chunks:
-            return "\n".join(chunks)
-    return str(result) if result is not None else ""
+SPEC_FIELDS = {"id", "origin", "destination", "depart", "return", "flight", "hotel"}
 
 
 def _json_safe(value: Any) -> Any:
@@ -37,6 +32,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--return", dest="return_date", default=None, help="Return date (YYYY-MM-DD).")
     parser.add_argument("--flight", action="store_true", help="Include flight search.")
     parser.add_argument("--hotel", action="store_true", help="Include hotel search.")
+    parser.add_argument(
+        "--batch", default=None, help="JSONL file of trips with the fields above ('return' for --return), or '-'."
+    )
+    parser.add_argument("--output", default=None, help="Batch results file; appended to and resumed if it exists.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("TRAVEL_AGENT_POOL_SIZE", "4")),
+        help="Trips run at once in batch mode, one graph each.",
+    )
     return parser.parse_args()
 
 
@@ -58,23 +63,157 @@ def build_state(args: argparse.Namespace) -> Dict[str, Any]:
     return {"request": ", ".join(parts) if parts else "Plan a trip."}
 
 
-def main() -> None:
-    args = parse_args()
-    state = build_state(args)
-    graph = build_graph()
-    result = graph(state["request"])
-    output: Dict[str, Any] = {
+def _build_graph() -> Any:
+    # Imported here so argument errors and --help do not wait on Strands.
+    from travel_agent.app import build_graph
+
+    return build_graph()
+
+
+def spec_args(spec: Dict[str, Any]) -> argparse.Namespace:
+    # The same fields as the single-trip flags, so build_state serves both.
+    unknown = sorted(set(spec) - SPEC_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown trip fields: {', '.join(unknown)}")
+    return argparse.Namespace(
+        origin=spec.get("origin"),
+        destination=spec.get("destination"),
+        depart=spec.get("depart"),
+        return_date=spec.get("return"),
+        flight=bool(spec.get("flight")),
+        hotel=bool(spec.get("hotel")),
+    )
+
+
+def read_specs(handle: IO[str]) -> Iterator[Tuple[str, Any]]:
+    # Trips without an id are keyed by line number, so resuming needs the same input file.
+    for number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            spec = json.loads(line)
+        except ValueError as exc:
+            yield str(number), exc
+            continue
+        if not isinstance(spec, dict):
+            yield str(number), ValueError("Each line must be a JSON object.")
+            continue
+        yield str(spec.get("id", number)), spec
+
+
+def completed_ids(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, "rb+") as handle:
+        data = handle.read()
+        # A crash can leave half a line behind; drop it so appended lines stay one per trip.
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            handle.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        # Failed trips are tried again.
+        if isinstance(record, dict) and record.get("error") is None and "id" in record:
+            done.add(str(record["id"]))
+    return done
+
+
+def trip_output(result: Any) -> Dict[str, Any]:
+    return {
         "status": _json_safe(getattr(result, "status", None)),
         "execution_time_ms": getattr(result, "execution_time", None),
-        "execution_order": [
-            getattr(node, "node_id", None)
-            for node in getattr(result, "execution_order", [])
-        ],
-        "results": {},
+        "execution_order": [getattr(node, "node_id", None) for node in getattr(result, "execution_order", [])],
+        "results": parse_result(result).texts,
     }
 
-    for node_id, node_result in getattr(result, "results", {}).items():
-        output["results"][node_id] = _result_text(node_result)
+
+async def _run_trip(pool: GraphPool, trip_id: str, spec: Any) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"id": trip_id, "request": None}
+    started = time.perf_counter()
+    try:
+        if isinstance(spec, Exception):
+            raise spec
+        record["request"] = build_state(spec_args(spec))["request"]
+        with root("cli", batch=True):
+            # At most one graph per worker, so this never waits.
+            graph = pool.acquire(timeout=0)
+            try:
+                reset_history(graph)
+                result = await graph.invoke_async(record["request"])
+            finally:
+                pool.release(graph)
+        record.update(trip_output(result))
+        record["error"] = None
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["elapsed_ms"] = round(1000 * (time.perf_counter() - started), 1)
+    return record
+
+
+async def run_batch(
+    specs: Iterator[Tuple[str, Any]],
+    out: IO[str],
+    graph_factory: Callable[[], Any],
+    concurrency: int = 4,
+    skip: Optional[Set[str]] = None,
+) -> Dict[str, Any]:
+    # Lazy, so a short input never builds more graphs than it has trips.
+    pool = GraphPool(graph_factory, size=concurrency, lazy=True)
+    # Bounded, so a large input file is read as workers free up rather than all at once.
+    pending: "asyncio.Queue[Optional[Tuple[str, Any]]]" = asyncio.Queue(maxsize=2 * concurrency)
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+    started = time.perf_counter()
+
+    async def produce() -> None:
+        for trip_id, spec in specs:
+            if skip and trip_id in skip:
+                counts["skipped"] += 1
+                continue
+            await pending.put((trip_id, spec))
+        for _ in range(concurrency):
+            await pending.put(None)
+
+    async def work() -> None:
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            record = await _run_trip(pool, item[0], item[1])
+            # Written and flushed as each trip finishes, which is what makes a run resumable.
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            counts["failed" if record["error"] else "done"] += 1
+
+    await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {**counts, "elapsed_s": round(elapsed, 3), "trips_per_s": round(counts["done"] / elapsed, 2)}
+
+
+def batch(args: argparse.Namespace) -> None:
+    skip = completed_ids(args.output) if args.output else None
+    with contextlib.ExitStack() as stack:
+        source = sys.stdin if args.batch == "-" else stack.enter_context(open(args.batch, encoding="utf-8"))
+        out = stack.enter_context(open(args.output, "a", encoding="utf-8")) if args.output else sys.stdout
+        # Agents echo tokens to stdout, which would interleave with the result lines.
+        stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        summary = asyncio.run(run_batch(read_specs(source), out, _build_graph, args.concurrency, skip))
+    print(json.dumps(summary), file=sys.stderr)
+
+
+def main() -> None:
+    args = parse_args()
+    if args.batch is not None:
+        batch(args)
+        return
+    state = build_state(args)
+    graph = _build_graph()
+    with root("cli"):
+        result = graph(state["request"])
+        output = trip_output(result)
 
     print(json.dumps(output, indent=2))
 
@@ -0,0 +1,190 @@
+import bisect
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from travel_agent.results import node_output, parse_result
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; model calls run from tens of milliseconds (fast path, cache) to minutes.
+DURATION_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Seconds; in-process lookups that should stay well under a millisecond.
+LOOKUP_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values]
+
+
+# Sampled at scrape time, so the request path pays nothing for it.
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], Optional[float]]) -> None:
+        super().__init__(name, help_text)
+        self.read = read
+
+    def render(self) -> List[str]:
+        value = self.read()
+        return [] if value is None else [f"{self.name} {_number(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket plus +Inf, then the running sum.
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+node_duration = REGISTRY.register(
+    Histogram("travel_agent_node_duration_seconds", "Time spent in each graph node.", ["node"])
+)
+request_duration = REGISTRY.register(
+    Histogram("travel_agent_request_duration_seconds", "End-to-end graph run time per endpoint.", ["endpoint"])
+)
+tokens = REGISTRY.register(
+    Counter("travel_agent_tokens_total", "Model tokens used per agent.", ["node", "kind"])
+)
+edges = REGISTRY.register(
+    Counter("travel_agent_edge_decisions_total", "Edge condition outcomes out of the orchestrator.", ["edge", "outcome"])
+)
+parse_failures = REGISTRY.register(
+    Counter("travel_agent_parse_failures_total", "Node replies with no JSON value in them.", ["node"])
+)
+similar_lookups = REGISTRY.register(
+    Counter("travel_agent_similar_cache_lookups_total", "Similarity cache lookups by outcome.", ["outcome"])
+)
+similar_lookup_duration = REGISTRY.register(
+    Histogram(
+        "travel_agent_similar_cache_lookup_seconds", "Time to find the nearest past request.", buckets=LOOKUP_BUCKETS
+    )
+)
+
+
+def observe_edge(edge: str, taken: bool) -> None:
+    edges.inc(edge, "taken" if taken else "skipped")
+
+
+def observe_edges(result: Any) -> None:
+    # Once per run from the orchestrator's decision: Strands evaluates edge conditions more
+    # than once, and speculative runs evaluate them outside the graph.
+    ran = {getattr(node, "node_id", None) for node in getattr(result, "execution_order", None) or []}
+    if "orchestrator" not in ran:
+        return
+    decision = parse_result(result).orchestrator
+    observe_edge("flight_search", decision is not None and decision.needs_flight)
+    observe_edge("hotel_search", decision is not None and decision.needs_hotel)
+
+
+def observe_result(result: Any, endpoint: str) -> None:
+    execution_time = getattr(result, "execution_time", None)
+    if execution_time is not None:
+        request_duration.observe(execution_time / 1000, endpoint)
+    observe_edges(result)
+    for node_id, node_result in (getattr(result, "results", None) or {}).items():
+        node_time = getattr(node_result, "execution_time", None)
+        if node_time is not None:
+            node_duration.observe(node_time / 1000, node_id)
+        usage = getattr(node_result, "accumulated_usage", None) or {}
+        if usage.get("inputTokens"):
+            tokens.inc(node_id, "prompt", amount=usage["inputTokens"])
+        if usage.get("outputTokens"):
+            tokens.inc(node_id, "completion", amount=usage["outputTokens"])
+        # Memoized by the response builder, so this is a lookup rather than a second parse.
+        if node_output(node_result).payload is None:
+            parse_failures.inc(node_id)
@@ -0,0 +1,81 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+class PoolExhausted(RuntimeError):
+    pass
+
+
+class GraphPool:
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int,
+        timeout: Optional[float] = None,
+        max_waiting: Optional[int] = None,
+        lazy: bool = False,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.size = size
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.factory = factory
+        self._idle: "queue.Queue[Any]" = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        # Lazy pools build a graph only when every built one is busy, so start-up pays for none.
+        self._unbuilt = size if lazy else 0
+        for _ in range(size - self._unbuilt):
+            self._idle.put_nowait(factory())
+
+    @property
+    def available(self) -> int:
+        return self._idle.qsize() + self._unbuilt
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def acquire(self, timeout: Optional[float] = None, build: bool = True) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            build = build and self._unbuilt > 0
+            if build:
+                self._unbuilt -= 1
+        if build:
+            try:
+                return self.factory()
+            except BaseException:
+                with self._lock:
+                    self._unbuilt += 1
+                raise
+
+        with self._lock:
+            if self.max_waiting is not None and self._waiting >= self.max_waiting:
+                raise PoolExhausted(f"Graph pool wait queue is full ({self.max_waiting}).")
+            self._waiting += 1
+        try:
+            return self._idle.get(timeout=self.timeout if timeout is None else timeout)
+        except queue.Empty as exc:
+            raise PoolExhausted("Timed out waiting for a free graph.") from exc
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self, graph: Any) -> None:
+        self._idle.put_nowait(graph)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        graph = self.acquire(timeout)
+        try:
+            yield graph
+        finally:
+            self.release(graph)
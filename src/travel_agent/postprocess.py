@@ -0,0 +1,142 @@
+import dataclasses
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from travel_agent.results import Flight, Hotel
+
+# Units of each currency per euro. Reference rates for display only; set
+# TRAVEL_AGENT_RATES to a JSON file of the same shape to use current ones.
+RATES: Dict[str, float] = {
+    "EUR": 1.0,
+    "USD": 1.08,
+    "GBP": 0.85,
+    "JPY": 162.0,
+    "CHF": 0.95,
+    "CAD": 1.47,
+    "AUD": 1.63,
+    "NZD": 1.78,
+    "SEK": 11.4,
+    "NOK": 11.6,
+    "DKK": 7.46,
+    "PLN": 4.32,
+    "CZK": 25.2,
+    "MXN": 18.6,
+    "BRL": 5.4,
+    "INR": 90.0,
+    "CNY": 7.8,
+    "SGD": 1.45,
+    "HKD": 8.45,
+}
+DEFAULT_CURRENCY = "EUR"
+
+
+def convert(amount: float, source: str, target: str, rates: Dict[str, float]) -> Optional[float]:
+    if source == target:
+        return amount
+    if source not in rates or target not in rates:
+        return None
+    return round(amount / rates[source] * rates[target], 2)
+
+
+def _code(value: Optional[str]) -> str:
+    return (value or DEFAULT_CURRENCY).strip().upper()
+
+
+def _text(value: Optional[str]) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def _flight_key(flight: Flight) -> Optional[Hashable]:
+    # "UA 100" and "ua100" are the same flight.
+    key = _text(flight.carrier), _text(flight.flight).replace(" ", "")
+    return key if any(key) else None
+
+
+def _hotel_key(hotel: Hotel) -> Optional[Hashable]:
+    key = _text(hotel.name), _text(hotel.city)
+    return key if any(key) else None
+
+
+def _finalize(
+    items: Sequence[Any],
+    price_field: str,
+    key: Callable[[Any], Optional[Hashable]],
+    currency: str,
+    limit: int,
+    rates: Dict[str, float],
+) -> List[Any]:
+    # One pass converts and dedupes, keeping the cheapest copy of each item, then one sort ranks them.
+    best: Dict[Hashable, Tuple[float, int, Any]] = {}
+    for position, item in enumerate(items):
+        price = getattr(item, price_field)
+        converted = convert(price, _code(item.currency), currency, rates) if price is not None else None
+        if converted is not None:
+            item = dataclasses.replace(item, **{price_field: converted, "currency": currency})
+        # Items without a usable price sort after every priced one, in their original order.
+        rank = converted if converted is not None else float("inf")
+        identity = key(item)
+        if identity is None:
+            identity = ("#", position)
+        if identity not in best or rank < best[identity][0]:
+            best[identity] = (rank, position, item)
+    ranked = sorted(best.values(), key=lambda entry: entry[:2])
+    return [item for _, _, item in ranked[:limit]]
+
+
+def finalize_flights(
+    flights: Optional[Sequence[Flight]],
+    currency: Optional[str],
+    limit: Optional[int] = None,
+    rates: Optional[Dict[str, float]] = None,
+) -> Optional[List[Flight]]:
+    if not flights:
+        return None
+    limit = result_limit() if limit is None else limit
+    return _finalize(flights, "price", _flight_key, _code(currency), limit, rates or rates_from_env())
+
+
+def finalize_hotels(
+    hotels: Optional[Sequence[Hotel]],
+    currency: Optional[str],
+    limit: Optional[int] = None,
+    rates: Optional[Dict[str, float]] = None,
+) -> Optional[List[Hotel]]:
+    if not hotels:
+        return None
+    limit = result_limit() if limit is None else limit
+    return _finalize(hotels, "price_per_night", _hotel_key, _code(currency), limit, rates or rates_from_env())
+
+
+def finalize_payload(node_id: str, payload: Any, currency: Optional[str]) -> Any:
+    # Streamed node events carry one node's raw payload rather than a parsed result.
+    if node_id == "flight_search":
+        record, finalize = Flight, finalize_flights
+    elif node_id == "hotel_search":
+        record, finalize = Hotel, finalize_hotels
+    else:
+        return payload
+    if not (isinstance(payload, list) and payload and all(isinstance(item, dict) for item in payload)):
+        return payload
+    return [item.as_dict() for item in finalize([record.from_dict(item) for item in payload], currency)]
+
+
+_rates: Dict[Optional[str], Dict[str, float]] = {}
+_rates_lock = threading.Lock()
+
+
+def rates_from_env() -> Dict[str, float]:
+    path = os.getenv("TRAVEL_AGENT_RATES") or None
+    with _rates_lock:
+        if path not in _rates:
+            rates = dict(RATES)
+            if path is not None:
+                with open(path, encoding="utf-8") as handle:
+                    rates.update({code.upper(): float(rate) for code, rate in json.load(handle).items()})
+            _rates[path] = rates
+        return _rates[path]
+
+
+def result_limit() -> int:
+    return int(os.getenv("TRAVEL_AGENT_RESULTS", "3"))
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from strands.models import Model
+
+MODES = ("record", "replay", "auto")
+# Settings that do not change what the model says stay out of the key.
+_UNKEYED = ("keep_alive",)
+
+
+class ReplayMiss(KeyError):
+    pass
+
+
+def replay_key(config: Dict[str, Any], system_prompt: Optional[str], messages: Any, tool_specs: Any = None) -> str:
+    keyed = {name: value for name, value in config.items() if name not in _UNKEYED}
+    document = json.dumps(
+        [keyed, system_prompt, messages, tool_specs], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+# Content-addressed responses: one zlib-compressed JSON row per prompt hash.
+class ReplayStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, events BLOB NOT NULL, "
+            "latency_ms REAL NOT NULL, created REAL NOT NULL)"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[List[Any], float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT events, latency_ms FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def put(self, key: str, model_id: str, events: List[Any], latency_ms: float) -> None:
+        blob = zlib.compress(json.dumps(events, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, events, latency_ms, created) VALUES (?, ?, ?, ?, ?)",
+                (key, model_id, blob, latency_ms, time.time()),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# Stands in for a live model: "record" always calls it and saves the stream, "replay"
+# only reads the store, and "auto" replays hits and records misses.
+class RecordReplayModel(Model):
+    def __init__(
+        self,
+        store: ReplayStore,
+        model: Optional[Model] = None,
+        mode: str = "replay",
+        simulate_latency: bool = False,
+        **model_config: Any,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode: {mode}")
+        if model is None and mode != "replay":
+            raise ValueError("Recording needs a model to call.")
+        self.store = store
+        self.model = model
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.config: Dict[str, Any] = dict(model_config)
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def update_config(self, **model_config: Any) -> None:
+        if self.model is not None:
+            self.model.update_config(**model_config)
+        else:
+            self.config.update(model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config() if self.model is not None else self.config
+
+    def _lookup(self, key: str) -> Optional[Tuple[List[Any], float]]:
+        if self.mode == "record":
+            return None
+        recorded = self.store.get(key)
+        if recorded is None:
+            self.misses += 1
+            if self.mode == "replay":
+                raise ReplayMiss(f"No recorded response for {key}.")
+        else:
+            self.hits += 1
+        return recorded
+
+    async def _replay(self, events: List[Any]) -> AsyncGenerator[Any, None]:
+        started = time.perf_counter()
+        for offset_ms, event in events:
+            if self.simulate_latency:
+                delay = offset_ms / 1000 - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield event
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Optional[Any] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        key = replay_key(dict(self.get_config()), system_prompt, messages, tool_specs)
+        recorded = self._lookup(key)
+        if recorded is not None:
+            async for event in self._replay(recorded[0]):
+                yield event
+            return
+
+        events = []
+        started = time.perf_counter()
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            # Offsets keep time-to-first-token as well as total latency.
+            events.append([round(1000 * (time.perf_counter() - started), 3), event])
+            yield event
+        latency_ms = 1000 * (time.perf_counter() - started)
+        self.store.put(key, str(self.get_config().get("model_id")), events, latency_ms)
+        self.recorded += 1
+
+    async def structured_output(
+        self, output_model: Any, prompt: Any, system_prompt: Optional[str] = None, **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        key = replay_key(dict(self.get_config()), system_prompt, prompt, output_model.__name__)
+        recorded = self._lookup(key)
+        if recorded is not None:
+            async for event in self._replay(recorded[0]):
+                yield {"output": output_model.model_validate(event["output"])} if "output" in event else event
+            return
+
+        events = []
+        started = time.perf_counter()
+        async for event in self.model.structured_output(output_model, prompt, system_prompt, **kwargs):
+            stored = {"output": event["output"].model_dump(mode="json")} if "output" in event else event
+            events.append([round(1000 * (time.perf_counter() - started), 3), stored])
+            yield event
+        self.store.put(key, str(self.get_config().get("model_id")), events, 1000 * (time.perf_counter() - started))
+        self.recorded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+_stores: Dict[str, ReplayStore] = {}
+_stores_lock = threading.Lock()
+
+
+def replay_store(path: str) -> ReplayStore:
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ReplayStore(path)
+        return store
+
+
+def replay_from_env(model: Model) -> Model:
+    mode = os.getenv("TRAVEL_AGENT_REPLAY", "off").lower()
+    if mode in {"", "off", "none", "false", "0"}:
+        return model
+    store = replay_store(os.getenv("TRAVEL_AGENT_REPLAY_PATH", "travel_agent_replay.sqlite3"))
+    simulate = os.getenv("TRAVEL_AGENT_REPLAY_LATENCY", "false").lower() in {"1", "true", "yes"}
+    return RecordReplayModel(store, model, mode=mode, simulate_latency=simulate)
@@ -0,0 +1,190 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from travel_agent.jsonstream import JsonExtractor, extract_json
+from travel_agent.tracing import span
+
+_MEMO = "_travel_agent_parsed"
+
+
+def node_text(node_result: Any) -> str:
+    if not node_result:
+        return ""
+    result = getattr(node_result, "result", None)
+    message = getattr(result, "message", None) if result else None
+    content = getattr(message, "content", None) if message else None
+    if content:
+        chunks = []
+        for block in content:
+            text = getattr(block, "text", None)
+            if text:
+                chunks.append(text)
+        if chunks:
+            return "\n".join(chunks)
+    return str(result) if result is not None else ""
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class NodeOutput:
+    text: str
+    payload: Optional[Any]
+
+
+@dataclass(slots=True)
+class OrchestratorDecision:
+    needs_flight: bool
+    needs_hotel: bool
+    query: Optional[str] = None
+    currency: Optional[str] = None
+    payload: Optional[Any] = None
+
+    @classmethod
+    def from_output(cls, output: NodeOutput) -> "OrchestratorDecision":
+        payload = output.payload if isinstance(output.payload, dict) else None
+        lowered = output.text.lower()
+        # Without a parsable decision the edges fall back to keywords in the raw reply.
+        needs_flight = bool(payload["needs_flight"]) if payload and "needs_flight" in payload else "flight" in lowered
+        needs_hotel = bool(payload["needs_hotel"]) if payload and "needs_hotel" in payload else "hotel" in lowered
+        query = payload.get("query") if payload else None
+        currency = payload.get("currency") if payload else None
+        return cls(
+            needs_flight=needs_flight,
+            needs_hotel=needs_hotel,
+            query=str(query) if query is not None else None,
+            currency=str(currency) if currency is not None else None,
+            payload=payload,
+        )
+
+
+# Field names follow tests/travel_agent/contract/schemas.py; "return" is a keyword, hence return_date.
+@dataclass(slots=True)
+class Flight:
+    carrier: Optional[str] = None
+    flight: Optional[str] = None
+    route: Optional[str] = None
+    depart: Optional[str] = None
+    return_date: Optional[str] = None
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    _KEYS = ("carrier", "flight", "route", "depart", "return", "price", "currency")
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "Flight":
+        return cls(
+            carrier=item.get("carrier"),
+            flight=item.get("flight"),
+            route=item.get("route"),
+            depart=item.get("depart"),
+            return_date=item.get("return"),
+            price=_number(item["price"]) if "price" in item else None,
+            currency=item.get("currency"),
+            extra={key: value for key, value in item.items() if key not in cls._KEYS},
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        values = (self.carrier, self.flight, self.route, self.depart, self.return_date, self.price, self.currency)
+        item = {key: value for key, value in zip(self._KEYS, values) if value is not None}
+        item.update(self.extra)
+        return item
+
+
+@dataclass(slots=True)
+class Hotel:
+    name: Optional[str] = None
+    city: Optional[str] = None
+    checkout: Optional[str] = None
+    price_per_night: Optional[float] = None
+    currency: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    _KEYS = ("name", "city", "checkout", "price_per_night", "currency")
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "Hotel":
+        return cls(
+            name=item.get("name"),
+            city=item.get("city"),
+            checkout=item.get("checkout"),
+            price_per_night=_number(item["price_per_night"]) if "price_per_night" in item else None,
+            currency=item.get("currency"),
+            extra={key: value for key, value in item.items() if key not in cls._KEYS},
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        values = (self.name, self.city, self.checkout, self.price_per_night, self.currency)
+        item = {key: value for key, value in zip(self._KEYS, values) if value is not None}
+        item.update(self.extra)
+        return item
+
+
+@dataclass(slots=True)
+class ParsedResult:
+    nodes: Tuple[str, ...]
+    texts: Dict[str, str]
+    orchestrator: Optional[OrchestratorDecision] = None
+    flights: Optional[List[Flight]] = None
+    hotels: Optional[List[Hotel]] = None
+
+    def flight_dicts(self) -> Optional[List[Dict[str, Any]]]:
+        return [flight.as_dict() for flight in self.flights] if self.flights else None
+
+    def hotel_dicts(self) -> Optional[List[Dict[str, Any]]]:
+        return [hotel.as_dict() for hotel in self.hotels] if self.hotels else None
+
+
+def node_output(node_result: Any, extractor: Optional[JsonExtractor] = None) -> NodeOutput:
+    # Node results are immutable once a node finishes, so one decode serves every reader.
+    cached = getattr(node_result, _MEMO, None)
+    if cached is not None:
+        return cached
+    text = node_text(node_result)
+    with span("parse", chars=len(text), streamed=extractor is not None):
+        payload = extractor.finish() if extractor is not None else extract_json(text)
+    output = NodeOutput(text=text, payload=payload)
+    try:
+        setattr(node_result, _MEMO, output)
+    except AttributeError:
+        pass
+    return output
+
+
+def _records(payload: Any, record: Any) -> Optional[list]:
+    if isinstance(payload, list) and payload and all(isinstance(item, dict) for item in payload):
+        return [record.from_dict(item) for item in payload]
+    return None
+
+
+def parse_result(result: Any) -> ParsedResult:
+    results = getattr(result, "results", None) or {}
+    nodes = tuple(results)
+    # A running graph's state gains results between edge checks; reuse the parse until it does.
+    cached = getattr(result, _MEMO, None)
+    if cached is not None and cached.nodes == nodes:
+        return cached
+
+    outputs = {node_id: node_output(node_result) for node_id, node_result in results.items()}
+    parsed = ParsedResult(nodes=nodes, texts={node_id: output.text for node_id, output in outputs.items()})
+    if "orchestrator" in outputs:
+        parsed.orchestrator = OrchestratorDecision.from_output(outputs["orchestrator"])
+    if "flight_search" in outputs:
+        parsed.flights = _records(outputs["flight_search"].payload, Flight)
+    if "hotel_search" in outputs:
+        parsed.hotels = _records(outputs["hotel_search"].payload, Hotel)
+    try:
+        setattr(result, _MEMO, parsed)
+    except AttributeError:
+        pass
+    return parsed
@@ -0,0 +1,139 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+_ROUTE = re.compile(r"\b([A-Z]{3})\s*(?:to|->|→|-)\s*([A-Z]{3})\b")
+_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_CURRENCY = re.compile(r"\b(EUR|USD|GBP|JPY|CHF|CAD|AUD|NZD|SEK|NOK|DKK|PLN|CZK|MXN|BRL|INR|CNY|SGD|HKD)\b")
+_CURRENCY_WORDS = re.compile(r"\b(dollars?|pounds?|euros?|yen|francs?|currency|price in)\b", re.IGNORECASE)
+_BOTH = re.compile(r"\bflights?\s*(?:and|&|\+)\s*hotels?\b|\bhotels?\s*(?:and|&|\+)\s*flights?\b", re.IGNORECASE)
+_FLIGHT_ONLY = re.compile(r"\bflights?\s+only\b|\bonly\s+flights?\b", re.IGNORECASE)
+_HOTEL_ONLY = re.compile(r"\bhotels?\s+only\b|\bonly\s+(?:a\s+)?hotels?\b", re.IGNORECASE)
+_CURRENCY_SYMBOL = re.compile(r"[$£€¥₹]")
+# A second date is only a return date when the request says so.
+_RETURN_DATE = re.compile(
+    r"(?:\breturn(?:ing)?|\bback|\buntil|\btill|\bthrough|\bto|[-–])\s*(?:on\s+)?(\d{4}-\d{2}-\d{2})\b", re.IGNORECASE
+)
+# Words a structured request may contain besides its route, dates, currency and services.
+_FILLER = frozenset(
+    "a an the any and or & + from to on for in at of by with please i we me us my our need needed want "
+    "required find book search show get looking look plan trip depart departing departure leave leaving "
+    "return returning back until till through price prices priced flight flights fly hotel hotels stay only".split()
+)
+_WORD = re.compile(r"[^\W_]+|[&+]")
+
+
+def _declined(service: str) -> "re.Pattern[str]":
+    article = r"(?:any|a|an|the)\s+"
+    refuse = r"(?:do\s+not|does\s+not|don['’]?t|doesn['’]?t|won['’]?t)\s+(?:need|want|require)"
+    return re.compile(
+        rf"\b(?:no|not|without|skip(?:ping)?)\s+(?:{article})?{service}"
+        rf"|\b{refuse}\s+(?:{article})?{service}"
+        rf"|\bno\s+need\s+(?:for|of)\s+(?:{article})?{service}"
+        rf"|\b{service}\s+(?:is\s+|are\s+)?(?:not\s+(?:needed|required|necessary)|unnecessary)\b",
+        re.IGNORECASE,
+    )
+
+
+_NO_FLIGHT = _declined(r"flights?\b")
+_NO_HOTEL = _declined(r"hotels?\b")
+# Negations the patterns above did not read are left to the model rather than ignored.
+_NEGATION = re.compile(r"\b(?:no|not|none|without|skip|except|never|nor)\b|n['’]t\b", re.IGNORECASE)
+_FLIGHT = re.compile(r"\bflights?\b|\bfly\b", re.IGNORECASE)
+_HOTEL = re.compile(r"\bhotels?\b|\bstay\b", re.IGNORECASE)
+
+
+@dataclass
+class Trip:
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    dates: List[str] = field(default_factory=list)
+    currency: Optional[str] = None
+
+    def key(self) -> tuple:
+        return (self.origin, self.destination, tuple(self.dates), self.currency or "EUR")
+
+
+def parse_trip(text: str) -> Trip:
+    trip = Trip(dates=_DATE.findall(text))
+    route = _ROUTE.search(text)
+    if route:
+        trip.origin, trip.destination = route.group(1), route.group(2)
+    currency = _CURRENCY.search(text)
+    if currency:
+        trip.currency = currency.group(1)
+    return trip
+
+
+def requested_services(text: str) -> Optional[tuple]:
+    declined_flight = _NO_FLIGHT.search(text)
+    declined_hotel = _NO_HOTEL.search(text)
+    if _NEGATION.search(_NO_HOTEL.sub(" ", _NO_FLIGHT.sub(" ", text))):
+        return None
+    if _BOTH.search(text):
+        flight, hotel = True, True
+    else:
+        flight = bool(_FLIGHT.search(text))
+        hotel = bool(_HOTEL.search(text))
+    if _FLIGHT_ONLY.search(text) or declined_hotel:
+        if _HOTEL_ONLY.search(text) or declined_flight:
+            return None
+        flight, hotel = True, False
+    elif _HOTEL_ONLY.search(text) or declined_flight:
+        flight, hotel = False, True
+    if not flight and not hotel:
+        return None
+    return flight, hotel
+
+
+def _unread(text: str, places: Sequence[str] = ()) -> List[str]:
+    # Anything left here is a constraint (cabin, budget, passengers, a second city) the query would drop.
+    rest = _NO_HOTEL.sub(" ", _NO_FLIGHT.sub(" ", text))
+    rest = _CURRENCY.sub(" ", _DATE.sub(" ", _ROUTE.sub(" ", rest)))
+    for place in places:
+        rest = re.sub(re.escape(place), " ", rest, flags=re.IGNORECASE)
+    return [word for word in _WORD.findall(rest.lower()) if word not in _FILLER]
+
+
+def _dates_read(text: str, trip: Trip) -> bool:
+    if len(trip.dates) < 2:
+        return True
+    returning = _RETURN_DATE.search(text)
+    return len(trip.dates) == 2 and returning is not None and returning.group(1) == trip.dates[1]
+
+
+def _read_all(text: str, trip: Trip, places: Sequence[str] = ()) -> bool:
+    return not _unread(text, places) and _dates_read(text, trip)
+
+
+def _query(text: str, trip: Trip) -> str:
+    if not (trip.origin and trip.dates):
+        return " ".join(text.split())
+    parts = [f"{trip.origin} to {trip.destination}", f"depart {trip.dates[0]}"]
+    if len(trip.dates) > 1:
+        parts.append(f"return {trip.dates[1]}")
+    return ", ".join(parts)
+
+
+def route_request(text: str) -> Optional[Dict[str, Any]]:
+    if not text:
+        return None
+    services = requested_services(text)
+    if services is None:
+        return None
+    trip = parse_trip(text)
+    if not trip.dates and not trip.origin:
+        return None
+    if trip.currency is None and _CURRENCY_WORDS.search(text):
+        return None
+    if _CURRENCY_SYMBOL.search(text):
+        return None
+    if trip.origin and not _read_all(text, trip):
+        return None
+    needs_flight, needs_hotel = services
+    return {
+        "needs_flight": needs_flight,
+        "needs_hotel": needs_hotel,
+        "query": _query(text, trip),
+        "currency": trip.currency or "EUR",
+    }
@@ -0,0 +1,61 @@
+ORCHESTRATOR_SCHEMA = {
+    "type": "object",
+    "required": ["needs_flight", "needs_hotel", "query", "currency"],
+    "properties": {
+        "needs_flight": {"type": "boolean"},
+        "needs_hotel": {"type": "boolean"},
+        "query": {"type": "string"},
+        "currency": {"type": "string"},
+    },
+    "additionalProperties": False,
+}
+
+FLIGHT_SCHEMA = {
+    "type": "array",
+    "minItems": 3,
+    "items": {
+        "type": "object",
+        "required": [
+            "carrier",
+            "flight",
+            "route",
+            "depart",
+            "return",
+            "price",
+            "currency",
+        ],
+        "properties": {
+            "carrier": {"type": "string"},
+            "flight": {"type": "string"},
+            "route": {"type": "string"},
+            "depart": {"type": "string"},
+            "return": {"type": "string"},
+            "price": {"type": "number"},
+            "currency": {"type": "string"},
+        },
+        "additionalProperties": True,
+    },
+}
+
+HOTEL_SCHEMA = {
+    "type": "array",
+    "minItems": 3,
+    "items": {
+        "type": "object",
+        "required": [
+            "name",
+            "city",
+            "checkout",
+            "price_per_night",
+            "currency",
+        ],
+        "properties": {
+            "name": {"type": "string"},
+            "city": {"type": "string"},
+            "checkout": {"type": "string"},
+            "price_per_night": {"type": "number"},
+            "currency": {"type": "string"},
+        },
+        "additionalProperties": True,
+    },
+}
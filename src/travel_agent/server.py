@@ -1,22 +1,129 @@
+import asyncio
+import contextlib
 import json
 import os
-import re
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from strands.multiagent.base import Status
+
+from travel_agent.admission import AdmissionController, Overloaded
+from travel_agent.backends import run_health_checks, shared_backend_pool
+from travel_agent.app import build_graph, cache_status, search_coalescer
+from travel_agent.cache import ResultCache, cache_from_env, normalize_query
+from travel_agent.encoding import CompressionMiddleware, FastJSONResponse, dumps
+from travel_agent.history import SessionStore, capture_history, reset_history, restore_history
+from travel_agent.jsonstream import JsonExtractor
+from travel_agent.metrics import (
+    CONTENT_TYPE,
+    REGISTRY,
+    Gauge,
+    observe_result,
+    similar_lookup_duration,
+    similar_lookups,
+)
+from travel_agent.pool import GraphPool, PoolExhausted
+from travel_agent.postprocess import finalize_flights, finalize_hotels, finalize_payload
+from travel_agent.results import OrchestratorDecision, node_output, parse_result
+from travel_agent.similarity import SimilarityCache, similarity_cache_from_env
+from travel_agent.singleflight import SingleFlight
+from travel_agent.speculative import Speculation, run_speculative
+from travel_agent.tracing import root, span
+from travel_agent.warmup import Warmup, warmup_targets
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+
+def _build_pool(cache: Optional[ResultCache] = None) -> GraphPool:
+    size = int(os.getenv("TRAVEL_AGENT_POOL_SIZE", "4"))
+    max_waiting = int(os.getenv("TRAVEL_AGENT_POOL_MAX_WAITING", str(size * 8)))
+    return GraphPool(
+        lambda: build_graph(cache=cache),
+        size=size,
+        timeout=_env_float("TRAVEL_AGENT_POOL_TIMEOUT", 120.0),
+        max_waiting=max_waiting,
+        lazy=True,
+    )
+
+
+def _build_admission(pool: GraphPool) -> AdmissionController:
+    limit = int(os.getenv("TRAVEL_AGENT_MAX_INFLIGHT", str(pool.size)))
+    max_waiting = int(os.getenv("TRAVEL_AGENT_QUEUE_MAX", str(limit * 8)))
+    return AdmissionController(
+        limit,
+        max_waiting=max_waiting,
+        timeout=_env_float("TRAVEL_AGENT_QUEUE_TIMEOUT", 120.0),
+    )
+
+
+def _speculative_default() -> bool:
+    return os.getenv("TRAVEL_AGENT_SPECULATIVE", "false").lower() in {"1", "true", "yes"}
+
+
+def _build_coalescer() -> Optional[SingleFlight]:
+    if os.getenv("TRAVEL_AGENT_COALESCE", "true").lower() in {"1", "true", "yes"}:
+        return SingleFlight(rerun_on=(Overloaded, PoolExhausted))
+    return None
+
+
+def _build_sessions() -> Optional[SessionStore]:
+    max_sessions = int(os.getenv("TRAVEL_AGENT_SESSION_MAX", "1000"))
+    if max_sessions <= 0:
+        return None
+    return SessionStore(
+        max_sessions=max_sessions,
+        idle_ttl=float(os.getenv("TRAVEL_AGENT_SESSION_TTL", "1800")),
+        max_tokens=int(os.getenv("TRAVEL_AGENT_SESSION_TOKENS", "2000")),
+    )
+
+
+def _build_warmup(pool: GraphPool) -> Warmup:
+    graph = pool.acquire(timeout=0)
+    try:
+        # Every pooled graph talks to the same hosts and models, so one graph covers them all.
+        return Warmup(warmup_targets(graph))
+    finally:
+        pool.release(graph)
 
-from travel_agent.app import build_graph
 
 @asynccontextmanager
 async def _lifespan(_: FastAPI):
-    global _graph
-    _graph = build_graph()
-    yield
+    global _pool, _sessions, _cache, _similar, _admission, _coalescer, _warmup
+    _cache = cache_from_env()
+    _similar = similarity_cache_from_env()
+    _pool = _build_pool(_cache)
+    _admission = _build_admission(_pool)
+    _coalescer = _build_coalescer()
+    _sessions = _build_sessions()
+    _warmup = _build_warmup(_pool)
+    if os.getenv("TRAVEL_AGENT_WARMUP", "true").lower() in {"1", "true", "yes"}:
+        await _warmup.run()
+    tasks = []
+    backends = shared_backend_pool()
+    if backends is not None:
+        tasks.append(asyncio.create_task(run_health_checks(backends, _env_float("OLLAMA_HEALTH_INTERVAL", 10.0))))
+    keep_warm = _env_float("OLLAMA_KEEP_WARM_INTERVAL", 0.0)
+    if keep_warm > 0:
+        tasks.append(asyncio.create_task(_warmup.keep_warm(keep_warm)))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
 
 
 app = FastAPI(lifespan=_lifespan)
@@ -28,30 +135,48 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if os.getenv("TRAVEL_AGENT_COMPRESSION", "true").lower() in {"1", "true", "yes"}:
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=int(os.getenv("TRAVEL_AGENT_COMPRESSION_MIN_SIZE", "1024"))
+    )
+
+
+RESPONSE_FIELDS = (
+    "answer",
+    "query",
+    "orchestrator",
+    "flights",
+    "hotels",
+    "status",
+    "execution_time_ms",
+    "execution_order",
+    "node_timings_ms",
+    "speculation",
+    "cache",
+    "results",
+    "coalesced",
+    "similar",
+)
+COMPACT_FIELDS = ("answer", "query", "flights", "hotels", "status", "execution_time_ms")
+# Node events have already carried the flights and hotels by the time a stream is done.
+STREAM_COMPACT_FIELDS = ("answer", "query", "status", "execution_time_ms")
 
 
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
+    speculative: Optional[bool] = None
+    compact: bool = False
+    fields: Optional[List[str]] = None
 
 
-_graph = None
-
-
-def _result_text(node_result: Any) -> str:
-    if not node_result:
-        return ""
-    result = getattr(node_result, "result", None)
-    message = getattr(result, "message", None) if result else None
-    content = getattr(message, "content", None) if message else None
-    if content:
-        chunks = []
-        for block in content:
-            text = getattr(block, "text", None)
-            if text:
-                chunks.append(text)
-        if chunks:
-            return "\n".join(chunks)
-    return str(result) if result is not None else ""
+_pool: Optional[GraphPool] = None
+_sessions: Optional[SessionStore] = None
+_cache: Optional[ResultCache] = None
+_similar: Optional[SimilarityCache] = None
+_admission: Optional[AdmissionController] = None
+_coalescer: Optional[SingleFlight] = None
+_warmup: Optional[Warmup] = None
 
 
 def _json_safe(value: Any) -> Any:
@@ -63,43 +188,118 @@ def _json_safe(value: Any) -> Any:
     return str(value)
 
 
-def _parse_json(text: str) -> Optional[Any]:
-    if not text:
+async def _acquire_graph() -> Any:
+    pool = _pool
+    try:
+        return pool.acquire(timeout=0, build=False)
+    except PoolExhausted:
+        pass
+    # Reached when a lazy pool still has graphs to build, which must not block the event loop,
+    # or when the admission limit exceeds the pool size.
+    waiting = asyncio.get_running_loop().run_in_executor(None, pool.acquire)
+    try:
+        return await asyncio.shield(waiting)
+    except asyncio.CancelledError:
+        # The thread keeps waiting after the request is gone; return whatever graph it gets.
+        waiting.add_done_callback(lambda done: _release_late(pool, done))
+        raise
+
+
+def _release_late(pool: GraphPool, done: "asyncio.Future[Any]") -> None:
+    if not done.cancelled() and done.exception() is None:
+        pool.release(done.result())
+
+
+async def ask(
+    message: str,
+    session_id: Optional[str] = None,
+    speculative: Optional[bool] = None,
+    fields: Optional[Sequence[str]] = None,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    if speculative is None:
+        speculative = _speculative_default()
+    use_session = session_id is not None and _sessions is not None
+    with root("chat", session=use_session, speculative=speculative):
+        if not use_session and _similar is not None:
+            response = _similar_response(message, fields, compact)
+            if response is not None:
+                return response
+        if use_session or _coalescer is None:
+            result, speculation = await _execute(message, session_id if use_session else None, speculative)
+            shared = False
+        else:
+            # Session turns depend on their own history, so only stateless requests share a run.
+            key = json.dumps([normalize_query(message), speculative])
+            (result, speculation), shared = await _coalescer.do(key, lambda: _execute(message, None, speculative))
+        # Built per caller, so coalesced requests can still ask for different views of one run.
+        with span("build_response"):
+            response = _build_response(result, speculation, fields, compact)
+        response["coalesced"] = shared
+        response["similar"] = None
+        if not use_session and _similar is not None and getattr(result, "status", None) == Status.COMPLETED:
+            # Stored in full so a later hit can serve any view of it.
+            full = response if fields is None and not compact else _build_response(result, speculation)
+            _similar.set(message, {**full, "coalesced": False, "similar": None})
+        return _select(response, fields)
+
+
+def _similar_response(message: str, fields: Optional[Sequence[str]], compact: bool) -> Optional[Dict[str, Any]]:
+    with span("similar_lookup"):
+        started = time.perf_counter()
+        found = _similar.get(message)
+        similar_lookup_duration.observe(time.perf_counter() - started)
+    similar_lookups.inc("hit" if found is not None else "miss")
+    if found is None:
         return None
-    fence_match = re.search(r"```json\s*([\s\S]*?)```", text, re.IGNORECASE)
-    raw = fence_match.group(1) if fence_match else text
-    decoder = json.JSONDecoder()
-    for idx, char in enumerate(raw):
-        if char in "{[":
-            try:
-                value, _ = decoder.raw_decode(raw[idx:])
-                return value
-            except json.JSONDecodeError:
-                continue
-    return None
-
-
-def ask(message: str) -> Dict[str, Any]:
-    result = _graph(message)
-    results: Dict[str, str] = {}
-    for node_id, node_result in getattr(result, "results", {}).items():
-        results[node_id] = _result_text(node_result)
-
-    orchestrator_payload = None
-    orchestrator_text = results.get("orchestrator", "")
-    if orchestrator_text:
-        orchestrator_payload = _parse_json(orchestrator_text)
-
+    stored, score, past = found
+    response = dict(stored, similar={"score": round(score, 4), "message": past})
+    if compact and (response["flights"] or response["hotels"]):
+        response["answer"] = None
+    return _select(response, fields)
+
+
+def _record_latency(started: float) -> None:
+    if _warmup is not None:
+        _warmup.record_request(1000 * (time.perf_counter() - started))
+
+
+async def _execute(message: str, session_id: Optional[str], speculative: bool) -> Tuple[Any, Optional[Speculation]]:
+    begun = time.perf_counter()
+    speculation = None
+    with span("admission"):
+        started = await _admission.acquire() if _admission is not None else None
+    try:
+        with span("acquire_graph"):
+            graph = await _acquire_graph()
+        try:
+            if session_id is not None:
+                restore_history(graph, _sessions.load(session_id))
+            else:
+                reset_history(graph)
+            if speculative:
+                result, speculation = await run_speculative(graph, message)
+            else:
+                result = await graph.invoke_async(message)
+            if session_id is not None:
+                _sessions.save(session_id, capture_history(graph))
+        finally:
+            _pool.release(graph)
+    finally:
+        if _admission is not None:
+            _admission.release(started)
+    observe_result(result, "chat")
+    _record_latency(begun)
+    return result, speculation
+
+
+def _answer(results: Dict[str, str], query: Optional[str], flights: Any, hotels: Any) -> str:
     sections = []
-    query = None
-    if orchestrator_payload and "query" in orchestrator_payload:
-        query = str(orchestrator_payload["query"])
+    if query is not None:
         sections.append(f"Query: {query}")
 
     flight_text = results.get("flight_search")
     hotel_text = results.get("hotel_search")
-    flights = _parse_json(flight_text) if flight_text else None
-    hotels = _parse_json(hotel_text) if hotel_text else None
     if flights:
         sections.append("Flights:\n" + json.dumps(flights, indent=2))
     elif flight_text:
@@ -110,14 +310,62 @@ def ask(message: str) -> Dict[str, Any]:
         sections.append("Hotels:\n" + hotel_text)
 
     if sections:
-        answer = "\n\n".join(sections)
-    elif orchestrator_text:
-        answer = orchestrator_text
+        return "\n\n".join(sections)
+    orchestrator_text = results.get("orchestrator", "")
+    if orchestrator_text:
+        return orchestrator_text
+    return "\n\n".join(text for text in results.values() if text)
+
+
+def _build_response(
+    result: Any,
+    speculation: Optional[Speculation] = None,
+    fields: Optional[Sequence[str]] = None,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    parsed = parse_result(result)
+    results = parsed.texts
+
+    decision = parsed.orchestrator
+    orchestrator_payload = decision.payload if decision is not None else None
+    query = decision.query if decision is not None else None
+    currency = decision.currency if decision is not None else None
+    # Currency, order and count are settled here rather than left to the search models.
+    with span("postprocess"):
+        flights = finalize_flights(parsed.flights, currency)
+        hotels = finalize_hotels(parsed.hotels, currency)
+    flights = [flight.as_dict() for flight in flights] if flights else None
+    hotels = [hotel.as_dict() for hotel in hotels] if hotels else None
+
+    # The answer and cache report are the costly parts, so only build them when asked for.
+    answer = None
+    if fields is None or "answer" in fields:
+        # A compact answer only carries text the structured fields cannot.
+        if not (compact and (flights or hotels)):
+            answer = _answer(results, query, flights, hotels) or ""
+
+    node_results = getattr(result, "results", {})
+    cache = None
+    if _cache is not None and (fields is None or "cache" in fields):
+        cache = {
+            "nodes": {
+                node_id: cache_status(node_result)
+                for node_id, node_result in node_results.items()
+                if node_id != "orchestrator"
+            },
+            **_cache.stats(),
+        }
+
+    if speculation is not None:
+        node_timings = speculation.node_timings_ms
     else:
-        answer = "\n\n".join(text for text in results.values() if text)
+        node_timings = {
+            node_id: getattr(node_result, "execution_time", None)
+            for node_id, node_result in node_results.items()
+        }
 
     return {
-        "answer": answer or "",
+        "answer": answer,
         "query": query,
         "orchestrator": orchestrator_payload,
         "flights": flights,
@@ -128,13 +376,214 @@ def ask(message: str) -> Dict[str, Any]:
             getattr(node, "node_id", None)
             for node in getattr(result, "execution_order", [])
         ],
+        "node_timings_ms": node_timings,
+        "speculation": speculation.as_dict() if speculation is not None else None,
+        "cache": cache,
         "results": results,
     }
 
 
+def _select(response: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return response
+    return {name: response.get(name) for name in fields}
+
+
+def _response_fields(req: ChatRequest, compact_fields: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    if req.fields is not None:
+        unknown = sorted(set(req.fields) - set(RESPONSE_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown response fields: {', '.join(unknown)}")
+        return tuple(dict.fromkeys(req.fields))
+    return compact_fields if req.compact else None
+
+
+def _overloaded(exc: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=429 if exc.queue_full else 503,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.post("/chat")
-def chat(req: ChatRequest) -> Dict[str, Any]:
-    return ask(req.message)
+async def chat(req: ChatRequest) -> Response:
+    fields = _response_fields(req, COMPACT_FIELDS)
+    try:
+        response = await ask(
+            req.message, session_id=req.session_id, speculative=req.speculative, fields=fields, compact=req.compact
+        )
+        return FastJSONResponse(response)
+    except Overloaded as exc:
+        raise _overloaded(exc)
+    except PoolExhausted as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
+
+@app.get("/stats")
+def stats() -> Dict[str, Any]:
+    backends = shared_backend_pool()
+    return {
+        "admission": _admission.stats() if _admission is not None else None,
+        "pool": {"size": _pool.size, "available": _pool.available, "waiting": _pool.waiting} if _pool else None,
+        "sessions": _sessions.stats() if _sessions is not None else None,
+        "cache": _cache.stats() if _cache is not None else None,
+        "similar": _similar.stats() if _similar is not None else None,
+        "coalescing": {
+            "requests": _coalescer.stats() if _coalescer is not None else None,
+            "searches": search_coalescer.stats(),
+        },
+        "backends": backends.stats() if backends is not None else None,
+        "warmup": _warmup.stats() if _warmup is not None else None,
+    }
+
+
+REGISTRY.register(
+    Gauge(
+        "travel_agent_requests_in_flight",
+        "Graph runs holding an admission slot.",
+        lambda: _admission.in_flight if _admission is not None else None,
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "travel_agent_requests_queued",
+        "Requests waiting for an admission slot.",
+        lambda: _admission.waiting if _admission is not None else None,
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "travel_agent_graphs_available",
+        "Idle graphs in the pool.",
+        lambda: _pool.available if _pool is not None else None,
+    )
+)
+
+
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+
+def _node_event(
+    node_id: str, node_result: Any, extractor: Optional[JsonExtractor] = None, currency: Optional[str] = None
+) -> Dict[str, Any]:
+    # Nodes that streamed tokens were parsed as they arrived; cached and rule-routed ones were not.
+    output = node_output(node_result, extractor)
+    return {
+        "node": node_id,
+        "status": _json_safe(getattr(node_result, "status", None)),
+        "execution_time_ms": getattr(node_result, "execution_time", None),
+        "result": finalize_payload(node_id, output.payload, currency),
+        "text": None if output.payload is not None else output.text,
+    }
+
+
+async def _stream_chat(
+    graph: Any,
+    message: str,
+    session_id: Optional[str],
+    fields: Optional[Sequence[str]] = None,
+    compact: bool = False,
+) -> AsyncIterator[str]:
+    begun = time.perf_counter()
+    use_session = session_id is not None and _sessions is not None
+    events = None
+    extractors: Dict[str, JsonExtractor] = {}
+    currency = None
+    with root("chat_stream", session=use_session):
+        try:
+            if use_session:
+                restore_history(graph, _sessions.load(session_id))
+            else:
+                reset_history(graph)
+            events = graph.stream_async(message)
+            async for event in events:
+                kind = event.get("type")
+                if kind == "multiagent_node_start":
+                    yield _sse("node_start", {"node": event["node_id"]})
+                elif kind == "multiagent_node_stream":
+                    text = event["event"].get("data")
+                    if isinstance(text, str) and text:
+                        extractors.setdefault(event["node_id"], JsonExtractor()).feed(text)
+                        yield _sse("token", {"node": event["node_id"], "text": text})
+                elif kind == "multiagent_node_stop":
+                    node_id = event["node_id"]
+                    node_event = _node_event(node_id, event["node_result"], extractors.pop(node_id, None), currency)
+                    if node_id == "orchestrator":
+                        currency = OrchestratorDecision.from_output(node_output(event["node_result"])).currency
+                    yield _sse("node", node_event)
+                elif kind == "multiagent_result":
+                    with span("build_response"):
+                        response = _select(_build_response(event["result"], None, fields, compact), fields)
+                    observe_result(event["result"], "chat_stream")
+                    _record_latency(begun)
+                    yield _sse("done", response)
+            if use_session:
+                _sessions.save(session_id, capture_history(graph))
+        except Exception as exc:
+            yield _sse("error", {"detail": str(exc)})
+        finally:
+            if events is not None:
+                await events.aclose()
+
+
+# Owns the graph and admission slot for a stream. Releasing them here rather than in the
+# generator also covers clients that disconnect before the first chunk, when it never runs.
+class _LeasedStream(StreamingResponse):
+    def __init__(self, content: AsyncIterator[str], graph: Any, started: Optional[float], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.graph = graph
+        self.started = started
+        self.released = False
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.release()
+
+    async def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        try:
+            # Closes the graph's event stream first, so the graph is idle when it goes back.
+            await self.body_iterator.aclose()
+        finally:
+            _pool.release(self.graph)
+            if _admission is not None:
+                _admission.release(self.started)
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest) -> StreamingResponse:
+    fields = _response_fields(req, STREAM_COMPACT_FIELDS)
+    try:
+        started = await _admission.acquire() if _admission is not None else None
+    except Overloaded as exc:
+        raise _overloaded(exc)
+    try:
+        graph = await _acquire_graph()
+    except BaseException as exc:
+        # Also covers a disconnect while waiting and a lazy pool failing to build a graph.
+        if _admission is not None:
+            _admission.release()
+        if isinstance(exc, PoolExhausted):
+            raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+        raise
+    return _LeasedStream(
+        _stream_chat(graph, req.message, req.session_id, fields, req.compact),
+        graph,
+        started,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 def _mount_ui(app: FastAPI) -> Optional[Path]:
@@ -0,0 +1,265 @@
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from travel_agent.cache import normalize_query
+from travel_agent.router import _CURRENCY_WORDS, _FILLER as _ROUTER_FILLER, parse_trip, requested_services
+
+# Optional: pip install travel-agent[similar]. Imported on first use, as the cache is off by default.
+np: Any = None
+
+_NUMBER = re.compile(r"\d+")
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_TOKEN = re.compile(r"[^\W\d_]+|\d+")
+_WORD = re.compile(r"[^\W\d_]+")
+# Capitalised words that do not start a sentence: "Rome" and "Nice" differ by one n-gram-poor word.
+_NAME = re.compile(r"(?<![.!?]\s)(?<!^)\b([A-Z]\w+)")
+_FILLER = frozenset(
+    "a an and at book for from i in is me my of on please price the to with need want find show get some".split()
+)
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+_MONTH = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_NAMED_DATE = re.compile(
+    rf"\b(?:({_MONTH})\.?\s+(\d{{1,2}})|(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH}))\b(?:,?\s+(\d{{4}}))?",
+    re.IGNORECASE,
+)
+
+
+def canonical_words(text: str) -> List[str]:
+    # "Jan 10" and "2025-01-10" both become "1 10"; years and filler words only add noise to the vector
+    # and the facts check below still compares years.
+    words = []
+    for word in _TOKEN.findall(text.lower()):
+        if word in _MONTHS:
+            word = str(_MONTHS[word])
+        elif word.isdigit():
+            if len(word) == 4:
+                continue
+            word = str(int(word))
+        elif word in _FILLER:
+            continue
+        words.append(word)
+    return words
+
+
+def _numpy() -> Any:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("The similarity cache needs numpy: pip install travel-agent[similar]") from None
+        np = numpy
+    return np
+
+
+class HashedNgramVectorizer:
+    def __init__(self, dim: int = 256, n: int = 3) -> None:
+        _numpy()
+        self.dim = dim
+        self.n = n
+
+    def grams(self, text: str) -> List[str]:
+        words = canonical_words(text)
+        grams = [f"{first} {second}" for first, second in zip(words, words[1:])]
+        for word in words:
+            grams.append(word)
+            padded = f" {word} "
+            grams.extend(padded[index : index + self.n] for index in range(max(len(padded) - self.n + 1, 1)))
+        return grams
+
+    def __call__(self, text: str) -> Any:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram in self.grams(text):
+            # crc32 rather than hash(), which is salted per process; the top bit picks a sign.
+            code = zlib.crc32(gram.encode("utf-8"))
+            vector[code % self.dim] += -1.0 if code & 0x80000000 else 1.0
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+# Facts a near-identical message must not contradict: "Jan 10" and "Jan 11" look alike as n-grams.
+class _Facts:
+    __slots__ = ("dates", "years", "numbers", "names", "words", "trip", "currency", "currency_words", "services")
+
+    def __init__(self, text: str) -> None:
+        dates, years = set(), set()
+        for match in _ISO_DATE.finditer(text):
+            dates.add((int(match.group(2)), int(match.group(3))))
+            years.add(int(match.group(1)))
+        for match in _NAMED_DATE.finditer(text):
+            month, day = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+            dates.add((_MONTHS[month.lower()], int(day)))
+            if match.group(5):
+                years.add(int(match.group(5)))
+        self.dates: FrozenSet[Tuple[int, int]] = frozenset(dates)
+        # A message may leave the year out, so years only have to not contradict each other.
+        self.years: FrozenSet[int] = frozenset(years)
+        rest = _NAMED_DATE.sub(" ", _ISO_DATE.sub(" ", text))
+        self.numbers: Tuple[int, ...] = tuple(sorted(int(number) for number in _NUMBER.findall(rest)))
+        self.names: FrozenSet[str] = frozenset(
+            name.lower() for name in _NAME.findall(text) if name.lower() not in _MONTHS
+        )
+        trip = parse_trip(text)
+        # Every other word is a qualifier ("nonstop", "business", "cheap") that both messages must share.
+        known = {code.lower() for code in (trip.origin, trip.destination, trip.currency) if code}
+        self.words: FrozenSet[str] = frozenset(
+            word
+            for word in _WORD.findall(rest.lower())
+            if word not in _FILLER and word not in _ROUTER_FILLER and word not in _MONTHS and word not in known
+        )
+        # The router prices a message without a currency code in EUR, unless it names one in words.
+        self.trip = (trip.origin, trip.destination)
+        self.currency = trip.currency or "EUR"
+        self.currency_words = trip.currency is None and bool(_CURRENCY_WORDS.search(text))
+        self.services = requested_services(text)
+
+    def agrees(self, other: "_Facts") -> bool:
+        if self.dates != other.dates or self.numbers != other.numbers:
+            return False
+        for mine, theirs in ((self.years, other.years), (self.names, other.names)):
+            if not (mine <= theirs or theirs <= mine):
+                return False
+        # Names were compared above; one that starts a message is a plain word there.
+        names = self.names | other.names
+        if self.words - names != other.words - names:
+            return False
+        if any(mine and theirs and mine != theirs for mine, theirs in zip(self.trip, other.trip)):
+            return False
+        # "in dollars" leaves the currency to the model, so it cannot reuse a priced answer or be reused.
+        if self.currency != other.currency or self.currency_words or other.currency_words:
+            return False
+        return self.services is None or other.services is None or self.services == other.services
+
+
+class SimilarityCache:
+    def __init__(
+        self, capacity: int = 10_000, threshold: float = 0.85, ttl: float = 900.0, dim: int = 256, candidates: int = 8
+    ) -> None:
+        _numpy()
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.candidates = candidates
+        self.vectorize = HashedNgramVectorizer(dim)
+        # Row i holds one past message; unused and expired rows are skipped through `expires`.
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires = np.zeros(capacity, dtype=np.float64)
+        self.used = np.zeros(capacity, dtype=np.int64)
+        self.entries: List[Optional[Tuple[str, _Facts, Any]]] = [None] * capacity
+        # Re-storing the same message reuses its row without a matrix scan.
+        self.rows: Dict[str, int] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.evictions = 0
+        self.lookup_seconds = 0.0
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    def _candidates(self, vector: Any, now: float) -> List[Tuple[int, float]]:
+        # One matrix-vector product scores every stored message; the best few above the threshold are kept.
+        scores = self.matrix[: self.size] @ vector
+        scores[self.expires[: self.size] <= now] = -1.0
+        rows = np.flatnonzero(scores >= self.threshold)
+        if len(rows) > self.candidates:
+            rows = rows[np.argpartition(scores[rows], -self.candidates)[-self.candidates :]]
+        return sorted(((int(row), float(scores[row])) for row in rows), key=lambda pair: -pair[1])
+
+    def get(self, message: str) -> Optional[Tuple[Any, float, str]]:
+        started = time.perf_counter()
+        vector = self.vectorize(message)
+        with self._lock:
+            found = None
+            candidates = self._candidates(vector, time.time())
+            facts = _Facts(message) if candidates else None
+            # The nearest message may be the same trip on another day; a slightly further one may not.
+            for row, score in candidates:
+                past, stored, value = self.entries[row]
+                if stored.agrees(facts):
+                    self._tick += 1
+                    self.used[row] = self._tick
+                    found = value, score, past
+                    break
+            if candidates and found is None:
+                self.rejected += 1
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.lookup_seconds += time.perf_counter() - started
+        return found
+
+    def set(self, message: str, value: Any) -> None:
+        key = normalize_query(message)
+        vector = self.vectorize(message)
+        now = time.time()
+        with self._lock:
+            row = self.rows.get(key)
+            if row is None:
+                if self.size < self.capacity:
+                    row = self.size
+                    self.size += 1
+                else:
+                    # Expired rows go before live ones, then the least recently used.
+                    live = self.expires > now
+                    row = int(np.argmin(np.where(live, self.used, -1)))
+                    self.evictions += int(live[row])
+                    del self.rows[normalize_query(self.entries[row][0])]
+                self.rows[key] = row
+            self._tick += 1
+            self.matrix[row] = vector
+            self.expires[row] = now + self.ttl
+            self.used[row] = self._tick
+            self.entries[row] = (message, _Facts(message), value)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.expires[: self.size] > time.time()))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "mean_lookup_ms": round(1000 * self.lookup_seconds / lookups, 3) if lookups else None,
+            "size": len(self),
+            "capacity": self.capacity,
+        }
+
+
+def similarity_cache_from_env() -> Optional[SimilarityCache]:
+    if os.getenv("TRAVEL_AGENT_SIMILAR_CACHE", "false").lower() not in {"1", "true", "yes"}:
+        return None
+    return SimilarityCache(
+        capacity=int(os.getenv("TRAVEL_AGENT_SIMILAR_SIZE", "10000")),
+        threshold=float(os.getenv("TRAVEL_AGENT_SIMILAR_THRESHOLD", "0.85")),
+        ttl=float(os.getenv("TRAVEL_AGENT_SIMILAR_TTL", "900")),
+        dim=int(os.getenv("TRAVEL_AGENT_SIMILAR_DIM", "256")),
+    )
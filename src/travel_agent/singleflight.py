@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+
+
+class _Rerun(Exception):
+    pass
+
+
+def _settled(future: "asyncio.Future[Any]") -> None:
+    # Mark failures as retrieved when no follower was waiting on them.
+    if not future.cancelled():
+        future.exception()
+
+
+# Lets concurrent callers with the same key share one execution instead of repeating it.
+class SingleFlight:
+    def __init__(self, rerun_on: Tuple[Type[BaseException], ...] = ()) -> None:
+        # Failures that belong to the leader's request alone, such as being shed; followers run again.
+        self.rerun_on = (asyncio.CancelledError,) + tuple(rerun_on)
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: Dict[Tuple[Any, str], "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> Tuple["asyncio.Future[Any]", bool]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._calls.get((loop, key))
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = loop.create_future()
+            future.add_done_callback(_settled)
+            self._calls[(loop, key)] = future
+            self.executed += 1
+            return future, True
+
+    def settle(self, key: str, future: "asyncio.Future[Any]", value: Any = None, error: Any = None) -> None:
+        with self._lock:
+            self._calls.pop((asyncio.get_running_loop(), key), None)
+        if future.done():
+            return
+        if isinstance(error, self.rerun_on):
+            # Followers must not mistake the leader's cancellation or overload for their own.
+            future.set_exception(_Rerun())
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        future, leader = self.join(key)
+        while not leader:
+            try:
+                return await asyncio.shield(future), True
+            except _Rerun:
+                # One of the followers becomes the new leader and the rest wait on it.
+                future, leader = self.join(key)
+        try:
+            value = await fn()
+        except BaseException as exc:
+            self.settle(key, future, error=exc)
+            raise
+        self.settle(key, future, value)
+        return value, False
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": self.in_flight}
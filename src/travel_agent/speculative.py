@@ -0,0 +1,115 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from strands.multiagent.base import NodeResult, Status
+from strands.multiagent.graph import GraphResult, GraphState
+
+from travel_agent.app import FastPathOrchestrator, _needs_flight, _needs_hotel
+from travel_agent.router import route_request
+
+SEARCH_NODES = ("flight_search", "hotel_search")
+
+
+@dataclass
+class Speculation:
+    kept: List[str] = field(default_factory=list)
+    wasted: List[str] = field(default_factory=list)
+    node_timings_ms: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"kept": self.kept, "wasted": self.wasted}
+
+
+async def _run_node(executor: Any, task: str) -> NodeResult:
+    start = time.perf_counter()
+    agent_result = await executor.invoke_async([{"text": task}])
+    metrics = getattr(agent_result, "metrics", None)
+    return NodeResult(
+        result=agent_result,
+        execution_time=round((time.perf_counter() - start) * 1000),
+        status=Status.COMPLETED,
+        accumulated_usage=dict(getattr(metrics, "accumulated_usage", {})),
+        accumulated_metrics=dict(getattr(metrics, "accumulated_metrics", {})),
+        execution_count=1,
+    )
+
+
+async def _tagged(node_id: str, handle: "asyncio.Task[NodeResult]") -> Tuple[str, NodeResult]:
+    return node_id, await handle
+
+
+def _elapsed_ms(start: float) -> int:
+    return round((time.perf_counter() - start) * 1000)
+
+
+async def run_speculative(graph: Any, task: str) -> Tuple[GraphResult, Speculation]:
+    start = time.perf_counter()
+    speculation = Speculation()
+    orchestrator = graph.nodes["orchestrator"].executor
+
+    search_ids = list(SEARCH_NODES)
+    if isinstance(orchestrator, FastPathOrchestrator):
+        decision = route_request(task)
+        if decision is not None:
+            # The rule router already knows the answer, so there is nothing to speculate on.
+            search_ids = [
+                node_id
+                for node_id, needed in zip(SEARCH_NODES, (decision["needs_flight"], decision["needs_hotel"]))
+                if needed
+            ]
+
+    tasks = {"orchestrator": asyncio.create_task(_run_node(orchestrator, task))}
+    for node_id in search_ids:
+        tasks[node_id] = asyncio.create_task(_run_node(graph.nodes[node_id].executor, task))
+
+    results: Dict[str, NodeResult] = {}
+    order: List[str] = []
+    try:
+        results["orchestrator"] = await tasks["orchestrator"]
+        order.append("orchestrator")
+        speculation.node_timings_ms["orchestrator"] = results["orchestrator"].execution_time
+
+        state = GraphState(task=task, results=dict(results))
+        wanted = {"flight_search": _needs_flight(state), "hotel_search": _needs_hotel(state)}
+        for node_id in search_ids:
+            if not wanted[node_id]:
+                speculation.wasted.append(node_id)
+                handle = tasks[node_id]
+                if handle.done() and not handle.cancelled() and handle.exception() is None:
+                    speculation.node_timings_ms[node_id] = handle.result().execution_time
+                else:
+                    speculation.node_timings_ms[node_id] = _elapsed_ms(start)
+                    handle.cancel()
+
+        kept = [node_id for node_id in search_ids if wanted[node_id]]
+        for finished in asyncio.as_completed([_tagged(node_id, tasks[node_id]) for node_id in kept]):
+            node_id, node_result = await finished
+            results[node_id] = node_result
+            order.append(node_id)
+            speculation.kept.append(node_id)
+            speculation.node_timings_ms[node_id] = node_result.execution_time
+        status = Status.COMPLETED
+    finally:
+        for handle in tasks.values():
+            if not handle.done():
+                handle.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    usage = {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0}
+    for node_result in results.values():
+        for key in usage:
+            usage[key] += node_result.accumulated_usage.get(key, 0)
+    # Searches start from the raw request, so the result mirrors a graph run over the kept nodes only.
+    result = GraphResult(
+        status=status,
+        results=results,
+        accumulated_usage=usage,
+        execution_count=len(results),
+        execution_time=_elapsed_ms(start),
+        total_nodes=len(graph.nodes),
+        completed_nodes=len(results),
+        execution_order=[graph.nodes[node_id] for node_id in order],
+    )
+    return result, speculation
@@ -0,0 +1,306 @@
+import contextlib
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+# Only the hooks need Strands, so importing this module (and results, which uses span) stays cheap.
+if TYPE_CHECKING:
+    from strands.hooks import (
+        AfterModelCallEvent,
+        AfterMultiAgentInvocationEvent,
+        AfterNodeCallEvent,
+        BeforeModelCallEvent,
+        BeforeMultiAgentInvocationEvent,
+        BeforeNodeCallEvent,
+        HookRegistry,
+    )
+
+FORMATS = ("chrome", "otlp")
+_MAIN = "request"
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    lane: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    def __init__(self) -> None:
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        # Spans opened by hook callbacks, which have no with-block to close them.
+        self.open: Dict[Any, Span] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, parent: Optional[Span], lane: Optional[str] = None, **attributes: Any) -> Span:
+        span = Span(
+            name=name,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            lane=lane or (parent.lane if parent else _MAIN),
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def finish(self, span: Span, **attributes: Any) -> None:
+        span.end_ns = time.time_ns()
+        span.attributes.update(attributes)
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("travel_agent_trace", default=None)
+_span: ContextVar[Optional[Span]] = ContextVar("travel_agent_span", default=None)
+_NOOP = contextlib.nullcontext()
+
+
+class _SpanContext:
+    __slots__ = ("trace", "name", "attributes", "span", "token")
+
+    def __init__(self, trace: Trace, name: str, attributes: Dict[str, Any]) -> None:
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.span = self.trace.start(self.name, _span.get(), **self.attributes)
+        self.token = _span.set(self.span)
+        return self.span
+
+    def __exit__(self, kind: Any, error: Any, traceback: Any) -> None:
+        _span.reset(self.token)
+        if error is not None:
+            self.span.attributes["error"] = repr(error)
+        self.trace.finish(self.span)
+
+
+def span(name: str, **attributes: Any) -> Any:
+    # Outside a sampled trace this is one context variable read.
+    trace = _trace.get()
+    if trace is None:
+        return _NOOP
+    return _SpanContext(trace, name, attributes)
+
+
+def _attribute(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    def __init__(self, path: str, sample_rate: float = 1.0, fmt: str = "chrome", service: str = "travel-agent") -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown trace format: {fmt}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.format = fmt
+        self.service = service
+        self.traces = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Optional[Trace]]:
+        if _trace.get() is not None:
+            with span(name, **attributes):
+                yield _trace.get()
+            return
+        if random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace()
+        root = trace.start(name, None, **attributes)
+        trace_token = _trace.set(trace)
+        span_token = _span.set(root)
+        try:
+            yield trace
+        except BaseException as exc:
+            root.attributes["error"] = repr(exc)
+            raise
+        finally:
+            _span.reset(span_token)
+            _trace.reset(trace_token)
+            trace.finish(root)
+            for left in trace.open.values():
+                trace.finish(left, unfinished=True)
+            self.export(trace)
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            self.traces += 1
+            if self.format == "chrome":
+                self._write_chrome(trace, self.traces)
+            else:
+                self._write_otlp(trace)
+
+    def _write_chrome(self, trace: Trace, index: int) -> None:
+        # Chrome's JSON array format may be left unterminated, so traces append.
+        pid = os.getpid()
+        lanes: Dict[str, int] = {}
+        events = []
+        for item in trace.spans:
+            if item.lane not in lanes:
+                lanes[item.lane] = index * 100 + len(lanes)
+                events.append(
+                    {"name": "thread_name", "ph": "M", "pid": pid, "tid": lanes[item.lane], "args": {"name": item.lane}}
+                )
+            events.append(
+                {
+                    "name": item.name,
+                    "cat": "travel_agent",
+                    "ph": "X",
+                    "ts": item.start_ns / 1000,
+                    "dur": max(item.end_ns - item.start_ns, 0) / 1000,
+                    "pid": pid,
+                    "tid": lanes[item.lane],
+                    "args": {"trace_id": trace.trace_id, **item.attributes},
+                }
+            )
+        fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", encoding="utf-8") as handle:
+            if fresh:
+                handle.write("[\n")
+            for event in events:
+                handle.write(json.dumps(event, default=str) + ",\n")
+
+    def _write_otlp(self, trace: Trace) -> None:
+        spans = [
+            {
+                "traceId": trace.trace_id,
+                "spanId": item.span_id,
+                **({"parentSpanId": item.parent_id} if item.parent_id else {}),
+                "name": item.name,
+                "kind": 1,
+                "startTimeUnixNano": str(item.start_ns),
+                "endTimeUnixNano": str(item.end_ns),
+                "attributes": [{"key": key, "value": _attribute(value)} for key, value in item.attributes.items()],
+            }
+            for item in trace.spans
+        ]
+        # One OTLP/JSON ExportTraceServiceRequest per line.
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+                    "scopeSpans": [{"scope": {"name": "travel_agent"}, "spans": spans}],
+                }
+            ]
+        }
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(request, default=str) + "\n")
+
+
+# Graph, node and model-call spans from Strands hook events; node spans get their own
+# lane so parallel searches do not overlap in the viewer. Strands' HookProvider is a
+# protocol, so this satisfies it without importing Strands up front.
+class TraceHooks:
+    def register_hooks(self, registry: "HookRegistry", **kwargs: Any) -> None:
+        from strands.hooks import (
+            AfterModelCallEvent,
+            AfterMultiAgentInvocationEvent,
+            AfterNodeCallEvent,
+            BeforeModelCallEvent,
+            BeforeMultiAgentInvocationEvent,
+            BeforeNodeCallEvent,
+        )
+
+        registry.add_callback(BeforeMultiAgentInvocationEvent, self._graph_start)
+        registry.add_callback(AfterMultiAgentInvocationEvent, self._graph_stop)
+        registry.add_callback(BeforeNodeCallEvent, self._node_start)
+        registry.add_callback(AfterNodeCallEvent, self._node_stop)
+        registry.add_callback(BeforeModelCallEvent, self._model_start)
+        registry.add_callback(AfterModelCallEvent, self._model_stop)
+
+    def _start(self, key: Any, name: str, parent: Optional[Span], lane: Optional[str] = None, **attributes: Any) -> None:
+        trace = _trace.get()
+        if trace is not None:
+            trace.open[key] = trace.start(name, parent, lane, **attributes)
+
+    def _stop(self, key: Any, **attributes: Any) -> None:
+        trace = _trace.get()
+        opened = trace.open.pop(key, None) if trace is not None else None
+        if opened is not None:
+            trace.finish(opened, **attributes)
+
+    def _graph_start(self, event: "BeforeMultiAgentInvocationEvent") -> None:
+        self._start(("graph", id(event.source)), "graph", _span.get())
+
+    def _graph_stop(self, event: "AfterMultiAgentInvocationEvent") -> None:
+        self._stop(("graph", id(event.source)))
+
+    def _node_start(self, event: "BeforeNodeCallEvent") -> None:
+        trace = _trace.get()
+        if trace is not None:
+            parent = trace.open.get(("graph", id(event.source))) or _span.get()
+            self._start(("node", event.node_id), f"node:{event.node_id}", parent, event.node_id, node=event.node_id)
+
+    def _node_stop(self, event: "AfterNodeCallEvent") -> None:
+        self._stop(("node", event.node_id))
+
+    def _model_start(self, event: "BeforeModelCallEvent") -> None:
+        trace = _trace.get()
+        if trace is not None:
+            name = event.agent.name
+            parent = trace.open.get(("node", name)) or _span.get()
+            model_id = (event.agent.model.get_config() or {}).get("model_id")
+            self._start(("model", id(event.agent)), "model_call", parent, agent=name, model=str(model_id))
+
+    def _model_stop(self, event: "AfterModelCallEvent") -> None:
+        attributes = {}
+        if event.exception is not None:
+            attributes["error"] = repr(event.exception)
+        elif event.stop_response is not None:
+            attributes["stop_reason"] = str(event.stop_response.stop_reason)
+        self._stop(("model", id(event.agent)), **attributes)
+
+
+_tracer: Optional[Tracer] = None
+_configured = False
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[Tracer]:
+    global _tracer, _configured
+    if _configured:
+        return _tracer
+    with _tracer_lock:
+        if not _configured:
+            path = os.getenv("TRAVEL_AGENT_TRACE")
+            if path:
+                _tracer = Tracer(
+                    path,
+                    sample_rate=float(os.getenv("TRAVEL_AGENT_TRACE_SAMPLE", "1.0")),
+                    fmt=os.getenv("TRAVEL_AGENT_TRACE_FORMAT", "chrome").lower(),
+                )
+            _configured = True
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    global _tracer, _configured
+    with _tracer_lock:
+        _tracer, _configured = tracer, True
+
+
+def root(name: str, **attributes: Any) -> Any:
+    tracer = get_tracer()
+    if tracer is None:
+        return _NOOP
+    return tracer.trace(name, **attributes)
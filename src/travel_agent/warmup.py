@@ -0,0 +1,109 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from strands.models.ollama import OllamaModel
+
+from travel_agent.backends import PooledOllamaModel
+from travel_agent.replay import RecordReplayModel
+
+_PROMPT = [{"role": "user", "content": [{"text": "ping"}]}]
+
+
+@dataclass(slots=True)
+class WarmupTarget:
+    node: str
+    model: OllamaModel
+    system_prompt: Optional[str]
+
+
+def _ollama_models(model: Any) -> List[OllamaModel]:
+    if isinstance(model, RecordReplayModel):
+        # Pure replay never reaches Ollama, so there is nothing to load.
+        return _ollama_models(model.model) if model.mode != "replay" else []
+    if isinstance(model, PooledOllamaModel):
+        return list(model.models.values())
+    if isinstance(model, OllamaModel):
+        return [model]
+    return []
+
+
+def warmup_targets(graph: Any) -> List[WarmupTarget]:
+    targets = []
+    seen = set()
+    for node_id, node in graph.nodes.items():
+        agent = node.executor
+        # Search nodes may sit behind both the inventory and the cache wrapper.
+        while hasattr(agent, "agent"):
+            agent = agent.agent
+        system_prompt = getattr(agent, "system_prompt", None)
+        for model in _ollama_models(getattr(agent, "model", None)):
+            # One token is enough to load the weights and prefill the system prompt.
+            config = {**model.get_config(), "max_tokens": 1}
+            key = (model.host, config["model_id"], system_prompt)
+            if key in seen:
+                continue
+            seen.add(key)
+            ping = OllamaModel(model.host, ollama_client_args=model.client_args, **config)
+            targets.append(WarmupTarget(node=node_id, model=ping, system_prompt=system_prompt))
+    return targets
+
+
+async def _ping(target: WarmupTarget) -> Dict[str, Any]:
+    started = time.perf_counter()
+    error = None
+    try:
+        async for _ in target.model.stream(_PROMPT, system_prompt=target.system_prompt):
+            pass
+    except Exception as exc:
+        error = str(exc)
+    report = {
+        "node": target.node,
+        "host": target.model.host,
+        "model": target.model.get_config()["model_id"],
+        "ms": round(1000 * (time.perf_counter() - started), 1),
+        "ok": error is None,
+    }
+    if error is not None:
+        report["error"] = error
+    return report
+
+
+# Loads every model the graph uses before traffic arrives, and optionally pings them
+# on an interval so Ollama does not unload them during quiet periods.
+class Warmup:
+    def __init__(self, targets: List[WarmupTarget]) -> None:
+        self.targets = targets
+        self.warmup_ms: Optional[float] = None
+        self.models: List[Dict[str, Any]] = []
+        self.pings = 0
+        self.first_request_ms: Optional[float] = None
+
+    async def _ping_all(self) -> List[Dict[str, Any]]:
+        self.models = list(await asyncio.gather(*(_ping(target) for target in self.targets)))
+        return self.models
+
+    async def run(self) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        await self._ping_all()
+        self.warmup_ms = round(1000 * (time.perf_counter() - started), 1)
+        return self.models
+
+    async def keep_warm(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self._ping_all()
+            self.pings += 1
+
+    def record_request(self, elapsed_ms: float) -> None:
+        if self.first_request_ms is None:
+            self.first_request_ms = round(elapsed_ms, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "warmup_ms": self.warmup_ms,
+            "first_request_ms": self.first_request_ms,
+            "pings": self.pings,
+            "models": self.models,
+        }
@@ -4,7 +4,7 @@ import jsonschema
 import pytest
 
 from travel_agent.app import build_graph
-from travel_agent.server import _parse_json, _result_text
+from travel_agent.results import parse_result
 from tests.travel_agent.contract.schemas import FLIGHT_SCHEMA, HOTEL_SCHEMA
 
 
@@ -14,9 +14,9 @@ def test_graph_returns_flights_and_hotels():
     result = graph(
         "Plan a trip from SFO to LAX on 2025-01-10 with flights and hotels."
     )
-    results = getattr(result, "results", {})
-    flights = _parse_json(_result_text(results.get("flight_search")))
-    hotels = _parse_json(_result_text(results.get("hotel_search")))
+    parsed = parse_result(result)
+    flights = parsed.flight_dicts()
+    hotels = parsed.hotel_dicts()
 
     assert flights is not None, "Expected flight results."
     assert hotels is not None, "Expected hotel results."
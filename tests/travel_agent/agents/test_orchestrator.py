@@ -1,4 +1,6 @@
 from travel_agent.agents import OrchestratorAgent
+from travel_agent.app import _build_model
+from travel_agent.schemas import ORCHESTRATOR_SCHEMA
 
 
 def test_orchestrator_prompt_contract():
@@ -8,3 +10,13 @@ def test_orchestrator_prompt_contract():
     assert "currency" in prompt
     assert "EUR" in prompt
     assert "No prose" in prompt or "JSON only" in prompt
+
+
+def test_build_model_constrains_output_to_schema(monkeypatch):
+    monkeypatch.setenv("OLLAMA_MAX_TOKENS_ORCHESTRATOR", "64")
+    config = _build_model(OrchestratorAgent(), constrained=True).get_config()
+    assert config["additional_args"] == {"format": ORCHESTRATOR_SCHEMA}
+    assert config["max_tokens"] == 64
+    assert config["temperature"] == 0.0
+
+    assert "additional_args" not in _build_model(OrchestratorAgent(), constrained=False).get_config()
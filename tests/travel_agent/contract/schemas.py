@@ -1,49 +1,3 @@
-FLIGHT_SCHEMA = {
-    "type": "array",
-    "minItems": 3,
-    "items": {
-        "type": "object",
-        "required": [
-            "carrier",
-            "flight",
-            "route",
-            "depart",
-            "return",
-            "price",
-            "currency",
-        ],
-        "properties": {
-            "carrier": {"type": "string"},
-            "flight": {"type": "string"},
-            "route": {"type": "string"},
-            "depart": {"type": "string"},
-            "return": {"type": "string"},
-            "price": {"type": "number"},
-            "currency": {"type": "string"},
-        },
-        "additionalProperties": True,
-    },
-}
+from travel_agent.schemas import FLIGHT_SCHEMA, HOTEL_SCHEMA, ORCHESTRATOR_SCHEMA
 
-HOTEL_SCHEMA = {
-    "type": "array",
-    "minItems": 3,
-    "items": {
-        "type": "object",
-        "required": [
-            "name",
-            "city",
-            "checkout",
-            "price_per_night",
-            "currency",
-        ],
-        "properties": {
-            "name": {"type": "string"},
-            "city": {"type": "string"},
-            "checkout": {"type": "string"},
-            "price_per_night": {"type": "number"},
-            "currency": {"type": "string"},
-        },
-        "additionalProperties": True,
-    },
-}
+__all__ = ["FLIGHT_SCHEMA", "HOTEL_SCHEMA", "ORCHESTRATOR_SCHEMA"]
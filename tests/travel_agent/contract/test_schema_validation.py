@@ -1,6 +1,6 @@
 import jsonschema
 
-from tests.travel_agent.contract.schemas import FLIGHT_SCHEMA, HOTEL_SCHEMA
+from tests.travel_agent.contract.schemas import FLIGHT_SCHEMA, HOTEL_SCHEMA, ORCHESTRATOR_SCHEMA
 
 
 def test_flight_schema_accepts_sample():
@@ -29,3 +29,8 @@ def test_hotel_schema_accepts_sample():
         }
     ] * 3
     jsonschema.validate(sample, HOTEL_SCHEMA)
+
+
+def test_orchestrator_schema_accepts_sample():
+    sample = {"needs_flight": True, "needs_hotel": False, "query": "SFO to LAX", "currency": "EUR"}
+    jsonschema.validate(sample, ORCHESTRATOR_SCHEMA)
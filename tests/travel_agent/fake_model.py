@@ -0,0 +1,186 @@
+import asyncio
+import json
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from strands.models import Model
+
+from travel_agent.history import estimate_tokens
+from travel_agent.router import parse_trip
+
+_CURRENCY = re.compile(r"\b(EUR|USD|GBP|JPY|CHF|CAD|AUD)\b")
+
+
+def _last_user_text(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        texts = [block["text"] for block in message.get("content", []) if "text" in block]
+        if message.get("role") == "user" and texts:
+            return "\n".join(texts)
+    return ""
+
+
+def _tool_result(messages: List[Dict[str, Any]]) -> Optional[str]:
+    content = messages[-1].get("content", []) if messages else []
+    for block in content:
+        if "toolResult" in block:
+            return "\n".join(item["text"] for item in block["toolResult"].get("content", []) if "text" in item)
+    return None
+
+
+def _tool_call(tool_specs: Optional[List[Any]], messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    names = {spec["name"] for spec in tool_specs or []}
+    if not names or _tool_result(messages) is not None:
+        return None
+    trip = parse_trip(_last_user_text(messages))
+    dates = list(dict.fromkeys(trip.dates))
+    if "search_flights" in names and trip.origin and trip.destination:
+        arguments = {"origin": trip.origin, "destination": trip.destination}
+        if dates:
+            arguments["depart"] = dates[0]
+        return {"name": "search_flights", "input": arguments}
+    if "search_hotels" in names and trip.destination:
+        arguments = {"city": trip.destination}
+        if len(dates) > 1:
+            arguments["checkout"] = dates[1]
+        return {"name": "search_hotels", "input": arguments}
+    return None
+
+
+def _currency(text: str) -> str:
+    match = _CURRENCY.search(text.upper())
+    return match.group(1) if match else "EUR"
+
+
+def _orchestrator_reply(text: str) -> str:
+    lowered = text.lower()
+    needs_flight = "flight" in lowered and "no flight" not in lowered and "hotel only" not in lowered
+    needs_hotel = "hotel" in lowered and "no hotel" not in lowered and "flight only" not in lowered
+    if not needs_flight and not needs_hotel:
+        needs_flight = needs_hotel = True
+    return json.dumps(
+        {
+            "needs_flight": needs_flight,
+            "needs_hotel": needs_hotel,
+            "query": " ".join(text.split())[:200],
+            "currency": _currency(text),
+        }
+    )
+
+
+_CARRIERS = [("United", "UA"), ("Delta", "DL"), ("Alaska", "AS")]
+_HOTELS = ["Hotel Figueroa", "The Line", "Ace Hotel"]
+
+
+def _flight_reply(text: str, count: int = 3) -> str:
+    currency = _currency(text)
+    flights = []
+    for index in range(count):
+        carrier, code = _CARRIERS[index % len(_CARRIERS)]
+        flights.append(
+            {
+                "carrier": carrier,
+                "flight": f"{code}{100 + index}",
+                "route": "SFO -> LAX",
+                "depart": "2025-01-10",
+                "return": "2025-01-14",
+                "price": 120.0 + 15 * index,
+                "currency": currency,
+            }
+        )
+    return json.dumps(flights)
+
+
+def _hotel_reply(text: str, count: int = 3) -> str:
+    currency = _currency(text)
+    return json.dumps(
+        [
+            {
+                "name": _HOTELS[index % len(_HOTELS)],
+                "city": "Los Angeles",
+                "checkout": "2025-01-14",
+                "price_per_night": 140.0 + 20 * index,
+                "currency": currency,
+            }
+            for index in range(count)
+        ]
+    )
+
+
+# Deterministic offline stand-in for OllamaModel, keyed on each agent's system prompt.
+class FakeModel(Model):
+    def __init__(self, latency: float = 0.0, results: int = 3, token_latency: float = 0.0, **model_config: Any) -> None:
+        self.latency = latency
+        # Seconds per generated token, for benchmarks where reply length drives node time.
+        self.token_latency = token_latency
+        self.results = results
+        self.config: Dict[str, Any] = {"model_id": "fake", **model_config}
+        self.calls = 0
+        self.input_tokens: List[int] = []
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    def reply(self, system_prompt: Optional[str], messages: List[Dict[str, Any]]) -> str:
+        found = _tool_result(messages)
+        # With search results in hand the model only has to repeat them.
+        if found and found.strip() != "[]":
+            return found
+        prompt = (system_prompt or "").lower()
+        text = _last_user_text(messages)
+        if "orchestrator" in prompt:
+            return _orchestrator_reply(text)
+        if "search flights" in prompt:
+            return _flight_reply(text, self.results)
+        if "search hotels" in prompt:
+            return _hotel_reply(text, self.results)
+        return text
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Any]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        call = _tool_call(tool_specs, messages)
+        text = json.dumps(call["input"]) if call else self.reply(system_prompt, messages)
+        input_tokens = estimate_tokens(system_prompt or "") + sum(
+            estimate_tokens(block.get("text", ""))
+            for message in messages
+            for block in message.get("content", [])
+        )
+        output_tokens = estimate_tokens(text)
+        self.calls += 1
+        self.input_tokens.append(input_tokens)
+        delay = self.latency + self.token_latency * output_tokens
+        if delay:
+            await asyncio.sleep(delay)
+
+        yield {"messageStart": {"role": "assistant"}}
+        if call:
+            tool_use = {"toolUseId": f"fake-{self.calls}", "name": call["name"]}
+            yield {"contentBlockStart": {"start": {"toolUse": tool_use}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": text}}}}
+        else:
+            yield {"contentBlockStart": {"start": {}}}
+            yield {"contentBlockDelta": {"delta": {"text": text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use" if call else "end_turn"}}
+        yield {
+            "metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {"latencyMs": 0},
+            }
+        }
+
+    async def structured_output(
+        self, output_model: Any, prompt: List[Dict[str, Any]], system_prompt: Optional[str] = None, **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        yield {"output": output_model.model_validate_json(self.reply(system_prompt, prompt))}
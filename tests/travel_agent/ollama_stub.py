@@ -0,0 +1,59 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Ollama(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        status = self.server.status
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"models": []}')
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.models.append(request["model"])
+        self.server.requests.append(request)
+        if self.server.status != 200:
+            self.send_response(self.server.status)
+            self.end_headers()
+            self.wfile.write(b'{"error": "overloaded"}')
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        stamp = "2025-01-01T00:00:00Z"
+        for text in (self.server.reply, ""):
+            part = {
+                "model": request["model"],
+                "created_at": stamp,
+                "message": {"role": "assistant", "content": text},
+                "done": not text,
+            }
+            if not text:
+                part.update(done_reason="stop", total_duration=1, prompt_eval_count=3, eval_count=2)
+            self.wfile.write((json.dumps(part) + "\n").encode())
+
+
+# Answers /api/tags and streams a fixed reply from /api/chat, like a local Ollama.
+def start_stub(reply, status=200):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Ollama)
+    server.reply, server.status, server.models, server.requests = reply, status, [], []
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stop_stub(server):
+    server.shutdown()
+    server.server_close()
+
+
+def dead_host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Ollama)
+    port = server.server_address[1]
+    server.server_close()
+    return f"http://127.0.0.1:{port}"
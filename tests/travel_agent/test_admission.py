@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from travel_agent.admission import AdmissionController, Overloaded
+
+
+def test_controller_limits_concurrent_runs():
+    async def scenario():
+        controller = AdmissionController(2)
+        peak = 0
+
+        async def run():
+            nonlocal peak
+            async with controller.slot():
+                peak = max(peak, controller.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(run() for _ in range(6)))
+        return controller, peak
+
+    controller, peak = asyncio.run(scenario())
+    assert peak == 2
+    assert controller.admitted == 6
+    assert controller.in_flight == 0
+    assert controller.stats()["wait_ms_max"] > 0
+
+
+def test_controller_rejects_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(1, max_waiting=1)
+        started = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire()
+        controller.release(started)
+        controller.release(await waiter)
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert error.queue_full
+    assert error.retry_after >= 1
+    assert controller.rejected == 1
+    assert controller.stats()["queue_depth"] == 0
+
+
+def test_controller_times_out_waiting():
+    async def scenario():
+        controller = AdmissionController(1, timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire()
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert not error.queue_full
+    assert controller.timeouts == 1
+    assert controller.waiting == 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from travel_agent.agents import FlightSearchAgent, OrchestratorAgent
+from travel_agent.app import _build_model
+from travel_agent.backends import BackendPool, NoHealthyBackend, PooledOllamaModel
+
+from tests.travel_agent.ollama_stub import dead_host, start_stub, stop_stub
+
+
+@pytest.fixture
+def ollama_stub():
+    servers = []
+
+    def start(reply, status=200):
+        server, host = start_stub(reply, status)
+        servers.append(server)
+        return server, host
+
+    yield start
+    for server in servers:
+        stop_stub(server)
+
+
+def _reply(model):
+    async def collect():
+        messages = [{"role": "user", "content": [{"text": "hi"}]}]
+        return [event async for event in model.stream(messages)]
+
+    events = asyncio.run(collect())
+    return "".join(event["contentBlockDelta"]["delta"]["text"] for event in events if "contentBlockDelta" in event)
+
+
+def test_pool_prefers_least_outstanding_backend():
+    pool = BackendPool(["a", "b", "c"])
+    picked = [pool.acquire() for _ in range(3)]
+    assert sorted(backend.host for backend in picked) == ["a", "b", "c"]
+    pool.release(picked[1])
+    assert pool.acquire().host == picked[1].host
+
+
+def test_pool_skips_failed_backend_until_cooldown():
+    pool = BackendPool(["a", "b"], cooldown=60)
+    first = pool.acquire()
+    pool.release(first, ok=False)
+    assert {pool.acquire().host for _ in range(4)} == {"b" if first.host == "a" else "a"}
+    with pytest.raises(NoHealthyBackend):
+        pool.acquire(exclude=["a", "b"])
+
+
+def test_stream_fails_over_to_live_backend(ollama_stub):
+    server, live = ollama_stub("from live")
+    dead = dead_host()
+    pool = BackendPool([dead, live])
+    model = PooledOllamaModel(pool, model_id="llama3.1")
+
+    replies = {_reply(model) for _ in range(2)}
+
+    assert replies == {"from live"}
+    health = {item["host"]: item for item in pool.stats()}
+    assert health[dead]["healthy"] is False
+    assert health[live]["outstanding"] == 0
+
+
+def test_stream_fails_over_on_server_error(ollama_stub):
+    busy, busy_host = ollama_stub("from busy", status=503)
+    server, live = ollama_stub("from live")
+    pool = BackendPool([busy_host, live])
+    model = PooledOllamaModel(pool, model_id="llama3.1")
+
+    assert {_reply(model) for _ in range(2)} == {"from live"}
+    assert pool.stats()[0]["healthy"] is False
+
+
+def test_health_check_marks_backends(ollama_stub):
+    server, live = ollama_stub("ok")
+    flaky, flaky_host = ollama_stub("ok", status=500)
+    pool = BackendPool([live, flaky_host, dead_host()])
+
+    assert list(asyncio.run(pool.check()).values()) == [True, False, False]
+    flaky.status = 200
+    assert list(asyncio.run(pool.check()).values()) == [True, True, False]
+
+
+def test_build_model_uses_per_node_model_and_host_pool(ollama_stub, monkeypatch):
+    first, first_host = ollama_stub("one")
+    second, second_host = ollama_stub("two")
+    monkeypatch.setenv("OLLAMA_MODEL", "llama3.1:8b")
+    monkeypatch.setenv("OLLAMA_MODEL_ORCHESTRATOR", "llama3.2:1b")
+    monkeypatch.setenv("OLLAMA_HOSTS", f"{first_host},{second_host}")
+
+    orchestrator = _build_model(OrchestratorAgent())
+    flight = _build_model(FlightSearchAgent())
+
+    assert isinstance(orchestrator, PooledOllamaModel)
+    assert orchestrator.pool is flight.pool
+    assert orchestrator.get_config()["model_id"] == "llama3.2:1b"
+    assert flight.get_config()["model_id"] == "llama3.1:8b"
+    assert {_reply(orchestrator) for _ in range(2)} == {"one", "two"}
+    assert first.models + second.models == ["llama3.2:1b", "llama3.2:1b"]
@@ -0,0 +1,93 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+from travel_agent.app import build_graph, cache_status
+from travel_agent.cache import MemoryCache, ResultCache, SqliteCache, trip_key
+
+from tests.travel_agent.fake_model import FakeModel
+
+
+def _run(graph, message):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graph(message)
+
+
+def test_trip_key_normalizes_whitespace_punctuation_and_currency():
+    assert trip_key("flight_search", "SFO to LAX,  depart 2025-01-10.") == trip_key(
+        "flight_search", "SFO to LAX depart 2025-01-10", "eur"
+    )
+    assert trip_key("flight_search", "SFO to LAX, depart 2025-01-10") != trip_key(
+        "flight_search", "SFO to LAX, depart 2025-01-11"
+    )
+    assert trip_key("flight_search", "SFO to LAX") != trip_key("hotel_search", "SFO to LAX")
+
+
+def test_memory_cache_expires_and_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    assert cache.get("a") == [1]
+    cache.set("c", [3])
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "size": 2}
+
+    expired = MemoryCache(ttl=0)
+    expired.set("a", [1])
+    assert expired.get("a") is None
+
+
+def test_cache_backend_missing_a_method_fails_on_creation():
+    class Partial(ResultCache):
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError, match="_get"):
+        Partial(max_entries=1, ttl=1)
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = SqliteCache(path, max_entries=2)
+    reader = SqliteCache(path, max_entries=2)
+    writer.set("a", [{"price": 1}])
+    assert reader.get("a") == [{"price": 1}]
+    writer.set("b", [2])
+    writer.set("c", [3])
+    assert writer.evictions == 1
+    assert len(reader) == 2
+
+
+def test_repeated_trip_is_served_from_cache():
+    model = FakeModel()
+    cache = MemoryCache()
+    graph = build_graph(model, cache=cache)
+    message = "SFO to LAX, depart 2025-01-10, return 2025-01-14, flights and hotels"
+    first = _run(graph, message)
+    calls = model.calls
+    second = _run(build_graph(model, cache=cache), message)
+
+    assert model.calls == calls
+    assert cache_status(first.results["flight_search"]) == "miss"
+    assert cache_status(second.results["flight_search"]) == "hit"
+    assert str(second.results["hotel_search"].result) == str(first.results["hotel_search"].result)
+    assert cache.stats()["hits"] == 2
+
+
+def test_concurrent_identical_searches_share_one_generation():
+    model = FakeModel(latency=0.01)
+    cache = MemoryCache()
+    graphs = [build_graph(model, cache=cache) for _ in range(3)]
+    message = "SFO to LAX, depart 2025-01-10, flight only"
+
+    async def scenario():
+        return await asyncio.gather(*(graph.invoke_async(message) for graph in graphs))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(scenario())
+
+    statuses = sorted(cache_status(result.results["flight_search"]) for result in results)
+    assert statuses == ["coalesced", "coalesced", "miss"]
+    assert model.calls == 1
@@ -0,0 +1,79 @@
+import contextlib
+import io
+
+from travel_agent.app import build_graph
+from travel_agent.history import SessionStore, capture_history, reset_history, restore_history, trim_history
+
+from tests.travel_agent.fake_model import FakeModel
+
+
+def _turn(role, text):
+    return {"role": role, "content": [{"text": text}]}
+
+
+def _run(graph, message):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graph(message)
+
+
+def test_trim_history_keeps_recent_turns_within_budget():
+    messages = [_turn("user", "a" * 40), _turn("assistant", "b" * 40), _turn("user", "c" * 40), _turn("assistant", "d" * 40)]
+    trimmed = trim_history(messages, max_tokens=25)
+    assert trimmed == messages[2:]
+    assert trim_history(messages, max_tokens=1000) == messages
+
+
+def test_trim_history_never_starts_on_assistant_turn():
+    messages = [_turn("user", "a" * 40), _turn("assistant", "b" * 4), _turn("user", "c" * 4)]
+    assert trim_history(messages, max_tokens=5) == messages[2:]
+
+
+def test_session_store_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    store.save("a", {"orchestrator": [_turn("user", "hi")]})
+    store.save("b", {})
+    store.load("a")
+    store.save("c", {})
+    assert store.load("b") == {}
+    assert store.load("a") == {"orchestrator": [_turn("user", "hi")]}
+    assert store.stats() == {"sessions": 2, "evictions": 1}
+
+
+def test_session_store_drops_idle_sessions():
+    store = SessionStore(idle_ttl=0)
+    store.save("a", {"orchestrator": [_turn("user", "hi")]})
+    assert store.load("a") == {}
+    assert store.evictions == 1
+
+
+def test_reset_history_keeps_prompt_size_flat():
+    model = FakeModel()
+    graph = build_graph(model)
+    sizes = []
+    for _ in range(3):
+        before = len(model.input_tokens)
+        reset_history(graph)
+        _run(graph, "SFO to LAX, depart 2025-01-10, flights and hotels")
+        sizes.append(sum(model.input_tokens[before:]))
+    assert sizes[0] == sizes[1] == sizes[2]
+
+
+def test_session_history_round_trips_through_store():
+    model = FakeModel()
+    graph = build_graph(model)
+    store = SessionStore()
+    _run(graph, "SFO to LAX, hotel only")
+    store.save("s1", capture_history(graph))
+    reset_history(graph)
+    restore_history(graph, store.load("s1"))
+    assert len(graph.nodes["orchestrator"].executor.messages) == 2
+
+
+def test_reset_history_reports_per_request_usage():
+    graph = build_graph(FakeModel(), fast_router=False)
+    usage = []
+    for _ in range(2):
+        reset_history(graph)
+        result = _run(graph, "Flights to Rome")
+        usage.append(result.results["flight_search"].accumulated_usage["outputTokens"])
+    assert usage[0] == usage[1] > 0
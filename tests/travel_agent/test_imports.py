@@ -0,0 +1,29 @@
+import json
+import subprocess
+import sys
+
+LIGHT = [
+    "travel_agent",
+    "travel_agent.main",
+    "travel_agent.results",
+    "travel_agent.inventory",
+    "travel_agent.similarity",
+]
+HEAVY = ("strands", "ollama", "fastapi", "numpy")
+
+
+def _loaded_after(code):
+    probe = f"import sys, json\n{code}\nprint(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    done = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return set(json.loads(done.stdout.splitlines()[-1]))
+
+
+def test_light_entry_points_do_not_import_heavy_packages():
+    loaded = _loaded_after("\n".join(f"import {module}" for module in LIGHT))
+    assert loaded.isdisjoint(HEAVY), sorted(loaded & set(HEAVY))
+
+
+def test_package_names_load_on_first_use():
+    loaded = _loaded_after("import travel_agent\nprint(travel_agent.build_graph.__module__)")
+    assert "strands" in loaded
+    assert "build_graph" in dir(__import__("travel_agent"))
@@ -0,0 +1,108 @@
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from travel_agent.app import build_graph, inventory_status
+from travel_agent.inventory import Inventory, InventoryError, load_rows, search_tools
+from travel_agent.results import parse_result
+
+from tests.travel_agent.fake_model import FakeModel
+
+DATA = Path(__file__).resolve().parents[2] / "data" / "inventory"
+
+
+@pytest.fixture
+def inventory():
+    return Inventory.load(str(DATA / "flights.csv"), str(DATA / "hotels.csv"))
+
+
+def _run(graph, message):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graph(message)
+
+
+def test_lookups_return_the_cheapest_matches(inventory):
+    flights = inventory.search_flights("sfo", "lax", "2025-01-10")
+    assert [flight["price"] for flight in flights] == [96.0, 104.0, 118.5]
+    assert flights[0]["route"] == "SFO -> LAX"
+    assert [flight["flight"] for flight in inventory.search_flights("SFO", "LAX", limit=2)] == ["WN2388", "AS1307"]
+    assert inventory.search_flights("SFO", "JFK", "2025-01-10") == []
+
+    # An airport code finds the same hotels as the city name.
+    by_city = inventory.search_hotels("Los Angeles", "2025-01-14")
+    assert [hotel["price_per_night"] for hotel in by_city] == [132.0, 165.0, 178.0]
+    assert inventory.search_hotels("LAX", "2025-01-14") == by_city
+
+
+def _node_input(request):
+    return f"Original Task: {request}\n\nInputs from previous nodes:\n\nFrom orchestrator:\n  - Agent: {{}}\n"
+
+
+def test_node_lookups_answer_only_requests_they_fully_read(inventory):
+    round_trip = inventory.lookup("flight_search", _node_input("SFO to LAX, 2025-01-10 to 2025-01-14, flights"))
+    assert round_trip and {flight["return"] for flight in round_trip} == {"2025-01-14"}
+    assert inventory.lookup("flight_search", "Flights SFO to LAX, depart 2025-01-10, return 2025-01-13") == []
+    # Constraints the tables cannot check, and a second date that is a hotel check-in, go to the agent.
+    for request in (
+        "Business class flights SFO to LAX on 2025-01-10 for 2 adults",
+        "Flights SFO to LAX on 2025-01-10, nonstop",
+        "Flight SFO to LAX on 2025-01-10 and a hotel for 2025-01-14",
+    ):
+        assert inventory.lookup("flight_search", _node_input(request)) == []
+        assert inventory.lookup("hotel_search", _node_input(request)) == []
+
+    hotels = inventory.lookup("hotel_search", _node_input("Hotel in Los Angeles 2025-01-10 to 2025-01-14"))
+    assert [hotel["price_per_night"] for hotel in hotels] == [132.0, 165.0, 178.0]
+    assert inventory.lookup("hotel_search", _node_input("Boutique hotel in Los Angeles 2025-01-10 to 2025-01-14")) == []
+
+
+def test_jsonl_rows_load_and_unknown_formats_fail(tmp_path):
+    path = tmp_path / "hotels.jsonl"
+    rows = [
+        {"name": "B", "city": "Rome", "checkout": "2025-03-09", "price_per_night": 200},
+        {"name": "A", "city": "Rome", "checkout": "2025-03-09", "price_per_night": "99.5"},
+        {"name": "No price", "city": "Rome", "checkout": "2025-03-09"},
+    ]
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+
+    inventory = Inventory.load(hotels_path=str(path))
+    assert inventory.stats() == {"fares": 0, "hotels": 2}
+    assert [hotel["name"] for hotel in inventory.search_hotels("rome")] == ["A", "B"]
+
+    with pytest.raises(InventoryError):
+        list(load_rows(str(tmp_path / "hotels.xlsx")))
+
+
+def test_search_tools_wrap_the_tables(inventory):
+    tools = search_tools(inventory)
+    assert [tool.tool_name for tool in tools["flight_search"]] == ["search_flights"]
+    assert [tool.tool_name for tool in tools["hotel_search"]] == ["search_hotels"]
+    assert tools["hotel_search"][0](city="Naples", checkout="2026-02-14", limit=1)[0]["name"] == "Hotel Piazza Bellini"
+
+
+def test_complete_trips_skip_the_search_models(inventory):
+    model = FakeModel()
+    graph = build_graph(model, fast_router=True, inventory=inventory)
+
+    result = _run(graph, "SFO to LAX, depart 2025-01-10, return 2025-01-14, flights and hotels")
+
+    parsed = parse_result(result)
+    assert [flight.flight for flight in parsed.flights] == ["WN2388", "AS1301", "DL2210"]
+    assert [hotel.name for hotel in parsed.hotels] == ["Freehand Los Angeles", "The Line", "Ace Hotel"]
+    assert inventory_status(result.results["flight_search"]) == "hit"
+    assert model.calls == 0
+
+
+def test_open_requests_call_the_inventory_tool(inventory):
+    model = FakeModel()
+    graph = build_graph(model, fast_router=False, inventory=inventory)
+
+    result = _run(graph, "Flights from SFO to LAX please, any date works")
+
+    assert [flight.price for flight in parse_result(result).flights] == [96.0, 99.0, 104.0]
+    assert inventory_status(result.results["flight_search"]) == "miss"
+    # Orchestrator, then the tool call, then the reply that repeats the tool's results.
+    assert model.calls == 3
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from travel_agent.jsonstream import JsonExtractor, extract_json
+
+
+def _streamed(text, size):
+    extractor = JsonExtractor()
+    for start in range(0, len(text), size):
+        extractor.feed(text[start:start + size])
+    return extractor.finish()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('[{"price": 120}]', [{"price": 120}]),
+        ('Sure!\n```json\n{"needs_flight": true}\n```\nAnything else?', {"needs_flight": True}),
+        ('{"query": "LAX [1] {2}", "escaped": "a \\" ] b"} trailing prose {', {"query": "LAX [1] {2}", "escaped": 'a " ] b'}),
+        ("See [TBD] and {link} first: [1, 2]", [1, 2]),
+        ('{"a" [1]}', [1]),
+        ('[{"name": "Ace"}, {"name": "Li', [{"name": "Ace"}]),
+        ('```json\n[{"a": 1}, {"b": 2}\n```\nHope this helps [see above]', [{"a": 1}, {"b": 2}]),
+        ("no json here", None),
+    ],
+)
+def test_extracts_first_complete_value(text, expected):
+    assert extract_json(text) == expected
+    for size in (1, 3, 64):
+        assert _streamed(text, size) == expected
+
+
+def test_feed_returns_value_as_soon_as_it_closes():
+    extractor = JsonExtractor()
+    assert extractor.feed('Here: {"needs_flight": tr') is None
+    assert extractor.feed('ue} and then') == {"needs_flight": True}
+    assert extractor.done
+    assert extractor.feed('{"ignored": 1}') == {"needs_flight": True}
+
+
+def test_escape_split_across_chunks():
+    assert _streamed('{"a": "x\\\\", "b": "\\"]"}', 1) == {"a": "x\\", "b": '"]'}
+
+
+def test_any_chunking_matches_extract_json():
+    rng = random.Random(9)
+    texts = ['Prices {may vary, 12" screens}: [{"a":1}]', "}{[[1,2]", '{ "a": [1, {"b": "]"}], "c": 2} and [3]']
+    texts += ["".join(rng.choice('{}[]",:1a \\') for _ in range(rng.randrange(1, 30))) for _ in range(2000)]
+    for text in texts:
+        expected = extract_json(text)
+        for _ in range(3):
+            extractor = JsonExtractor()
+            start = 0
+            while start < len(text):
+                size = rng.randrange(1, 5)
+                extractor.feed(text[start:start + size])
+                start += size
+            assert extractor.finish() == expected, text
+    chunks = ["Prices ", "{", 'may vary, 12" screens}: ', '[{"a":1}]']
+    extractor = JsonExtractor()
+    for chunk in chunks:
+        extractor.feed(chunk)
+    assert extractor.finish() == [{"a": 1}]
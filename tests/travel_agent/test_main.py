@@ -0,0 +1,57 @@
+import asyncio
+import contextlib
+import io
+import json
+
+from travel_agent.app import build_graph
+from travel_agent.main import completed_ids, read_specs, run_batch
+
+from tests.travel_agent.fake_model import FakeModel
+
+SPECS = [
+    {"id": "sfo-lax", "origin": "SFO", "destination": "LAX", "depart": "2025-01-10", "flight": True},
+    {"origin": "BCN", "destination": "NAP", "depart": "2026-02-10", "return": "2026-02-14", "hotel": True},
+    "not json",
+    {"origin": "SEA", "destination": "JFK", "seats": 2},
+]
+
+
+def _lines():
+    return io.StringIO("\n".join(spec if isinstance(spec, str) else json.dumps(spec) for spec in SPECS) + "\n")
+
+
+def _run(out, skip=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(run_batch(read_specs(_lines()), out, lambda: build_graph(FakeModel()), 2, skip))
+
+
+def test_batch_writes_one_line_per_trip():
+    out = io.StringIO()
+    summary = _run(out)
+
+    records = {record["id"]: record for record in map(json.loads, out.getvalue().splitlines())}
+    assert set(records) == {"sfo-lax", "2", "3", "4"}
+    assert summary["done"] == 2 and summary["failed"] == 2
+    assert records["sfo-lax"]["request"] == "SFO to LAX, depart 2025-01-10, flight only"
+    assert records["sfo-lax"]["execution_order"] == ["orchestrator", "flight_search"]
+    assert records["2"]["request"] == "BCN to NAP, depart 2026-02-10, return 2026-02-14, hotel only"
+    assert records["3"]["error"].startswith("JSONDecodeError")
+    assert "seats" in records["4"]["error"]
+    assert all(record["elapsed_ms"] >= 0 for record in records.values())
+
+
+def test_batch_resumes_after_a_crash(tmp_path):
+    output = tmp_path / "results.jsonl"
+    done = json.dumps({"id": "sfo-lax", "status": "completed", "error": None})
+    failed = json.dumps({"id": "2", "status": None, "error": "TimeoutError: model"})
+    output.write_text(done + "\n" + failed + "\n" + '{"id": "3", "sta', encoding="utf-8")
+
+    skip = completed_ids(str(output))
+    assert skip == {"sfo-lax"}
+    assert output.read_text(encoding="utf-8").endswith(failed + "\n")
+
+    with open(output, "a", encoding="utf-8") as out:
+        summary = _run(out, skip)
+    assert summary["skipped"] == 1
+    ids = [json.loads(line)["id"] for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(ids) == ["2", "2", "3", "4", "sfo-lax"]
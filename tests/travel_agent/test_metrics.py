@@ -0,0 +1,73 @@
+import contextlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from travel_agent import metrics, server
+from travel_agent.admission import AdmissionController
+from travel_agent.app import build_graph
+from travel_agent.metrics import Counter, Histogram, Registry
+from travel_agent.pool import GraphPool
+from travel_agent.singleflight import SingleFlight
+
+from tests.travel_agent.fake_model import FakeModel
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "_pool", GraphPool(lambda: build_graph(FakeModel(), fast_router=False), size=1))
+    monkeypatch.setattr(server, "_cache", None)
+    monkeypatch.setattr(server, "_sessions", None)
+    monkeypatch.setattr(server, "_admission", AdmissionController(1))
+    monkeypatch.setattr(server, "_coalescer", SingleFlight())
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield TestClient(server.app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", ["node"], buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("calls_total", "Calls.", ["node"]))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "a")
+    counter.inc('say "hi"', amount=2)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{node="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{node="a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{node="a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{node="a"} 5.55' in lines
+    assert 'latency_seconds_count{node="a"} 3' in lines
+    assert 'calls_total{node="say \\"hi\\""} 2' in lines
+
+
+def test_chat_feeds_node_token_and_edge_metrics(client):
+    durations = metrics.node_duration.count("flight_search")
+    completion = metrics.tokens.value("orchestrator", "completion")
+    skipped = metrics.edges.value("hotel_search", "skipped")
+    taken = metrics.edges.value("flight_search", "taken")
+    hotels = metrics.edges.value("hotel_search", "taken")
+
+    assert client.post("/chat", json={"message": "SFO to LAX, depart 2025-01-10, flight only"}).status_code == 200
+
+    assert metrics.node_duration.count("flight_search") == durations + 1
+    assert metrics.tokens.value("orchestrator", "completion") > completion
+    assert metrics.edges.value("hotel_search", "skipped") == skipped + 1
+    assert metrics.edges.value("flight_search", "taken") == taken + 1
+
+    both = {"message": "SFO to LAX, depart 2025-01-10, flights and hotels", "speculative": True}
+    assert client.post("/chat", json=both).status_code == 200
+    assert client.post("/chat", json={**both, "speculative": False}).status_code == 200
+    assert metrics.edges.value("flight_search", "taken") == taken + 3
+    assert metrics.edges.value("hotel_search", "taken") == hotels + 2
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'travel_agent_node_duration_seconds_count{node="orchestrator"}' in body
+    assert 'travel_agent_request_duration_seconds_count{endpoint="chat"}' in body
+    assert "travel_agent_requests_in_flight 0" in body
+    assert "travel_agent_graphs_available 1" in body
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from travel_agent.pool import GraphPool, PoolExhausted
+
+
+def test_pool_hands_out_distinct_graphs():
+    pool = GraphPool(object, size=3)
+    with pool.checkout() as first, pool.checkout() as second, pool.checkout() as third:
+        assert len({id(first), id(second), id(third)}) == 3
+        assert pool.available == 0
+    assert pool.available == 3
+
+
+def test_pool_times_out_when_empty():
+    pool = GraphPool(object, size=1, timeout=0.01)
+    with pool.checkout():
+        with pytest.raises(PoolExhausted):
+            pool.acquire()
+
+
+def test_pool_rejects_when_wait_queue_is_full():
+    pool = GraphPool(object, size=1, timeout=5, max_waiting=0)
+    with pool.checkout():
+        with pytest.raises(PoolExhausted, match="wait queue"):
+            pool.acquire()
+
+
+def test_waiter_receives_released_graph():
+    pool = GraphPool(object, size=1, timeout=5)
+    graph = pool.acquire()
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(pool.acquire()))
+    waiter.start()
+    pool.release(graph)
+    waiter.join(timeout=5)
+    assert received == [graph]
+
+
+def test_lazy_pool_builds_graphs_on_demand():
+    built = []
+    pool = GraphPool(lambda: built.append(object()) or built[-1], size=3, lazy=True)
+    assert built == [] and pool.available == 3
+
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as again, pool.checkout() as second:
+        assert again is first and second is not first
+    assert len(built) == 2
+    assert pool.available == 3
@@ -0,0 +1,72 @@
+import contextlib
+import io
+
+from fastapi.testclient import TestClient
+
+from travel_agent import server
+from travel_agent.app import build_graph
+from travel_agent.inventory import Inventory
+from travel_agent.pool import GraphPool
+from travel_agent.postprocess import RATES, convert, finalize_flights, finalize_hotels, finalize_payload
+from travel_agent.results import Flight, Hotel
+from tests.travel_agent.fake_model import FakeModel
+from tests.travel_agent.test_inventory import DATA
+
+
+def test_flights_are_converted_deduped_ranked_and_trimmed():
+    flights = [
+        Flight(carrier="United", flight="UA 100", price=200.0, currency="EUR"),
+        Flight(carrier="Delta", flight="DL1", price=108.0, currency="USD"),
+        Flight(carrier="united", flight="ua100", price=150.0, currency="EUR"),
+        Flight(carrier="Alaska", flight="AS3", price=None),
+        Flight(carrier="Air Mystery", flight="AM9", price=10.0, currency="XXX"),
+        Flight(carrier="Ryanair", flight="FR2", price=40.0),
+    ]
+
+    ranked = finalize_flights(flights, "usd", limit=10, rates=RATES)
+
+    # Unpriced and unconvertible flights go last, in the order the model gave them.
+    assert [(flight.flight, flight.price, flight.currency) for flight in ranked] == [
+        ("FR2", 43.2, "USD"),
+        ("DL1", 108.0, "USD"),
+        ("ua100", 162.0, "USD"),
+        ("AS3", None, None),
+        ("AM9", 10.0, "XXX"),
+    ]
+    assert flights[0].price == 200.0
+    assert [flight.flight for flight in finalize_flights(flights, "EUR", limit=2, rates=RATES)] == ["FR2", "DL1"]
+    assert finalize_flights(flights, "EUR", limit=0, rates=RATES) == []
+    assert finalize_flights([], "EUR") is None
+
+
+def test_hotels_dedupe_on_name_and_city():
+    hotels = [
+        Hotel(name="The Line", city="Los Angeles", price_per_night=165.0, currency="EUR"),
+        Hotel(name="The  Line", city="los angeles", price_per_night=180.0, currency="EUR"),
+        Hotel(name="The Line", city="Seoul", price_per_night=90.0, currency="EUR"),
+    ]
+
+    ranked = finalize_hotels(hotels, None, limit=3, rates=RATES)
+
+    assert [(hotel.city, hotel.price_per_night) for hotel in ranked] == [("Seoul", 90.0), ("Los Angeles", 165.0)]
+    assert convert(100.0, "GBP", "EUR", RATES) == round(100 / RATES["GBP"], 2)
+    assert finalize_payload("orchestrator", {"currency": "USD"}, "USD") == {"currency": "USD"}
+
+
+def test_chat_returns_inventory_prices_in_the_requested_currency(monkeypatch):
+    inventory = Inventory.load(str(DATA / "flights.csv"), str(DATA / "hotels.csv"))
+    monkeypatch.setattr(server, "_pool", GraphPool(lambda: build_graph(FakeModel(), inventory=inventory), size=1))
+    monkeypatch.setattr(server, "_cache", None)
+    monkeypatch.setattr(server, "_sessions", None)
+    monkeypatch.setattr(server, "_admission", None)
+    monkeypatch.setattr(server, "_coalescer", None)
+    message = {"message": "BCN to NAP on 2026-02-10, flights only, price in USD"}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = TestClient(server.app)
+        flights = client.post("/chat", json=message).json()["flights"]
+        stream = client.post("/chat/stream", json=message).text
+
+    assert [flight["price"] for flight in flights] == [round(price * RATES["USD"], 2) for price in (49.99, 61.5, 74.99)]
+    assert {flight["currency"] for flight in flights} == {"USD"}
+    assert '"price":53.99' in stream.replace(" ", "")
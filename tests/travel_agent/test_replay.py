@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+import io
+import time
+
+import pytest
+
+from travel_agent.agents import FlightSearchAgent
+from travel_agent.app import _build_model, build_graph
+from travel_agent.replay import RecordReplayModel, ReplayMiss, ReplayStore
+from travel_agent.results import parse_result
+from travel_agent.warmup import warmup_targets
+
+from tests.travel_agent.fake_model import FakeModel
+
+MESSAGE = "SFO to LAX, depart 2025-01-10, flights and hotels in USD"
+
+
+def _run(graph, message):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graph(message)
+
+
+def _collect(model, text="hi", system_prompt=None):
+    async def collect():
+        messages = [{"role": "user", "content": [{"text": text}]}]
+        return [event async for event in model.stream(messages, system_prompt=system_prompt)]
+
+    return asyncio.run(collect())
+
+
+def test_replay_reproduces_recorded_graph_run_without_the_model(tmp_path):
+    store = ReplayStore(str(tmp_path / "replay.sqlite3"))
+    recorder = RecordReplayModel(store, FakeModel(), mode="record")
+    recorded = parse_result(_run(build_graph(recorder), MESSAGE))
+    assert recorder.recorded == len(store) > 0
+
+    player = RecordReplayModel(ReplayStore(store.path), mode="replay", model_id="fake")
+    replayed = parse_result(_run(build_graph(player), MESSAGE))
+
+    assert replayed.texts == recorded.texts
+    assert replayed.flight_dicts() == recorded.flight_dicts()
+    assert player.stats() == {"mode": "replay", "hits": len(store), "misses": 0, "recorded": 0}
+
+
+def test_replay_miss_raises_and_auto_records_it(tmp_path):
+    store = ReplayStore(str(tmp_path / "replay.sqlite3"))
+    with pytest.raises(ReplayMiss):
+        _collect(RecordReplayModel(store, mode="replay", model_id="fake"))
+
+    auto = RecordReplayModel(store, FakeModel(), mode="auto")
+    assert _collect(auto) == _collect(auto)
+    assert (auto.misses, auto.hits, auto.recorded) == (1, 1, 1)
+
+
+def test_replay_can_simulate_recorded_latency(tmp_path):
+    store = ReplayStore(str(tmp_path / "replay.sqlite3"))
+    _collect(RecordReplayModel(store, FakeModel(latency=0.05), mode="record"))
+
+    started = time.perf_counter()
+    _collect(RecordReplayModel(store, mode="replay", model_id="fake"))
+    fast = time.perf_counter() - started
+    started = time.perf_counter()
+    _collect(RecordReplayModel(store, mode="replay", simulate_latency=True, model_id="fake"))
+    paced = time.perf_counter() - started
+
+    assert fast < 0.05 <= paced
+
+
+def test_build_model_wraps_replay_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRAVEL_AGENT_REPLAY", "replay")
+    monkeypatch.setenv("TRAVEL_AGENT_REPLAY_PATH", str(tmp_path / "replay.sqlite3"))
+    monkeypatch.delenv("OLLAMA_HOSTS", raising=False)
+
+    model = _build_model(FlightSearchAgent())
+
+    assert isinstance(model, RecordReplayModel)
+    assert model.mode == "replay"
+    assert warmup_targets(build_graph()) == []
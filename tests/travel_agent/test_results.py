@@ -0,0 +1,64 @@
+import contextlib
+import io
+
+import jsonschema
+from strands.multiagent.graph import GraphState
+
+from travel_agent import results as results_module
+from travel_agent.app import _needs_flight, _needs_hotel, build_graph
+from travel_agent.results import Flight, parse_result
+from travel_agent.server import _build_response
+from tests.travel_agent.contract.schemas import FLIGHT_SCHEMA, HOTEL_SCHEMA
+from tests.travel_agent.fake_model import FakeModel
+
+
+def _run(message):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return build_graph(FakeModel(), fast_router=False)(message)
+
+
+def test_records_match_contract_schemas():
+    parsed = parse_result(_run("SFO to LAX, depart 2025-01-10, flights and hotels"))
+    assert parsed.orchestrator.needs_flight and parsed.orchestrator.needs_hotel
+    assert parsed.flights[0].carrier == "United"
+    jsonschema.validate(parsed.flight_dicts(), FLIGHT_SCHEMA)
+    jsonschema.validate(parsed.hotel_dicts(), HOTEL_SCHEMA)
+
+
+def test_large_fake_outputs_parse_into_records():
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = build_graph(FakeModel(results=40), fast_router=False)("SFO to LAX, flights and hotels")
+    parsed = parse_result(result)
+    assert len(parsed.flights) == len(parsed.hotels) == 40
+    assert parsed.flights[39].flight == "UA139"
+
+
+def test_flight_keeps_extra_fields_and_coerces_price():
+    flight = Flight.from_dict({"carrier": "Delta", "price": "1,250", "return": "2025-01-14", "stops": 1})
+    assert flight.price == 1250.0
+    assert flight.as_dict() == {"carrier": "Delta", "return": "2025-01-14", "price": 1250.0, "stops": 1}
+
+
+def test_each_node_is_decoded_once_per_request(monkeypatch):
+    result = _run("SFO to LAX, depart 2025-01-10, flights and hotels")
+    for node_result in result.results.values():
+        node_result.__dict__.pop("_travel_agent_parsed", None)
+    result.__dict__.pop("_travel_agent_parsed", None)
+    calls = []
+    decode = results_module.extract_json
+    monkeypatch.setattr(results_module, "extract_json", lambda text: calls.append(text) or decode(text))
+
+    response = _build_response(result)
+    parse_result(result)
+    assert len(calls) == 3
+    assert response["query"]
+    assert len(response["flights"]) == 3
+
+
+def test_state_parse_refreshes_when_results_grow():
+    result = _run("SFO to LAX, depart 2025-01-10, flight only")
+    state = GraphState(task="", results={"orchestrator": result.results["orchestrator"]})
+    assert _needs_flight(state) and not _needs_hotel(state)
+    assert parse_result(state).flights is None
+    state.results["flight_search"] = result.results["flight_search"]
+    assert len(parse_result(state).flights) == 3
@@ -0,0 +1,94 @@
+import contextlib
+import io
+
+import pytest
+
+from travel_agent.app import build_graph, router_path
+from travel_agent.router import parse_trip, route_request
+
+from tests.travel_agent.fake_model import FakeModel
+
+
+@pytest.mark.parametrize(
+    "request_text, needs_flight, needs_hotel",
+    [
+        ("SFO to LAX, depart 2025-01-10, return 2025-01-14, flights and hotels", True, True),
+        ("SFO to LAX, depart 2025-01-10, hotel only", False, True),
+        ("SFO to LAX, depart 2025-01-10, flight only", True, False),
+        ("Plan a trip from SFO to LAX on 2025-01-10. Flights only.", True, False),
+        ("I need a hotel in Los Angeles for 2025-01-10. No flights.", False, True),
+        ("Flights SFO to LAX on 2025-01-10, don't need a hotel", True, False),
+        ("SFO to LAX on 2025-01-10, flights, no hotel needed", True, False),
+        ("SFO to LAX on 2025-01-10, hotel not needed", True, False),
+        ("Hotel in Los Angeles for 2025-01-10, we do not need any flights", False, True),
+    ],
+)
+def test_route_request_reads_structured_requests(request_text, needs_flight, needs_hotel):
+    decision = route_request(request_text)
+    assert decision["needs_flight"] is needs_flight
+    assert decision["needs_hotel"] is needs_hotel
+    assert decision["currency"] == "EUR"
+
+
+def test_route_request_builds_normalized_query_and_currency():
+    decision = route_request("Book flights from BCN to NAP on 2026-02-10, price in USD.")
+    assert decision == {
+        "needs_flight": True,
+        "needs_hotel": False,
+        "query": "BCN to NAP, depart 2026-02-10",
+        "currency": "USD",
+    }
+
+
+@pytest.mark.parametrize(
+    "request_text",
+    [
+        "Plan a trip.",
+        "SFO to LAX, depart 2025-01-10",
+        "Flights to somewhere warm please",
+        "SFO to LAX on 2025-01-10, flight only, no flights",
+        "Hotel in Paris on 2025-03-01, prices in dollars",
+        "SFO to LAX on 2025-01-10, flights and hotels, nothing that isn't refundable",
+        "SFO to LAX on 2025-01-10, flights and hotels, never mind the hotel",
+        # Constraints the rewritten query would drop.
+        "Find business class flights SFO to LAX on 2025-01-10 for 2 adults under $300",
+        "Flights SFO to LAX on 2025-01-10, nonstop",
+        "Flights SFO to LAX on 2025-01-10 priced in £",
+        "Hotel in Paris on 2025-03-01 under €200",
+        "Flight SFO to CDG on 2025-01-10 and a hotel in Paris for 2025-01-12",
+        "Flight SFO to CDG on 2025-01-10 and a hotel for 2025-01-12",
+    ],
+)
+def test_route_request_defers_when_not_confident(request_text):
+    assert route_request(request_text) is None
+
+
+def test_route_request_reads_a_marked_return_date():
+    for text in ("SFO to LAX 2025-01-10 to 2025-01-14, flights", "Flights SFO to LAX on 2025-01-10 returning 2025-01-14"):
+        assert route_request(text)["query"] == "SFO to LAX, depart 2025-01-10, return 2025-01-14"
+
+
+def test_parse_trip_extracts_route_dates_and_currency():
+    trip = parse_trip("SFO to LAX, depart 2025-01-10, return 2025-01-14 in GBP")
+    assert (trip.origin, trip.destination) == ("SFO", "LAX")
+    assert trip.dates == ["2025-01-10", "2025-01-14"]
+    assert trip.currency == "GBP"
+
+
+def test_fast_path_skips_orchestrator_model_call():
+    model = FakeModel()
+    graph = build_graph(model, fast_router=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = graph("SFO to LAX, depart 2025-01-10, hotel only")
+    assert [node.node_id for node in result.execution_order] == ["orchestrator", "hotel_search"]
+    assert router_path(result.results["orchestrator"]) == "rule"
+    assert model.calls == 1
+
+
+def test_unstructured_request_falls_back_to_llm_orchestrator():
+    model = FakeModel()
+    graph = build_graph(model, fast_router=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = graph("Plan a trip somewhere sunny")
+    assert router_path(result.results["orchestrator"]) == "llm"
+    assert model.calls == 3
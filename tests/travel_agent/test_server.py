@@ -0,0 +1,212 @@
+import asyncio
+import contextlib
+import io
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from travel_agent import server
+from travel_agent.admission import AdmissionController
+from travel_agent.app import build_graph
+from travel_agent.pool import GraphPool
+from travel_agent.singleflight import SingleFlight
+
+from tests.travel_agent.fake_model import FakeModel
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "_pool", GraphPool(lambda: build_graph(FakeModel()), size=1))
+    monkeypatch.setattr(server, "_cache", None)
+    monkeypatch.setattr(server, "_sessions", None)
+    monkeypatch.setattr(server, "_admission", AdmissionController(1, max_waiting=0))
+    monkeypatch.setattr(server, "_coalescer", SingleFlight())
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield TestClient(server.app)
+
+
+def _events(body):
+    events = []
+    for chunk in body.strip().split("\n\n"):
+        name, data = chunk.split("\n", 1)
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_chat_returns_structured_results(client):
+    response = client.post("/chat", json={"message": "SFO to LAX, depart 2025-01-10, flight only"})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["execution_order"] == ["orchestrator", "flight_search"]
+    assert len(payload["flights"]) == 3
+    assert payload["hotels"] is None
+
+
+def test_chat_stream_sends_node_events_before_done(client):
+    response = client.post("/chat/stream", json={"message": "Flights and hotels for a weekend in Rome"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    names = [name for name, _ in events]
+    assert names[-1] == "done"
+    assert "token" in names
+
+    nodes = [data for name, data in events if name == "node"]
+    assert nodes[0]["node"] == "orchestrator"
+    assert nodes[0]["result"]["needs_flight"] is True
+    assert {node["node"] for node in nodes[1:]} == {"flight_search", "hotel_search"}
+    assert names.index("node") < names.index("done")
+    assert server._pool.available == 1
+
+
+def test_stats_reports_admission(client):
+    client.post("/chat", json={"message": "SFO to LAX, depart 2025-01-10, hotel only"})
+    admission = client.get("/stats").json()["admission"]
+    assert admission["admitted"] == 1
+    assert admission["in_flight"] == 0
+    assert admission["queue_depth"] == 0
+
+
+def test_chat_sheds_load_when_queue_is_full(client):
+    asyncio.run(server._admission.acquire())
+    response = client.post("/chat", json={"message": "SFO to LAX, depart 2025-01-10"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert server._admission.stats()["rejected"] == 1
+
+
+def test_identical_requests_share_one_graph_run(client, monkeypatch):
+    model = FakeModel(latency=0.01)
+    monkeypatch.setattr(server, "_pool", GraphPool(lambda: build_graph(model, fast_router=False), size=1))
+
+    async def burst():
+        return await asyncio.gather(
+            server.ask("Flights to Rome, please!"),
+            server.ask("flights to rome please"),
+            server.ask("Flights to Rome please"),
+        )
+
+    responses = asyncio.run(burst())
+    assert sorted(response["coalesced"] for response in responses) == [False, True, True]
+    assert responses[0]["flights"] == responses[1]["flights"]
+    assert model.calls == 2
+    assert server._coalescer.stats()["coalesced"] == 2
+    assert server._admission.stats()["rejected"] == 0
+
+
+def test_compact_chat_drops_repeated_text(client):
+    message = {"message": "SFO to LAX, depart 2025-01-10, flights and hotels"}
+    full = client.post("/chat", json=message)
+    compact = client.post("/chat", json={**message, "compact": True})
+
+    assert compact.status_code == 200
+    payload = compact.json()
+    assert list(payload) == list(server.COMPACT_FIELDS)
+    assert payload["answer"] is None
+    assert payload["flights"] == full.json()["flights"]
+    assert len(compact.content) * 2 < len(full.content)
+
+
+def test_chat_returns_only_selected_fields(client):
+    message = "SFO to LAX, depart 2025-01-10, hotel only"
+    response = client.post("/chat", json={"message": message, "fields": ["hotels", "coalesced"]})
+    assert response.status_code == 200
+    assert list(response.json()) == ["hotels", "coalesced"]
+
+    response = client.post("/chat", json={"message": "SFO to LAX", "fields": ["hotels", "prices"]})
+    assert response.status_code == 422
+    assert "prices" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_large_responses_are_compressed(client, encoding):
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    message = {"message": "SFO to LAX, depart 2025-01-10, flights and hotels"}
+
+    response = client.post("/chat", json=message, headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert len(response.json()["flights"]) == 3
+
+    small = client.post("/chat", json={**message, "fields": ["status"]}, headers={"Accept-Encoding": encoding})
+    assert "content-encoding" not in small.headers
+
+
+def test_cancelled_graph_wait_returns_the_graph_to_the_pool(monkeypatch):
+    pool = GraphPool(object, size=1, timeout=5)
+    monkeypatch.setattr(server, "_pool", pool)
+    held = pool.acquire()
+
+    async def cancel_waiter():
+        waiter = asyncio.ensure_future(server._acquire_graph())
+        while pool.waiting == 0:
+            await asyncio.sleep(0.001)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        pool.release(held)
+        for _ in range(1000):
+            if pool.waiting == 0 and pool.available == 1:
+                break
+            await asyncio.sleep(0.002)
+
+    asyncio.run(cancel_waiter())
+    assert pool.available == 1
+    assert pool.acquire(timeout=0) is held
+
+
+def test_stream_releases_graph_and_slot_when_client_is_gone_before_body(client):
+    async def gone(message):
+        raise OSError("client disconnected")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def disconnect_early():
+        response = await server.chat_stream(server.ChatRequest(message="SFO to LAX, depart 2025-01-10, flight only"))
+        assert server._pool.available == 0
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, gone)
+
+    asyncio.run(disconnect_early())
+    assert server._pool.available == 1
+    assert server._admission.in_flight == 0
+
+
+def test_stream_releases_slot_when_graph_cannot_be_had(monkeypatch):
+    def broken():
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(server, "_pool", GraphPool(broken, size=1, lazy=True))
+    monkeypatch.setattr(server, "_admission", AdmissionController(1, max_waiting=0))
+    request = server.ChatRequest(message="SFO to LAX, depart 2025-01-10, flight only")
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.chat_stream(request))
+    assert server._admission.in_flight == 0
+
+    pool = GraphPool(object, size=1, timeout=5)
+    monkeypatch.setattr(server, "_pool", pool)
+    held = pool.acquire()
+
+    async def cancel_stream():
+        stream = asyncio.ensure_future(server.chat_stream(request))
+        while pool.waiting == 0:
+            await asyncio.sleep(0.001)
+        stream.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await stream
+        pool.release(held)
+
+    asyncio.run(cancel_stream())
+    assert server._admission.in_flight == 0
+
+
+def test_lazy_pool_builds_graphs_off_the_event_loop(monkeypatch):
+    builders = []
+    pool = GraphPool(lambda: builders.append(threading.current_thread()) or object(), size=2, lazy=True)
+    monkeypatch.setattr(server, "_pool", pool)
+    asyncio.run(server._acquire_graph())
+    assert builders and threading.main_thread() not in builders
@@ -0,0 +1,98 @@
+import contextlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from travel_agent import server
+from travel_agent.app import build_graph
+from travel_agent.metrics import similar_lookups
+from travel_agent.pool import GraphPool
+
+from tests.travel_agent.fake_model import FakeModel
+
+pytest.importorskip("numpy")
+
+from travel_agent.similarity import SimilarityCache  # noqa: E402
+
+
+def test_paraphrases_hit_and_different_trips_do_not():
+    cache = SimilarityCache(capacity=8)
+    cache.set("flights from SFO to LAX on 2025-01-10", "sfo-lax")
+    cache.set("Plan a weekend in Rome with somewhere to stay", "rome")
+
+    value, score, past = cache.get("SFO→LAX Jan 10 flights")
+    assert (value, past) == ("sfo-lax", "flights from SFO to LAX on 2025-01-10")
+    assert score >= cache.threshold
+    # Close as n-grams, but the day, the direction, the city or the service differ.
+    assert cache.get("Flights from SFO to LAX on 2025-01-11") is None
+    assert cache.get("Flights from LAX to SFO on 2025-01-10") is None
+    assert cache.get("Plan a weekend in Nice with somewhere to stay") is None
+    assert cache.get("SFO to LAX 2025-01-10, hotels only") is None
+    # Qualifiers the stored answer did not ask for.
+    for qualifier in ("nonstop", "business class", "refundable", "with a carry-on bag", "for 2 adults"):
+        assert cache.get(f"flights from SFO to LAX on 2025-01-10 {qualifier}") is None
+    assert cache.get("Rome, a weekend with somewhere to stay")[0] == "rome"
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["rejected"] >= 2
+
+
+def test_currency_must_match_in_both_directions():
+    plain = "Flights from SFO to LAX on 2025-01-10"
+    cache = SimilarityCache(capacity=8)
+    cache.set(plain, "eur")
+    assert cache.get("flights from SFO to LAX on 2025-01-10 in EUR")[0] == "eur"
+    assert cache.get(plain + ", price in USD") is None
+    assert cache.get(plain + " in dollars") is None
+
+    priced = SimilarityCache(capacity=8)
+    priced.set(plain + ", price in USD", "usd")
+    priced.set("Hotels in Seoul on 2025-03-02 in pounds", "words")
+    assert priced.get(plain) is None
+    assert priced.get("Hotels in Seoul on 2025-03-02") is None
+    assert priced.get("flights SFO to LAX 2025-01-10 USD")[0] == "usd"
+
+
+def test_full_cache_evicts_expired_then_least_recently_used():
+    cache = SimilarityCache(capacity=2)
+    cache.set("flights SFO to LAX on 2025-01-10", 1)
+    cache.set("hotels in Seoul on 2025-03-02", 2)
+    assert cache.get("SFO to LAX flights 2025-01-10") is not None
+
+    cache.set("flights BCN to NAP on 2026-02-10", 3)
+    assert cache.get("hotels in Seoul on 2025-03-02") is None
+    assert cache.get("flights SFO to LAX on 2025-01-10")[0] == 1
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("flights BCN to NAP on 2026-02-10", 4)
+    assert len(cache) == 2
+    assert cache.get("flights BCN to NAP on 2026-02-10")[0] == 4
+
+    expiring = SimilarityCache(capacity=1, ttl=0)
+    expiring.set("flights SFO to LAX on 2025-01-10", 1)
+    assert expiring.get("flights SFO to LAX on 2025-01-10") is None
+    expiring.set("hotels in Seoul on 2025-03-02", 2)
+    assert expiring.stats()["evictions"] == 0
+
+
+def test_chat_answers_a_paraphrase_from_the_similarity_cache(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(server, "_pool", GraphPool(lambda: build_graph(model), size=1))
+    monkeypatch.setattr(server, "_cache", None)
+    monkeypatch.setattr(server, "_sessions", None)
+    monkeypatch.setattr(server, "_admission", None)
+    monkeypatch.setattr(server, "_coalescer", None)
+    monkeypatch.setattr(server, "_similar", SimilarityCache(capacity=16))
+    hits = similar_lookups.value("hit")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = TestClient(server.app)
+        first = client.post("/chat", json={"message": "Flights from SFO to LAX on 2025-01-10", "compact": True})
+        calls = model.calls
+        second = client.post("/chat", json={"message": "SFO→LAX Jan 10 flights", "fields": ["flights", "similar"]})
+
+    assert first.json()["flights"] == second.json()["flights"]
+    assert second.json()["similar"]["message"] == "Flights from SFO to LAX on 2025-01-10"
+    assert model.calls == calls
+    assert similar_lookups.value("hit") == hits + 1
+    assert client.get("/stats").json()["similar"]["hits"] == 1
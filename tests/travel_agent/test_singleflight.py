@@ -0,0 +1,86 @@
+import asyncio
+
+from travel_agent.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == [1]
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(value == {"answer": 42} for value, _ in results)
+    assert flights.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_failure_reaches_every_waiter_and_next_call_reruns():
+    flights = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("model down")
+
+    async def scenario():
+        return await asyncio.gather(flights.do("key", boom), flights.do("key", boom), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def ok():
+        return "fine"
+
+    assert asyncio.run(flights.do("key", ok)) == ("fine", False)
+    assert flights.executed == 2
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def scenario():
+        return await asyncio.gather(flights.do("a", work), flights.do("b", work))
+
+    assert asyncio.run(scenario()) == [("done", False), ("done", False)]
+    assert flights.stats() == {"executed": 2, "coalesced": 0, "in_flight": 0}
+
+
+def test_followers_rerun_when_the_leader_is_cancelled_or_shed():
+    class Shed(Exception):
+        pass
+
+    flights = SingleFlight(rerun_on=(Shed,))
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 2:
+            raise Shed()
+        return "fine"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.001)
+        leader.cancel()
+        return await asyncio.gather(*followers, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    # The first follower to take over is shed; the other two share the third run.
+    assert [type(result) for result in results].count(Shed) == 1
+    assert sorted(result for result in results if not isinstance(result, Shed)) == [("fine", False), ("fine", True)]
+    assert len(calls) == 3
+    assert flights.in_flight == 0
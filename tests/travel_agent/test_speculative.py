@@ -0,0 +1,47 @@
+import asyncio
+import contextlib
+import io
+
+from travel_agent.app import build_graph
+from travel_agent.speculative import run_speculative
+
+from tests.travel_agent.fake_model import FakeModel
+
+
+def _run(graph, message):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(run_speculative(graph, message))
+
+
+def test_speculation_keeps_needed_branch_and_reports_wasted_one():
+    graph = build_graph(FakeModel(latency=0.05), fast_router=False)
+    result, speculation = _run(graph, "A hotel in Lisbon next week please, no flights")
+    assert [node.node_id for node in result.execution_order] == ["orchestrator", "hotel_search"]
+    assert set(result.results) == {"orchestrator", "hotel_search"}
+    assert speculation.kept == ["hotel_search"]
+    assert speculation.wasted == ["flight_search"]
+    assert set(speculation.node_timings_ms) == {"orchestrator", "flight_search", "hotel_search"}
+
+
+def test_cancelled_branch_can_run_on_next_request():
+    graph = build_graph(FakeModel(latency=0.05), fast_router=False)
+    _run(graph, "A hotel in Lisbon next week please, no flights")
+    _, speculation = _run(graph, "Flights to Lisbon next week please, no hotels")
+    assert speculation.kept == ["flight_search"]
+
+
+def test_speculative_latency_is_slowest_node_not_sum():
+    graph = build_graph(FakeModel(latency=0.2), fast_router=False)
+    result, speculation = _run(graph, "Flights and hotels for a weekend in Rome")
+    assert sorted(speculation.kept) == ["flight_search", "hotel_search"]
+    assert speculation.wasted == []
+    assert result.execution_time < 350
+
+
+def test_rule_routed_request_does_not_speculate():
+    model = FakeModel()
+    graph = build_graph(model, fast_router=True)
+    result, speculation = _run(graph, "SFO to LAX, depart 2025-01-10, flight only")
+    assert speculation.kept == ["flight_search"]
+    assert speculation.wasted == []
+    assert model.calls == 1
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from travel_agent import server, tracing
+from travel_agent.app import build_graph
+from travel_agent.pool import GraphPool
+from travel_agent.tracing import Tracer, root, set_tracer, span
+
+from tests.travel_agent.fake_model import FakeModel
+
+MESSAGE = "SFO to LAX, depart 2025-01-10, flights and hotels"
+
+
+@pytest.fixture
+def use_tracer(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.setattr(tracing, "_configured", False)
+
+    def install(path, **kwargs):
+        tracer = Tracer(str(path), **kwargs)
+        set_tracer(tracer)
+        return tracer
+
+    return install
+
+
+def _chrome_events(path):
+    # The trace file is an unterminated array, as Chrome and Perfetto accept it.
+    return json.loads(path.read_text().rstrip().rstrip(",") + "]")
+
+
+def test_chat_trace_covers_queueing_nodes_models_and_parsing(use_tracer, monkeypatch, tmp_path):
+    path = tmp_path / "trace.json"
+    use_tracer(path)
+    monkeypatch.setattr(server, "_pool", GraphPool(lambda: build_graph(FakeModel(), fast_router=False), size=1))
+    monkeypatch.setattr(server, "_cache", None)
+    monkeypatch.setattr(server, "_sessions", None)
+    monkeypatch.setattr(server, "_admission", None)
+    monkeypatch.setattr(server, "_coalescer", None)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert TestClient(server.app).post("/chat", json={"message": MESSAGE}).status_code == 200
+
+    events = _chrome_events(path)
+    names = [event["name"] for event in events if event["ph"] == "X"]
+    for expected in ("chat", "acquire_graph", "graph", "node:orchestrator", "node:flight_search",
+                     "node:hotel_search", "model_call", "parse", "build_response"):
+        assert expected in names
+    lanes = {event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert {"request", "orchestrator", "flight_search", "hotel_search"} <= lanes
+    model_calls = [event for event in events if event["name"] == "model_call"]
+    assert {event["args"]["agent"] for event in model_calls} == {"orchestrator", "flight_search", "hotel_search"}
+    assert len({event["args"]["trace_id"] for event in events if event["ph"] == "X"}) == 1
+
+
+def test_otlp_export_links_children_to_their_parents(use_tracer, tmp_path):
+    path = tmp_path / "trace.jsonl"
+    use_tracer(path, fmt="otlp")
+    graph = build_graph(FakeModel(), fast_router=False)
+
+    with contextlib.redirect_stdout(io.StringIO()), root("cli"):
+        graph(MESSAGE)
+
+    [line] = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_id = {item["spanId"]: item for item in spans}
+    by_name = {item["name"]: item for item in spans}
+    assert "parentSpanId" not in by_name["cli"]
+    assert by_id[by_name["graph"]["parentSpanId"]]["name"] == "cli"
+    assert by_id[by_name["node:flight_search"]["parentSpanId"]]["name"] == "graph"
+    assert {item["traceId"] for item in spans} == {by_name["cli"]["traceId"]}
+
+
+def test_unsampled_and_untraced_requests_write_nothing(use_tracer, tmp_path):
+    path = tmp_path / "trace.json"
+    assert span("parse") is span("other")
+
+    tracer = use_tracer(path, sample_rate=0.0)
+    with root("chat") as trace, span("parse"):
+        assert trace is None
+
+    assert tracer.traces == 0
+    assert not path.exists()
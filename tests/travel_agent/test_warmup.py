@@ -0,0 +1,56 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from travel_agent import server
+from travel_agent.app import build_graph
+from travel_agent.warmup import Warmup, warmup_targets
+
+from tests.travel_agent.fake_model import FakeModel
+from tests.travel_agent.ollama_stub import start_stub, stop_stub
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    stub, host = start_stub("{}")
+    monkeypatch.setenv("OLLAMA_HOST", host)
+    monkeypatch.delenv("OLLAMA_HOSTS", raising=False)
+    yield stub
+    stop_stub(stub)
+
+
+def test_warmup_preloads_each_agent_with_its_system_prompt(ollama, monkeypatch):
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "-1")
+    warmup = Warmup(warmup_targets(build_graph()))
+
+    reports = asyncio.run(warmup.run())
+
+    assert [report["node"] for report in reports] == ["orchestrator", "flight_search", "hotel_search"]
+    assert all(report["ok"] for report in reports)
+    prompts = {request["messages"][0]["content"] for request in ollama.requests}
+    assert prompts == {target.system_prompt for target in warmup.targets}
+    assert len(prompts) == 3
+    assert {request["options"]["num_predict"] for request in ollama.requests} == {1}
+    assert {request["keep_alive"] for request in ollama.requests} == {-1}
+    assert warmup.stats()["warmup_ms"] is not None
+
+
+def test_warmup_skips_non_ollama_models_and_keeps_first_latency():
+    warmup = Warmup(warmup_targets(build_graph(FakeModel())))
+    assert warmup.targets == []
+    warmup.record_request(1234.56)
+    warmup.record_request(10.0)
+    assert warmup.stats()["first_request_ms"] == 1234.6
+
+
+def test_lifespan_reports_warmup_in_stats(ollama, monkeypatch):
+    monkeypatch.setenv("TRAVEL_AGENT_POOL_SIZE", "1")
+    monkeypatch.setattr(server, "_warmup", None)
+    with contextlib.redirect_stdout(io.StringIO()), TestClient(server.app) as client:
+        warmup = client.get("/stats").json()["warmup"]
+    assert len(warmup["models"]) == 3
+    assert warmup["first_request_ms"] is None
+    assert len(ollama.requests) == 3